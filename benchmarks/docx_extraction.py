@@ -0,0 +1,77 @@
+"""Vergleicht die Word-Extraktion: Streaming (iter_docx_blocks) gegen python-docx.
+
+Erzeugt ein Testprotokoll mit --pages Seiten (Absätze plus Aufgaben-Tabelle je Seite)
+und misst Laufzeit und Spitzen-Speicher (tracemalloc) beider Varianten. tracemalloc sieht
+nur Python-Objekte; der lxml-Baum von python-docx kommt noch dazu.
+
+    python benchmarks/docx_extraction.py --pages 150 --repeat 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import test as app
+
+
+def build_document(path, pages):
+    import docx
+    doc = docx.Document()
+    for page in range(pages):
+        doc.add_heading(f"Besprechung {page + 1}", level=2)
+        for i in range(12):
+            doc.add_paragraph(f"Punkt {i + 1}: Der Relaunch der Website wurde besprochen, "
+                              f"offene Fragen zu Design, Startseite und Staging werden bis KW {i + 10} geklärt.")
+        table = doc.add_table(rows=1, cols=3)
+        table.rows[0].cells[0].text, table.rows[0].cells[1].text, table.rows[0].cells[2].text = "Aufgabe", "Verantwortlich", "Fällig"
+        for i in range(6):
+            cells = table.add_row().cells
+            cells[0].text = f"Aufgabe {page}-{i}"
+            cells[1].text = "Max Müller"
+            cells[2].text = f"{i + 1:02d}.03.2025"
+        doc.add_page_break()
+    doc.save(path)
+
+
+def python_docx_text(path):
+    import docx
+    doc = docx.Document(path)
+    return '\n'.join(para.text for para in doc.paragraphs if para.text.strip())
+
+
+def streaming_text(path):
+    return '\n'.join(app.iter_docx_blocks(path))
+
+
+def measure(fn, path, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = fn(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=150)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'protokoll.docx')
+        build_document(path, args.pages)
+        print(f"{args.pages} Seiten, {os.path.getsize(path) / 1024:.0f} KB")
+        for name, fn in (('python-docx', python_docx_text), ('stream', streaming_text)):
+            seconds, peak, chars = measure(fn, path, args.repeat)
+            print(f"{name:12} {seconds * 1000:8.1f} ms  Spitze {peak / 2**20:6.1f} MB  {chars} Zeichen")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,411 @@
+"""Micro-Benchmarks der reinen Hot-Path-Funktionen mit JSON-Ausgabe und Baseline-Vergleich.
+
+Gemessen werden Laufzeit (Minimum und Median über --repeat Läufe) und Spitzen-Speicher
+(tracemalloc, ein eigener Lauf) für:
+
+    suggest_parent        suggest_matching_parent_task (Scorer bauen + Vorschlag), 100 bis 50k Aufgaben
+    suggest_parent_warm   Vorschlag mit bereits gebautem Scorer (wie bei gecachter Aufgabenliste)
+    excel_to_text         .xlsx mit 1 bis 100k Zeilen, ohne EXCEL_MAX_ROWS/EXCEL_MAX_CHARS (misst den Parser)
+    excel_to_text[capped] größte .xlsx mit den konfigurierten Grenzen (wie in der App: bricht früh ab)
+    word_to_text          .docx mit 1 bis 100k Zeilen (Absätze und Tabellenzeilen)
+    parse_task_markdown   Markdown-Schleife aus create_tasks, 10 bis 5k Aufgaben
+    assignee_index        AssigneeIndex für 10 bis 5k Benutzer bauen
+    assignee_resolve      Assignee-Zuordnung wie in analyze_protocol_and_show (frischer Index)
+
+Die Fixtures werden deterministisch erzeugt (fester Seed) und in --fixtures abgelegt,
+damit große Excel-/Word-Dateien nur einmal gebaut werden.
+
+    python benchmarks/hot_paths.py --sizes quick
+    python benchmarks/hot_paths.py --output benchmarks/baseline.json
+    python benchmarks/hot_paths.py --compare benchmarks/baseline.json --tolerance 0.5
+
+Mit --compare endet das Skript mit Exit-Code 1, wenn ein Fall langsamer oder speicher-
+hungriger als die Baseline plus Toleranz ist (kleine absolute Unterschiede zählen nicht).
+Auf geteilten Maschinen schwanken die Laufzeiten zwischen zwei Prozessen um bis zu 30 %;
+Baseline und Vergleich daher auf derselben Maschine messen. Der Spitzen-Speicher ist stabil.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+import test as app
+
+SEED = 20250101
+SIZES = {
+    'quick': {
+        'tasks': [100, 1000],
+        'users': [10, 500],
+        'rows': [1, 1000],
+        'markdown': [10, 200],
+    },
+    'full': {
+        'tasks': [100, 1000, 10000, 50000],
+        'users': [10, 100, 1000, 5000],
+        'rows': [1, 100, 10000, 100000],
+        'markdown': [10, 100, 1000, 5000],
+    },
+}
+# Unterschiede darunter gelten als Messrauschen, auch wenn sie relativ groß sind
+MIN_SECONDS_DELTA = 0.001
+MIN_PEAK_DELTA = 64 * 1024
+
+FIRST_NAMES = ["Max", "Anna", "Lukas", "Sophie", "Jonas", "Lena", "Felix", "Marie", "Paul", "Laura",
+               "Tobias", "Julia", "Stefan", "Katharina", "Michael", "Sabine", "Florian", "Theresa"]
+LAST_NAMES = ["Müller", "Huber", "Gruber", "Wagner", "Pichler", "Steiner", "Moser", "Mayer", "Hofer",
+              "Leitner", "Berger", "Fuchs", "Eder", "Fischer", "Schmid", "Winkler", "Weber", "Schwarz"]
+CLIENTS = ["ABC", "Innpuls", "Alpenbau", "Stadtwerke", "Bergbahnen", "Hotel Tirol", "Elmag", "Seocon"]
+TOPICS = ["Website Relaunch", "Newsletter", "Messeauftritt", "SEO Audit", "Social Media Kampagne",
+          "Imagefilm", "Broschüre", "Onlineshop", "Recruiting Kampagne", "Jahresbericht"]
+VERBS = ["abstimmen", "freigeben", "überarbeiten", "vorbereiten", "präsentieren", "versenden", "prüfen"]
+
+
+# Fixtures -----------------------------------------------------------------
+
+def task_names(n):
+    rng = random.Random(SEED + n)
+    return [f"{rng.choice(CLIENTS)} {rng.choice(TOPICS)} {rng.randint(2020, 2026)} #{i}" for i in range(n)]
+
+
+def user_records(n):
+    rng = random.Random(SEED + n)
+    records = []
+    for i in range(n):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if i >= len(FIRST_NAMES) * len(LAST_NAMES) // 2:
+            name += f" {i}"
+        email = name.lower().replace(' ', '.').replace('ü', 'ue') + '@innpuls.at'
+        records.append((name, f"u{i}", email))
+    return records
+
+
+def assignee_queries(records, count=50):
+    """Mischung wie aus der KI: volle Namen, Nachnamen, Anreden, Tippfehler und Unbekannte"""
+    rng = random.Random(SEED)
+    queries = []
+    for i in range(count):
+        name = rng.choice(records)[0]
+        first, last = name.split(' ')[:2]
+        kind = i % 5
+        if kind == 0:
+            queries.append(name)
+        elif kind == 1:
+            queries.append(last)
+        elif kind == 2:
+            queries.append(f"Herr {last}")
+        elif kind == 3:
+            queries.append(f"{first} {last[:-2] + last[-1]}")
+        else:
+            queries.append(f"Unbekannt {i}")
+    return queries
+
+
+def protocol_text(paragraphs=20):
+    rng = random.Random(SEED)
+    lines = []
+    for _ in range(paragraphs):
+        lines.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} berichtet zum Projekt {rng.choice(CLIENTS)} "
+                     f"{rng.choice(TOPICS)}: Entwürfe {rng.choice(VERBS)}, Termin mit dem Kunden bis KW {rng.randint(1, 52)}.")
+    return "\n".join(lines)
+
+
+def task_markdown(n):
+    rng = random.Random(SEED + n)
+    lines = ["### Gefundene Aufgaben:", ""]
+    for i in range(n):
+        lines.append(f"- **{rng.choice(TOPICS)} {rng.choice(VERBS)} #{i}**")
+        lines.append(f"  👤 Zugewiesen an: {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        lines.append(f"  📅 Fällig am: 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        lines.append(f"  📝 Kontext: {rng.choice(CLIENTS)} {rng.choice(TOPICS)}, Rückmeldung an das Team")
+        lines.append("")
+    assignees = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(n)]
+    due_dates = ["YYYY-MM-DD" if i % 3 else "2025-06-30" for i in range(n)]
+    return "\n".join(lines), assignees, due_dates
+
+
+def excel_fixture(directory, rows):
+    path = os.path.join(directory, f"protokoll_{rows}.xlsx")
+    if os.path.exists(path):
+        return path
+    import openpyxl
+    rng = random.Random(SEED + rows)
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Protokoll")
+    sheet.append(["Thema", "Aufgabe", "Verantwortlich", "Fällig", "Status"])
+    for i in range(rows):
+        sheet.append([f"{rng.choice(CLIENTS)} {rng.choice(TOPICS)}", f"Entwurf {rng.choice(VERBS)} #{i}",
+                      f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                      datetime(2025, rng.randint(1, 12), rng.randint(1, 28)), rng.choice(["offen", "erledigt"])])
+    workbook.save(path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def word_fixture(directory, rows):
+    """Minimales .docx direkt als XML (python-docx braucht für 100k Tabellenzeilen Minuten):
+    je 20 Zeilen eine Überschrift, drei Absätze und eine Tabelle mit 16 Zeilen"""
+    path = os.path.join(directory, f"protokoll_{rows}.docx")
+    if os.path.exists(path):
+        return path
+    rng = random.Random(SEED + rows)
+    w = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+    def paragraph(text):
+        return f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(text)}</w:t></w:r></w:p>"
+
+    body = []
+    written = 0
+    while written < rows:
+        block = min(20, rows - written)
+        texts = [f"Besprechung {written // 20 + 1}: {rng.choice(CLIENTS)} {rng.choice(TOPICS)}"]
+        texts += [f"{rng.choice(FIRST_NAMES)} berichtet: Entwürfe {rng.choice(VERBS)} bis KW {rng.randint(1, 52)}." for _ in range(3)]
+        body.extend(paragraph(text) for text in texts[:block])
+        table_rows = block - min(block, 4)
+        if table_rows:
+            cells = lambda values: "<w:tr>" + "".join(f"<w:tc>{paragraph(v)}</w:tc>" for v in values) + "</w:tr>"
+            body.append("<w:tbl>" + "".join(
+                cells([f"Aufgabe {written + i}", f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"{rng.randint(1, 28):02d}.03.2025"])
+                for i in range(table_rows)) + "</w:tbl>")
+        written += block
+    document = (f"<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
+                f"<w:document xmlns:w=\"{w}\"><w:body>{''.join(body)}<w:sectPr/></w:body></w:document>")
+    content_types = (
+        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
+        "<Types xmlns=\"http://schemas.openxmlformats.org/package/2006/content-types\">"
+        "<Default Extension=\"rels\" ContentType=\"application/vnd.openxmlformats-package.relationships+xml\"/>"
+        "<Default Extension=\"xml\" ContentType=\"application/xml\"/>"
+        "<Override PartName=\"/word/document.xml\" "
+        "ContentType=\"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml\"/></Types>")
+    rels = (
+        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
+        "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
+        "<Relationship Id=\"rId1\" Type=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument\" "
+        "Target=\"word/document.xml\"/></Relationships>")
+    with zipfile.ZipFile(path + '.tmp', 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', content_types)
+        package.writestr('_rels/.rels', rels)
+        package.writestr('word/document.xml', document)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+# Fälle --------------------------------------------------------------------
+
+def scoring_modes():
+    modes = ['keywords']
+    try:
+        import numpy, scipy.sparse  # noqa: F401
+        modes.append('tfidf')
+    except ImportError:
+        print("numpy/scipy fehlen, TF-IDF-Fälle werden übersprungen", file=sys.stderr)
+    return modes
+
+
+@contextlib.contextmanager
+def scoring_mode(mode):
+    previous = app.PARENT_TASK_SCORING
+    app.PARENT_TASK_SCORING = mode
+    try:
+        yield
+    finally:
+        app.PARENT_TASK_SCORING = previous
+
+
+@contextlib.contextmanager
+def excel_caps(max_rows, max_chars):
+    """Setzt EXCEL_MAX_ROWS/EXCEL_MAX_CHARS vorübergehend (None = unbegrenzt)"""
+    previous = app.EXCEL_MAX_ROWS, app.EXCEL_MAX_CHARS
+    app.EXCEL_MAX_ROWS = sys.maxsize if max_rows is None else max_rows
+    app.EXCEL_MAX_CHARS = sys.maxsize if max_chars is None else max_chars
+    try:
+        yield
+    finally:
+        app.EXCEL_MAX_ROWS, app.EXCEL_MAX_CHARS = previous
+
+
+def uncapped_excel_to_text(path):
+    with excel_caps(None, None):
+        return app.excel_to_text(path)
+
+
+def build_cases(sizes, fixtures_dir):
+    """(Name, Setup, Lauf); Setup läuft vor jeder Messung und zählt nicht mit"""
+    cases = []
+    protocol = protocol_text()
+    for mode in scoring_modes():
+        for n in sizes['tasks']:
+            names = task_names(n)
+
+            def cold(_, names=names, mode=mode):
+                with scoring_mode(mode):
+                    app.suggest_matching_parent_task(protocol, names)
+
+            def warm_setup(names=names, mode=mode):
+                with scoring_mode(mode):
+                    return app._build_parent_task_scorer([(name, str(i)) for i, name in enumerate(names)])
+
+            cases.append((f"suggest_parent[{mode}]/{n}", None, cold))
+            cases.append((f"suggest_parent_warm[{mode}]/{n}", warm_setup, lambda scorer: scorer.suggest(protocol)))
+    for rows in sizes['rows']:
+        excel_path = excel_fixture(fixtures_dir, rows)
+        word_path = word_fixture(fixtures_dir, rows)
+        # Ohne Grenzen, sonst messen die großen Fälle nur den Abbruch nach ~2.300 Zeilen (EXCEL_MAX_CHARS)
+        cases.append((f"excel_to_text/{rows}", None, lambda _, path=excel_path: uncapped_excel_to_text(path)))
+        cases.append((f"word_to_text/{rows}", None, lambda _, path=word_path: app.word_to_text(path)))
+    largest = max(sizes['rows'])
+    cases.append((f"excel_to_text[capped]/{largest}", None,
+                  lambda _, path=excel_fixture(fixtures_dir, largest): app.excel_to_text(path)))
+    for n in sizes['markdown']:
+        markdown, assignees, due_dates = task_markdown(n)
+        cases.append((f"parse_task_markdown/{n}", None,
+                      lambda _, m=markdown, a=assignees, d=due_dates: app._parse_task_markdown(m, a, d)))
+    for n in sizes['users']:
+        records = user_records(n)
+        queries = assignee_queries(records)
+
+        def resolve(index, queries=queries):
+            for query in queries:
+                index.resolve(query)
+
+        cases.append((f"assignee_index/{n}", None, lambda _, records=records: app.AssigneeIndex(records)))
+        cases.append((f"assignee_resolve/{n}", lambda records=records: app.AssigneeIndex(records), resolve))
+    return cases
+
+
+# Messung ------------------------------------------------------------------
+
+def measure(setup, run, repeat, budget):
+    """Laufzeiten über bis zu repeat Läufe (mindestens einer, höchstens budget Sekunden) plus Spitzen-Speicher.
+    Ein erster, nicht gezählter Lauf wärmt Importe und Caches auf."""
+    started = time.perf_counter()
+    run(setup() if setup else None)
+    if time.perf_counter() - started > budget:
+        repeat = 1
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat and (not times or time.perf_counter() - started < budget):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    state = setup() if setup else None
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'seconds_min': min(times),
+        'seconds_median': statistics.median(times),
+        'runs': len(times),
+        'peak_bytes': peak,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(args):
+    os.makedirs(args.fixtures, exist_ok=True)
+    cases = build_cases(SIZES[args.sizes], args.fixtures)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case[0]]
+    results = {}
+    for name, setup, run in cases:
+        # Die Funktionen schreiben DEBUG-Ausgaben nach stdout; die gehören nicht in die Messung-Ausgabe
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            results[name] = measure(setup, run, args.repeat, args.budget)
+        result = results[name]
+        print(f"{name:36} {result['seconds_median'] * 1000:10.2f} ms  Spitze {result['peak_bytes'] / 2**20:7.2f} MB  "
+              f"({result['runs']} Läufe)", file=sys.stderr)
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': args.sizes,
+            'config': {
+                'EXCEL_READER': app.EXCEL_READER,
+                # gelten nur für excel_to_text[capped]; die übrigen Excel-Fälle laufen unbegrenzt
+                'EXCEL_MAX_ROWS': app.EXCEL_MAX_ROWS,
+                'EXCEL_MAX_CHARS': app.EXCEL_MAX_CHARS,
+                'DOCX_READER': app.DOCX_READER,
+                'ASSIGNEE_FUZZY_CUTOFF': app.ASSIGNEE_FUZZY_CUTOFF,
+            },
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Vergleicht Laufzeit und Spitzen-Speicher je Fall; liefert die Liste der Regressionen.
+    Verglichen wird die schnellste Laufzeit, die schwankt weniger als der Median."""
+    if report['meta']['config'] != baseline['meta'].get('config'):
+        print(f"Achtung: Konfiguration weicht von der Baseline ab: {baseline['meta'].get('config')}", file=sys.stderr)
+    regressions = []
+    print(f"{'Fall':36} {'Baseline ms':>12} {'jetzt ms':>10} {'Δ':>7} {'Baseline MB':>12} {'jetzt MB':>9} {'Δ':>7}")
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:36} {'(neu)':>12}")
+            continue
+        seconds_ratio = result['seconds_min'] / base['seconds_min'] if base['seconds_min'] else 1.0
+        peak_ratio = result['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] else 1.0
+        slower = seconds_ratio > 1 + tolerance and result['seconds_min'] - base['seconds_min'] > MIN_SECONDS_DELTA
+        bigger = peak_ratio > 1 + tolerance and result['peak_bytes'] - base['peak_bytes'] > MIN_PEAK_DELTA
+        flag = "  ← REGRESSION" if slower or bigger else ""
+        print(f"{name:36} {base['seconds_min'] * 1000:12.2f} {result['seconds_min'] * 1000:10.2f} "
+              f"{(seconds_ratio - 1) * 100:+6.0f}% {base['peak_bytes'] / 2**20:12.2f} {result['peak_bytes'] / 2**20:9.2f} "
+              f"{(peak_ratio - 1) * 100:+6.0f}%{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', choices=sorted(SIZES), default='full')
+    parser.add_argument('--repeat', type=int, default=5, help="Läufe je Fall (Median und Minimum)")
+    parser.add_argument('--budget', type=float, default=10.0, help="Sekunden je Fall, danach keine weiteren Läufe")
+    parser.add_argument('--filter', help="nur Fälle, deren Name diesen Text enthält")
+    parser.add_argument('--fixtures', default=os.path.join(BENCH_DIR, '.fixtures'), help="Ablage der erzeugten Dateien")
+    parser.add_argument('--output', help="JSON-Ergebnis in diese Datei schreiben (sonst stdout)")
+    parser.add_argument('--compare', metavar='BASELINE', help="mit einer gespeicherten JSON-Ausgabe vergleichen")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="erlaubte relative Verschlechterung (0.5 = 50%%)")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+    elif not args.compare:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} Regression(en): {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
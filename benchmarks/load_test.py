@@ -0,0 +1,686 @@
+"""Lasttest der Gradio-App gegen lokale Stellvertreter-Server für Asana und OpenAI.
+
+Das Skript startet einen Fake-Server (Asana-REST und OpenAI-Chat-Streaming) mit einstellbarer
+Latenz, Fehlerquote und 429-Quote, startet test.py als eigenen Prozess dagegen und schickt
+dann je Stufe N simulierte Benutzer (je ein gradio_client.Client) durch den kompletten Ablauf:
+
+    connect                          Seite öffnen (Config laden, Session anlegen)
+    load_initial_choices             Workspaces und Projekte
+    update_project_choices           Projektauswahl nach Workspace-Wechsel
+    update_tasks_on_project_change   übergeordnete Aufgaben der Abteilung
+    analyze_protocol_with_loading    KI-Extraktion (bis zum letzten Zwischenstand)
+    render_task_editor               Aufgaben-Editor rendern (macht sonst der Browser)
+    create_subtasks                  Aufgaben der Analyse unverändert in Asana anlegen
+
+Editor und Erstellen-Button entstehen erst per gr.render in der Session und stehen daher
+nicht in der API-Beschreibung von gradio_client; diese beiden Schritte laufen wie im Browser
+direkt über /queue/join mit der Session des Clients.
+
+Pro Stufe werden p50/p95/p99 je Event, der Durchsatz (fertige Abläufe pro Sekunde) und die
+Fehler ausgegeben, dazu die Zähler des Fake-Servers (Requests, eingestreute 429/5xx).
+
+    python benchmarks/load_test.py --users 1,5,10,20
+    python benchmarks/load_test.py --users 10 --error-rate 0.05 --rate-limit-rate 0.1 --async-handlers
+    python benchmarks/load_test.py --output benchmarks/load.json
+
+Mit --app-url wird statt des eigenen Prozesses eine bereits laufende App getestet; diese muss
+dann selbst mit ASANA_BASE_URL/OPENAI_API_BASE auf den Fake-Server zeigen (--serve-only startet
+nur den Fake-Server und gibt die Variablen aus).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from aiohttp import web
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BENCH_DIR, '..', 'test.py')
+AUTH = ("innpuls", "innpuls")
+EVENTS = [
+    'connect',
+    'load_initial_choices',
+    'update_project_choices',
+    'update_tasks_on_project_change',
+    'analyze_protocol_with_loading',
+    'render_task_editor',
+    'create_subtasks',
+]
+PERCENTILES = (50, 95, 99)
+VORNAMEN = ["Anna", "Bernd", "Clara", "David", "Eva", "Florian", "Greta", "Hannes", "Ida", "Jakob", "Katrin", "Lukas"]
+NACHNAMEN = ["Huber", "Gruber", "Wagner", "Bauer", "Pichler", "Moser", "Mayer", "Hofer", "Steiner", "Berger"]
+THEMEN = ["Budget", "Website", "Messe", "Schulung", "Newsletter", "Förderantrag", "Workshop", "Kundentermin", "Bericht", "Umfrage"]
+
+
+class FakeBackend:
+    """Asana- und OpenAI-Stellvertreter mit künstlicher Latenz und eingestreuten Fehlern.
+
+    Asana liegt unter /asana/api/1.0, OpenAI unter /openai/v1. Die Daten werden beim Start
+    deterministisch erzeugt. Angelegte Aufgaben werden mit Name und Ziel gespeichert, damit
+    Subtask-Listen und Delta-Abfragen sie liefern und doppelt angelegte Aufgaben auffallen.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.counters = Counter()
+        self.lock = threading.Lock()
+        self.next_gid = 9_000_000
+        self.workspaces = [{'gid': str(100 + i), 'name': f"Workspace {i + 1}"} for i in range(args.workspaces)]
+        self.projects = {
+            ws['gid']: [{'gid': f"{ws['gid']}{200 + i}", 'name': f"Abteilung {i + 1}"} for i in range(args.projects)]
+            for ws in self.workspaces
+        }
+        self.users = []
+        for i in range(args.asana_users):
+            vorname = VORNAMEN[i % len(VORNAMEN)]
+            nachname = NACHNAMEN[(i // len(VORNAMEN)) % len(NACHNAMEN)]
+            domain = 'innpuls.at' if i % 5 else 'extern.example'
+            self.users.append({
+                'gid': str(5000 + i),
+                'name': f"{vorname} {nachname}",
+                'email': f"{vorname.lower()}.{nachname.lower()}{i}@{domain}",
+            })
+        self.tasks = [
+            {'gid': str(700000 + i), 'name': f"{THEMEN[i % len(THEMEN)]} {i // len(THEMEN) + 1}", 'completed': False}
+            for i in range(args.project_tasks)
+        ]
+        self.sync_counter = 0
+        self.created = []
+
+    # --- Hilfen ---
+
+    def count(self, key):
+        with self.lock:
+            self.counters[key] += 1
+
+    def new_gid(self):
+        with self.lock:
+            self.next_gid += 1
+            return str(self.next_gid)
+
+    async def delay(self, base_ms):
+        if base_ms <= 0:
+            return
+        jitter = base_ms * self.args.jitter
+        await asyncio.sleep(max(0.0, self.random.uniform(base_ms - jitter, base_ms + jitter)) / 1000)
+
+    async def fault(self, service, route):
+        """Latenz plus eingestreute Fehler; liefert eine Fehlerantwort oder None"""
+        self.count((service, route, 'requests'))
+        await self.delay(self.args.latency_ms)
+        roll = self.random.random()
+        if roll < self.args.rate_limit_rate:
+            self.count((service, route, '429'))
+            return web.json_response(
+                {'errors': [{'message': 'Rate limit exceeded'}], 'error': {'message': 'Rate limit exceeded', 'type': 'rate_limit_error'}},
+                status=429,
+                headers={'Retry-After': str(self.args.retry_after)}
+            )
+        if roll < self.args.rate_limit_rate + self.args.error_rate:
+            self.count((service, route, '5xx'))
+            return web.json_response(
+                {'errors': [{'message': 'Server error'}], 'error': {'message': 'Server error', 'type': 'server_error'}},
+                status=503
+            )
+        return None
+
+    def lost_response(self, route):
+        """503, obwohl die Aufgaben schon angelegt sind (Antwort unterwegs verloren), oder None"""
+        if self.random.random() >= self.args.lost_response_rate:
+            return None
+        self.count(('asana', route, 'lost'))
+        return web.json_response({'errors': [{'message': 'Server error'}]}, status=503)
+
+    @staticmethod
+    def page(request, items):
+        """Asana-Paging über limit/offset"""
+        limit = int(request.query.get('limit') or 100)
+        offset = int(request.query.get('offset') or 0)
+        data = items[offset:offset + limit]
+        next_page = None
+        if offset + limit < len(items):
+            next_offset = str(offset + limit)
+            next_page = {'offset': next_offset, 'path': f"{request.path}?offset={next_offset}", 'uri': f"{request.url}&offset={next_offset}"}
+        return web.json_response({'data': data, 'next_page': next_page})
+
+    # --- Asana ---
+
+    async def asana_workspaces(self, request):
+        return await self.fault('asana', 'GET /workspaces') or self.page(request, self.workspaces)
+
+    async def asana_projects(self, request):
+        return await self.fault('asana', 'GET /projects') or self.page(request, self.projects.get(request.query.get('workspace'), []))
+
+    async def asana_users(self, request):
+        return await self.fault('asana', 'GET /users') or self.page(request, self.users)
+
+    async def asana_tasks(self, request):
+        failure = await self.fault('asana', 'GET /tasks')
+        if failure:
+            return failure
+        since = request.query.get('modified_since')
+        if not since:
+            return self.page(request, self.tasks)
+        # Delta-Abgleich: geändert haben sich nur die seitdem angelegten Aufgaben des Projekts
+        project = request.query.get('project')
+        with self.lock:
+            created = [task for task in self.created if project in task['projects'] and task['created_at'] >= since]
+        return self.page(request, created)
+
+    async def asana_subtasks(self, request):
+        failure = await self.fault('asana', 'GET /tasks/{gid}/subtasks')
+        if failure:
+            return failure
+        parent = request.match_info['gid']
+        with self.lock:
+            subtasks = [task for task in self.created if task['parent'] == parent]
+        return self.page(request, subtasks)
+
+    async def asana_events(self, request):
+        failure = await self.fault('asana', 'GET /events')
+        if failure:
+            return failure
+        with self.lock:
+            self.sync_counter += 1
+            token = f"sync-{self.sync_counter}"
+        if not request.query.get('sync'):
+            return web.json_response({'errors': [{'message': 'Sync token invalid or too old'}], 'sync': token}, status=412)
+        return web.json_response({'data': [], 'sync': token, 'has_more': False})
+
+    def created_task(self, task_data):
+        task = {
+            'gid': self.new_gid(),
+            'name': task_data.get('name', ''),
+            'completed': False,
+            'created_at': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+            'parent': task_data.get('parent'),
+            'projects': task_data.get('projects') or [],
+            'permalink_url': 'https://app.asana.com/0/0/0',
+        }
+        with self.lock:
+            target = (task['name'], task['parent'], tuple(task['projects']))
+            if any((other['name'], other['parent'], tuple(other['projects'])) == target for other in self.created):
+                self.counters[('asana', 'POST /tasks', 'duplicates')] += 1
+            self.created.append(task)
+        return task
+
+    async def asana_create_task(self, request):
+        failure = await self.fault('asana', 'POST /tasks')
+        if failure:
+            return failure
+        body = await request.json()
+        task = self.created_task(body.get('data') or {})
+        return self.lost_response('POST /tasks') or web.json_response({'data': task}, status=201)
+
+    async def asana_batch(self, request):
+        failure = await self.fault('asana', 'POST /batch')
+        if failure:
+            return failure
+        body = await request.json()
+        actions = (body.get('data') or {}).get('actions') or []
+        self.count(('asana', 'POST /batch', 'actions'))
+        results = [
+            {'status_code': 201, 'headers': {}, 'body': {'data': self.created_task(action.get('data') or {})}}
+            for action in actions
+        ]
+        return self.lost_response('POST /batch') or web.json_response({'data': results})
+
+    # --- OpenAI ---
+
+    def extraction_content(self):
+        """JSON-Array mit --llm-tasks Aufgaben, Assignees aus den Fake-Benutzern; die Namen tragen
+        eine laufende Nummer je Antwort, damit nur echte Doppelanlagen als Duplikate zählen"""
+        number = self.new_gid()
+        tasks = []
+        for i in range(self.args.llm_tasks):
+            user = self.users[self.random.randrange(len(self.users))] if self.users else {'name': ''}
+            tasks.append({
+                'name': f"{THEMEN[i % len(THEMEN)]} vorbereiten ({i + 1}, #{number})",
+                'description': f"Aus dem Protokoll: {THEMEN[i % len(THEMEN)]} klären und abstimmen.",
+                'assignee': user['name'],
+                'due_date': '',
+            })
+        return json.dumps(tasks, ensure_ascii=False, indent=2)
+
+    async def openai_chat(self, request):
+        failure = await self.fault('openai', 'POST /chat/completions')
+        if failure:
+            return failure
+        body = await request.json()
+        content = self.extraction_content()
+        chunk_size = max(1, self.args.llm_chunk_chars)
+        pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        self.count(('openai', 'POST /chat/completions', 'completions'))
+        base = {'id': f"chatcmpl-{self.new_gid()}", 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': body.get('model', 'fake')}
+        if not body.get('stream'):
+            await self.delay(self.args.llm_first_token_ms + self.args.llm_chunk_ms * len(pieces))
+            return web.json_response(dict(base, object='chat.completion', choices=[
+                {'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}
+            ]))
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        await self.delay(self.args.llm_first_token_ms)
+        for piece in pieces:
+            chunk = dict(base, choices=[{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}])
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await self.delay(self.args.llm_chunk_ms)
+        chunk = dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+        await response.write(f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode())
+        await response.write_eof()
+        return response
+
+    def application(self):
+        app = web.Application()
+        app.add_routes([
+            web.get('/asana/api/1.0/workspaces', self.asana_workspaces),
+            web.get('/asana/api/1.0/projects', self.asana_projects),
+            web.get('/asana/api/1.0/users', self.asana_users),
+            web.get('/asana/api/1.0/tasks', self.asana_tasks),
+            web.get('/asana/api/1.0/tasks/{gid}/subtasks', self.asana_subtasks),
+            web.get('/asana/api/1.0/events', self.asana_events),
+            web.post('/asana/api/1.0/tasks', self.asana_create_task),
+            web.post('/asana/api/1.0/batch', self.asana_batch),
+            web.post('/openai/v1/chat/completions', self.openai_chat),
+        ])
+        return app
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+        summary = {}
+        for (service, route, kind), value in sorted(counters.items()):
+            summary.setdefault(f"{service} {route}", {})[kind] = value
+        return summary
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+
+
+def start_backend(backend, port):
+    """Startet den Fake-Server in einem Hintergrund-Thread; liefert die Basis-URL"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(backend.application(), access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', port)
+        loop.run_until_complete(site.start())
+        state['port'] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True, name='fake-backend').start()
+    ready.wait()
+    return f"http://127.0.0.1:{state['port']}"
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def protocol_text(rng, backend, user_id, iteration):
+    """Kurzes, je Ablauf eindeutiges Protokoll (sonst träfe der LLM-Cache)"""
+    lines = [f"Teamsitzung {user_id}-{iteration}, {datetime.now():%d.%m.%Y}"]
+    for thema in rng.sample(THEMEN, 4):
+        person = rng.choice(backend.users)['name'] if backend.users else "Jemand"
+        lines.append(f"- {thema}: {person} kümmert sich bis Monatsende darum.")
+    return "\n".join(lines)
+
+
+def start_app(args, backend_url, workdir):
+    """Startet test.py gegen den Fake-Server; liefert (Prozess, URL, Logdatei)"""
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(args.app_port),
+        'ASANA_BASE_URL': f"{backend_url}/asana/api/1.0",
+        'OPENAI_API_BASE': f"{backend_url}/openai/v1",
+        'ASANA_API_TOKEN': 'load-test',
+        'OPENAI_API_KEY': 'load-test',
+        'ASANA_MIRROR_PATH': os.path.join(workdir, 'asana_mirror.sqlite3'),
+        'LLM_CACHE_PATH': os.path.join(workdir, 'llm_cache.sqlite3'),
+        'LLM_CACHE_DISABLED': '' if args.llm_cache else '1',
+        'ASYNC_HANDLERS': '1' if args.async_handlers else '',
+    })
+    for item in args.app_env:
+        key, _, value = item.partition('=')
+        env[key] = value
+    log_path = os.path.join(workdir, 'app.log')
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen([sys.executable, os.path.abspath(APP_PATH)], env=env, cwd=workdir,
+                                   stdout=log, stderr=subprocess.STDOUT)
+    return process, f"http://127.0.0.1:{args.app_port}/", log_path
+
+
+def connect(app_url, timeout):
+    from gradio_client import Client
+    return Client(app_url, auth=AUTH, verbose=False, httpx_kwargs={'timeout': timeout})
+
+
+def wait_for_app(app_url, process, deadline):
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"App beendet mit Exit-Code {process.returncode}")
+        try:
+            connect(app_url, 5)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError("App nicht rechtzeitig erreichbar")
+
+
+class QueueSession:
+    """Direkte Queue-Aufrufe in der Session eines gradio_client.Client (für gerenderte Events)"""
+
+    def __init__(self, client, timeout):
+        import httpx
+        self.client = client
+        self.http = httpx.Client(base_url=client.src, cookies=client.cookies, headers=client.headers,
+                                 timeout=httpx.Timeout(timeout, connect=10))
+
+    def call(self, fn_index, data, trigger_id=None):
+        """Stellt ein Event ein und wartet auf process_completed; liefert das output-Dict"""
+        session_hash = self.client.session_hash
+        response = self.http.post('queue/join', json={
+            'data': data, 'fn_index': fn_index, 'session_hash': session_hash,
+            'event_data': None, 'trigger_id': trigger_id,
+        })
+        response.raise_for_status()
+        event_id = response.json()['event_id']
+        with self.http.stream('GET', 'queue/data', params={'session_hash': session_hash}) as stream:
+            for line in stream.iter_lines():
+                if not line.startswith('data:'):
+                    continue
+                message = json.loads(line[5:])
+                if message.get('event_id') != event_id or message.get('msg') != 'process_completed':
+                    continue
+                output = message.get('output') or {}
+                if not message.get('success', False):
+                    raise RuntimeError(output.get('error') or 'Event fehlgeschlagen')
+                return output
+        raise RuntimeError("Queue-Stream ohne Ergebnis beendet")
+
+    def close(self):
+        self.http.close()
+
+
+def component_ids(config):
+    """IDs der Komponenten, die der Ablauf außerhalb des Editors braucht (aus den API-Events)"""
+    by_api = {dep.get('api_name'): dep for dep in config['dependencies']}
+    analyze = by_api['analyze_protocol_with_loading']
+    parents = by_api['update_tasks_on_project_change']
+    # Der Editor rendert bei jeder Änderung von tasks_state (drittes Ausgabefeld der Analyse) neu
+    tasks_state = analyze['outputs'][2]
+    render = next(dep for dep in config['dependencies'] if [tasks_state, 'change'] in [list(t) for t in dep['targets']])
+    return {
+        'workspace': analyze['inputs'][1],
+        'project': analyze['inputs'][2],
+        'parent': parents['outputs'][0],
+        'render_fn': render['id'],
+    }
+
+
+def editor_values(render_config):
+    """Werte der gerenderten Editor-Felder und das Erstellen-Event aus einer render_config"""
+    create = next(dep for dep in render_config['dependencies'] if dep.get('api_name') == 'create_subtasks_with_loading')
+    values = {component['id']: component.get('props', {}).get('value') for component in render_config['components']}
+    return create, values
+
+
+def choice_values(update):
+    return [choice[1] for choice in (update or {}).get('choices') or []]
+
+
+def run_flow(client, queue, ids, rng, backend, user_id, iteration, record):
+    """Ein kompletter Ablauf eines Benutzers; liefert True, wenn Aufgaben angelegt wurden"""
+    def timed(event, fn):
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            record(event, time.perf_counter() - started, f"{type(e).__name__}: {e}")
+            raise
+        record(event, time.perf_counter() - started, None)
+        return result
+
+    workspaces, _ = timed('load_initial_choices', lambda: client.predict(api_name='/load_initial_choices'))
+    workspace_gid = rng.choice(choice_values(workspaces) or [None])
+    projects = timed('update_project_choices', lambda: client.predict(workspace_gid, api_name='/update_project_choices'))
+    project_gid = rng.choice(choice_values(projects) or [None])
+    parents, suggested = timed('update_tasks_on_project_change',
+                               lambda: client.predict(workspace_gid, project_gid, api_name='/update_tasks_on_project_change'))
+    text = protocol_text(rng, backend, user_id, iteration)
+    analysis = timed('analyze_protocol_with_loading',
+                     lambda: client.predict(text, workspace_gid, project_gid, None, api_name='/analyze_protocol_with_loading'))
+    info = (analysis[0] or {}).get('value', '') if isinstance(analysis[0], dict) else str(analysis[0] or '')
+    if '❌' in info:
+        record('analyze_protocol_with_loading', 0.0, info.strip().splitlines()[0], counted=False)
+        return False
+    suggested_value = (analysis[2] or {}).get('value') if isinstance(analysis[2], dict) else None
+    parent_gid = suggested_value or rng.choice(choice_values(parents) or [None])
+
+    output = timed('render_task_editor', lambda: queue.call(ids['render_fn'], [None, None]))
+    create, values = editor_values(output['render_config'])
+    if not any(v for cid, v in values.items() if cid in create['inputs']):
+        record('render_task_editor', 0.0, "Analyse ohne Aufgaben", counted=False)
+        return False
+    known = {ids['workspace']: workspace_gid, ids['project']: project_gid, ids['parent']: parent_gid}
+    data = [known.get(cid, values.get(cid)) for cid in create['inputs']]
+    trigger_id = create['targets'][0][0] if create.get('targets') else None
+    result = timed('create_subtasks', lambda: queue.call(create['id'], data, trigger_id))
+    status = (result.get('data') or [{}])[0]
+    status = status.get('value', '') if isinstance(status, dict) else str(status or '')
+    failed = status.count('❌')
+    if failed or '✅' not in status:
+        record('create_subtasks', 0.0, f"{failed} Aufgaben nicht angelegt" if failed else status.strip()[:120], counted=False)
+        return False
+    return True
+
+
+def run_user(app_url, ids, backend, args, user_id, record):
+    """Simulierter Benutzer: verbindet sich und durchläuft --iterations Abläufe"""
+    rng = random.Random(args.seed * 1000 + user_id)
+    completed = 0
+    started = time.perf_counter()
+    try:
+        client = connect(app_url, args.request_timeout)
+    except Exception as e:
+        record('connect', time.perf_counter() - started, f"{type(e).__name__}: {e}")
+        return completed
+    record('connect', time.perf_counter() - started, None)
+    queue = QueueSession(client, args.request_timeout)
+    try:
+        for iteration in range(args.iterations):
+            try:
+                if run_flow(client, queue, ids, rng, backend, user_id, iteration, record):
+                    completed += 1
+            except Exception:
+                pass  # bereits beim Event gezählt; nächster Ablauf beginnt von vorn
+            if args.think_time > 0:
+                time.sleep(rng.uniform(0, 2 * args.think_time))
+    finally:
+        queue.close()
+        client.close()
+    return completed
+
+
+def percentile(sorted_values, p):
+    """Nearest-Rank-Perzentil"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples):
+    events = {}
+    for event in EVENTS:
+        durations = sorted(seconds for name, seconds, error, counted in samples if name == event and counted and error is None)
+        errors = [error for name, _, error, _ in samples if name == event and error is not None]
+        if not durations and not errors:
+            continue
+        entry = {'count': len(durations), 'errors': len(errors)}
+        for p in PERCENTILES:
+            entry[f"p{p}"] = percentile(durations, p)
+        entry['mean'] = statistics.fmean(durations) if durations else None
+        if errors:
+            entry['error_samples'] = [message for message, _ in Counter(errors).most_common(3)]
+        events[event] = entry
+    return events
+
+
+def run_level(app_url, ids, backend, args, users):
+    samples = []
+    lock = threading.Lock()
+
+    def record(event, seconds, error, counted=True):
+        with lock:
+            samples.append((event, seconds, error, counted))
+
+    backend.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        completed = sum(pool.map(lambda user_id: run_user(app_url, ids, backend, args, user_id, record), range(users)))
+    wall = time.perf_counter() - started
+    flows = users * args.iterations
+    return {
+        'users': users,
+        'flows': flows,
+        'flows_completed': completed,
+        'flows_failed': flows - completed,
+        'wall_seconds': wall,
+        'throughput_per_s': completed / wall if wall > 0 else None,
+        'events': summarize(samples),
+        'backend': backend.snapshot(),
+    }
+
+
+def print_level(level, out):
+    print(f"\n== {level['users']} Benutzer: {level['flows_completed']}/{level['flows']} Abläufe in "
+          f"{level['wall_seconds']:.1f}s, {level['throughput_per_s'] or 0:.2f} Abläufe/s", file=out)
+    print(f"{'Event':34} {'n':>5} {'Fehler':>6} {'p50':>8} {'p95':>8} {'p99':>8}", file=out)
+    for event, entry in level['events'].items():
+        cells = [f"{entry[f'p{p}']:8.3f}" if entry[f'p{p}'] is not None else f"{'-':>8}" for p in PERCENTILES]
+        print(f"{event:34} {entry['count']:5d} {entry['errors']:6d} {' '.join(cells)}", file=out)
+        for message in entry.get('error_samples', []):
+            print(f"    ! {message[:110]}", file=out)
+    injected = {route: counts for route, counts in level['backend'].items() if {'429', '5xx', 'lost', 'duplicates'} & set(counts)}
+    for route, counts in injected.items():
+        print(f"    Fake-Server {route}: {counts.get('requests', 0)} Requests, "
+              f"{counts.get('429', 0)}x 429, {counts.get('5xx', 0)}x 5xx, {counts.get('lost', 0)}x 5xx nach Anlage, "
+              f"{counts.get('duplicates', 0)} Duplikate", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', default='1,5,10', help="Stufen gleichzeitiger Benutzer, kommagetrennt")
+    parser.add_argument('--iterations', type=int, default=3, help="Abläufe je Benutzer und Stufe")
+    parser.add_argument('--think-time', type=float, default=0.0, help="mittlere Pause zwischen zwei Abläufen (s)")
+    parser.add_argument('--request-timeout', type=float, default=300.0, help="Timeout je Event (s)")
+    parser.add_argument('--seed', type=int, default=20250101)
+    parser.add_argument('--output', help="JSON-Ergebnis in diese Datei schreiben")
+    app_group = parser.add_argument_group('App')
+    app_group.add_argument('--app-url', help="bereits laufende App testen statt test.py zu starten")
+    app_group.add_argument('--app-port', type=int, default=7861)
+    app_group.add_argument('--async-handlers', action='store_true', help="App mit ASYNC_HANDLERS=1 starten")
+    app_group.add_argument('--llm-cache', action='store_true', help="LLM-Cache der App eingeschaltet lassen")
+    app_group.add_argument('--app-env', action='append', default=[], metavar='KEY=VALUE', help="zusätzliche Umgebungsvariable für die App")
+    app_group.add_argument('--startup-timeout', type=float, default=120.0)
+    fake = parser.add_argument_group('Fake-Server')
+    fake.add_argument('--backend-port', type=int, default=0, help="0 = freier Port")
+    fake.add_argument('--serve-only', action='store_true', help="nur den Fake-Server starten und laufen lassen")
+    fake.add_argument('--latency-ms', type=float, default=80.0, help="Latenz je Request")
+    fake.add_argument('--jitter', type=float, default=0.5, help="relative Streuung der Latenzen (0.5 = ±50%%)")
+    fake.add_argument('--error-rate', type=float, default=0.0, help="Anteil 503-Antworten")
+    fake.add_argument('--rate-limit-rate', type=float, default=0.0, help="Anteil 429-Antworten")
+    fake.add_argument('--lost-response-rate', type=float, default=0.0,
+                      help="Anteil der Anlage-Requests, die anlegen und trotzdem mit 503 antworten")
+    fake.add_argument('--retry-after', type=int, default=1, help="Retry-After der 429-Antworten (s)")
+    fake.add_argument('--workspaces', type=int, default=2)
+    fake.add_argument('--projects', type=int, default=8, help="Projekte je Workspace")
+    fake.add_argument('--asana-users', type=int, default=200)
+    fake.add_argument('--project-tasks', type=int, default=500, help="offene Aufgaben je Projekt")
+    fake.add_argument('--llm-tasks', type=int, default=6, help="Aufgaben je KI-Antwort")
+    fake.add_argument('--llm-first-token-ms', type=float, default=800.0)
+    fake.add_argument('--llm-chunk-ms', type=float, default=15.0, help="Pause zwischen zwei Stream-Chunks")
+    fake.add_argument('--llm-chunk-chars', type=int, default=24)
+    args = parser.parse_args()
+
+    backend = FakeBackend(args)
+    backend_url = start_backend(backend, args.backend_port)
+    if args.serve_only:
+        print(f"ASANA_BASE_URL={backend_url}/asana/api/1.0")
+        print(f"OPENAI_API_BASE={backend_url}/openai/v1")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return 0
+
+    levels = [int(value) for value in args.users.split(',') if value.strip()]
+    process = None
+    with tempfile.TemporaryDirectory(prefix='load-test-') as workdir:
+        app_url = args.app_url
+        log_path = None
+        if not app_url:
+            process, app_url, log_path = start_app(args, backend_url, workdir)
+        try:
+            wait_for_app(app_url, process, time.monotonic() + args.startup_timeout)
+            probe = connect(app_url, args.request_timeout)
+            ids = component_ids(probe.config)
+            probe.close()
+            report = {
+                'meta': {
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'git_revision': git_revision(),
+                    'python': sys.version.split()[0],
+                    'app_url': app_url,
+                    'config': {key: value for key, value in vars(args).items() if key not in ('output', 'serve_only')},
+                },
+                'levels': [],
+            }
+            for users in levels:
+                level = run_level(app_url, ids, backend, args, users)
+                report['levels'].append(level)
+                print_level(level, sys.stderr)
+        except Exception:
+            if log_path and os.path.exists(log_path):
+                with open(log_path, errors='replace') as log:
+                    sys.stderr.write(log.read()[-3000:])
+            raise
+        finally:
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
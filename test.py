@@ -1,44 +1,799 @@
 import os
+import sys
+import time
+# Startzeitpunkt für die Messung "Prozessstart bis Port lauscht"
+_PROCESS_START = time.perf_counter()
 import gradio as gr
 import asana
 from asana.rest import ApiException
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import re
-import openai
+import hashlib
+import sqlite3
 from pydantic import BaseModel, ConfigDict
 import difflib
-import pandas as pd
-import docx
-
-# Debug-Logging-Funktion
-def debug_log(message):
-    with open("debug.log", "a", encoding="utf-8") as f:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        f.write(f"[{timestamp}] {message}\n")
+import threading
+import random
+import queue
+import atexit
+import logging
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+import argparse
+from collections import OrderedDict, Counter, defaultdict
+import urllib3
+import bisect
+import math
+import unicodedata
+import asyncio
+import weakref
+import contextlib
+import functools
+import inspect
+import hmac
+import io
+import cProfile
+import pstats
+# pandas, docx, openai, tiktoken und numpy/scipy werden erst bei der ersten Verwendung importiert (schnellerer Start)
 
 # Lade Umgebungsvariablen
 load_dotenv()
 
-# OpenAI API Key setzen
-openai.api_key = os.getenv('OPENAI_API_KEY')
+# Debug-Logging: Handler-Aufrufe legen Datensätze nur in eine Queue, ein Hintergrund-Thread
+# schreibt sie gepuffert in debug.log, flusht gesammelt und rotiert nach Dateigröße.
+LOG_FILE = os.getenv('LOG_FILE', 'debug.log')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 3))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 1.0))
+# Von den Workspace-Benutzern wird nur jeder n-te geloggt (0 = keiner)
+LOG_USER_SAMPLE_EVERY = int(os.getenv('LOG_USER_SAMPLE_EVERY', 25))
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler, der nicht nach jedem Datensatz flusht, sondern nur über flush_now()"""
+
+    def flush(self):
+        pass
+
+    def flush_now(self):
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.flush()
+        finally:
+            self.release()
+
+class LazyJson:
+    """Formatiert ein Objekt erst beim Schreiben des Log-Eintrags als JSON"""
+    __slots__ = ('obj', 'indent')
+
+    def __init__(self, obj, indent=None):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self):
+        return json.dumps(self.obj, ensure_ascii=False, indent=self.indent, default=str)
+
+def _setup_logging():
+    logger = logging.getLogger('meeting2asana')
+    if logger.handlers:
+        return logger
+    file_handler = BufferedRotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s %(message)s", "%Y-%m-%d %H:%M:%S"))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    stop = threading.Event()
+
+    def flush_loop():
+        while not stop.wait(LOG_FLUSH_INTERVAL):
+            file_handler.flush_now()
+
+    def shutdown():
+        stop.set()
+        listener.stop()
+        file_handler.flush_now()
+        file_handler.close()
+
+    threading.Thread(target=flush_loop, name='log-flush', daemon=True).start()
+    atexit.register(shutdown)
+    return logger
+
+logger = _setup_logging()
+
+# Debug-Logging-Funktion
+def debug_log(message, *args, level=logging.DEBUG):
+    """Loggt eine Nachricht; %-Argumente werden nur formatiert, wenn der Level aktiv ist"""
+    logger.log(level, message, *args)
+
+# HTTP-Verbindungen: je Dienst ein gemeinsamer, thread-sicherer Pool mit Keep-Alive,
+# damit parallele Gradio-Handler Verbindungen wiederverwenden statt neue TLS-Handshakes
+ASANA_POOL_SIZE = int(os.getenv('ASANA_POOL_SIZE', 16))
+OPENAI_POOL_SIZE = int(os.getenv('OPENAI_POOL_SIZE', 8))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+ASANA_READ_TIMEOUT = float(os.getenv('ASANA_READ_TIMEOUT', 30))
+OPENAI_READ_TIMEOUT = float(os.getenv('OPENAI_READ_TIMEOUT', 120))
+# Für Tests gegen lokale Stellvertreter-Server; OpenAI liest dafür OPENAI_API_BASE
+ASANA_BASE_URL = os.getenv('ASANA_BASE_URL', 'https://app.asana.com/api/1.0')
+
+class HTTPPoolStats:
+    """Zählt Anfragen und neu aufgebaute Verbindungen eines Dienstes (thread-sicher)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'pool_hits': max(self.requests - self.new_connections, 0)
+            }
+
+http_pool_stats = {'asana': HTTPPoolStats(), 'openai': HTTPPoolStats()}
+
+def _counting_pool_classes(stats, default_timeout):
+    """urllib3-Poolklassen, die Anfragen und neue Verbindungen in stats zählen.
+    Ohne eigenen Timeout (None) gilt default_timeout statt unbegrenzt zu warten."""
+    def counting(base):
+        class CountingConnectionPool(base):
+            def _new_conn(self):
+                stats.count('new_connections')
+                return super()._new_conn()
+
+            def urlopen(self, method, url, *args, **kwargs):
+                stats.count('requests')
+                if kwargs.get('timeout') is None:
+                    kwargs['timeout'] = default_timeout
+                return super().urlopen(method, url, *args, **kwargs)
+        return CountingConnectionPool
+    return {'http': counting(urllib3.HTTPConnectionPool), 'https': counting(urllib3.HTTPSConnectionPool)}
+
+def create_asana_client(pool_size=None, connect_timeout=None, read_timeout=None):
+    """Asana-ApiClient mit begrenztem Verbindungspool und Standard-Timeouts; sicher für parallele Threads.
+    Einzelne Aufrufe können den Timeout weiterhin mit _request_timeout überschreiben."""
+    configuration = asana.Configuration()
+    configuration.access_token = os.getenv('ASANA_API_TOKEN')
+    configuration.host = ASANA_BASE_URL
+    configuration.connection_pool_maxsize = pool_size or ASANA_POOL_SIZE
+    client = asana.ApiClient(configuration)
+    timeout = urllib3.Timeout(connect=connect_timeout or HTTP_CONNECT_TIMEOUT, read=read_timeout or ASANA_READ_TIMEOUT)
+    client.rest_client.pool_manager.pool_classes_by_scheme = _counting_pool_classes(http_pool_stats['asana'], timeout)
+    return client
+
+def create_openai_session(pool_size=None):
+    """Gemeinsame requests-Session für openai (statt einer Session pro Thread)"""
+    import requests
+
+    class SharedSession(requests.Session):
+        # openai schließt seine Session je Thread nach einigen Minuten; der gemeinsame Pool bleibt offen
+        def close(self):
+            pass
+
+    session = SharedSession()
+    pool_size = pool_size or OPENAI_POOL_SIZE
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=2)
+    timeout = urllib3.Timeout(connect=HTTP_CONNECT_TIMEOUT, read=OPENAI_READ_TIMEOUT)
+    adapter.poolmanager.pool_classes_by_scheme = _counting_pool_classes(http_pool_stats['openai'], timeout)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)  # z. B. lokale Stellvertreter über OPENAI_API_BASE
+    return session
+
+def get_http_pool_stats():
+    """Anfragen, neue Verbindungen und Pool-Treffer je Dienst"""
+    return {name: stats.snapshot() for name, stats in http_pool_stats.items()}
+
+def _log_http_pool_stats():
+    debug_log("HTTP-Pools: %s", LazyJson(get_http_pool_stats()), level=logging.INFO)
+
+# Laufzeitmetriken je Verarbeitungsschritt (Histogramme) und Zähler für Cache, Retries und Fehler,
+# im Prometheus-Textformat unter /metrics. Eigene kleine Umsetzung statt prometheus_client,
+# damit keine weitere Abhängigkeit nötig ist. /metrics umgeht den Gradio-Login und wird daher nur
+# mit METRICS_TOKEN eingehängt (Abruf per Bearer-Token); ohne Token werden Metriken nur intern gesammelt.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_BUCKETS = tuple(float(b) for b in os.getenv('METRICS_BUCKETS', '0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60,120').split(','))
+
+class SpanTimer:
+    """Laufzeit eines Spans ohne die mit paused() ausgenommenen Abschnitte"""
+    __slots__ = ('started', 'excluded')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.excluded = 0.0
+
+    @contextlib.contextmanager
+    def paused(self):
+        """In Generatoren um yield: die Zeit beim Verbraucher zählt nicht zum Schritt"""
+        paused_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.excluded += time.perf_counter() - paused_at
+
+    def elapsed(self):
+        return time.perf_counter() - self.started - self.excluded
+
+class Metrics:
+    """Thread-sichere Histogramme und Zähler mit Labels; render() liefert das Prometheus-Textformat.
+
+    Ist die Sammlung abgeschaltet, sind observe/inc/span wirkungslos. Collectors sind Funktionen,
+    die beim Abruf zusätzliche Zählerstände als (Name, Labels, Wert) liefern (z. B. Cache-Statistik).
+    """
+
+    def __init__(self, buckets, enabled=True):
+        self.buckets = tuple(sorted(buckets))
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> [Anzahl je Bucket ..., Anzahl > letzter Bucket]
+        self._sums = defaultdict(float)
+        self._counters = defaultdict(float)
+        self._help = {}
+        self._collectors = []
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        pos = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0] * (len(self.buckets) + 1)
+            counts[pos] += 1
+            self._sums[key] += value
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        """Misst die Dauer eines Schritts; Ausnahmen zählen als Fehler, Abbrüche als cancelled.
+        Liefert einen SpanTimer, dessen paused() Abschnitte ausnimmt."""
+        timer = SpanTimer()
+        outcome = 'ok'
+        try:
+            yield timer
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = 'cancelled'
+            raise
+        except BaseException:
+            outcome = 'error'
+            self.inc('app_failures_total', stage=stage)
+            raise
+        finally:
+            self.observe('app_stage_duration_seconds', timer.elapsed(), stage=stage, outcome=outcome)
+
+    def timed(self, stage):
+        """Decorator: span() um jeden Aufruf, für normale und async-Funktionen"""
+        def decorate(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(stage):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = []
+        for k, v in pairs:
+            value = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{k}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self):
+        with self._lock:
+            histograms = {key: list(counts) for key, counts in self._histograms.items()}
+            sums = dict(self._sums)
+            counters = dict(self._counters)
+        for collector in self._collectors:
+            try:
+                for name, labels, value in collector():
+                    counters[(name, tuple(sorted(labels.items())))] = value
+            except Exception as e:
+                debug_log("Metrik-Collector fehlgeschlagen: %s", e, level=logging.WARNING)
+        families = defaultdict(list)
+        for key in histograms:
+            families[key[0]].append(key)
+        for key in counters:
+            families[key[0]].append(key)
+        lines = []
+        for name in sorted(families):
+            kind, text = self._help.get(name, ('histogram' if name in {k[0] for k in histograms} else 'counter', ''))
+            if text:
+                lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key in sorted(families[name]):
+                labels = key[1]
+                if key in histograms:
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float('inf'),), histograms[key]):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f"{name}_bucket{self._format_labels(labels, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {sums[key]}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {cumulative}")
+                else:
+                    value = counters[key]
+                    lines.append(f"{name}{self._format_labels(labels)} {int(value) if float(value).is_integer() else value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics(METRICS_BUCKETS, enabled=METRICS_ENABLED)
+metrics.describe('app_stage_duration_seconds', 'histogram', "Dauer je Verarbeitungsschritt (stage) und Ergebnis (outcome)")
+metrics.describe('app_failures_total', 'counter', "Fehlgeschlagene Schritte je stage")
+metrics.describe('app_retries_total', 'counter', "Wiederholte Aufrufe nach 429/5xx")
+metrics.describe('app_duplicates_avoided_total', 'counter', "Nach 5xx bzw. Batch-Fallback schon angelegte Aufgaben, die nicht erneut gesendet wurden")
+metrics.describe('app_cache_requests_total', 'counter', "Cache-Abfragen nach Cache, Typ und Ergebnis")
+metrics.describe('app_llm_tokens_total', 'counter', "Tokens der KI-Analyse (prompt/completion, geschätzt über count_tokens)")
+metrics.describe('app_http_requests_total', 'counter', "HTTP-Requests je Dienst")
+metrics.describe('app_http_new_connections_total', 'counter', "Neu aufgebaute HTTP-Verbindungen je Dienst")
+
+def _http_pool_metrics():
+    for service, snapshot in get_http_pool_stats().items():
+        yield 'app_http_requests_total', {'service': service}, snapshot['requests']
+        yield 'app_http_new_connections_total', {'service': service}, snapshot['new_connections']
+
+metrics.add_collector(_http_pool_metrics)
+
+# Profiling einzelner Handler-Aufrufe (opt-in), z. B. wenn jemand meldet "das hat eine Minute gedauert":
+# PROFILE_HANDLERS=analyze_protocol_with_loading,... (oder "all") profiliert diese Handler dauerhaft,
+# bei gesetztem PROFILE_TOKEN reicht der Header X-Profile-Token für genau einen Aufruf.
+# Ergebnis je Aufruf: <id>.prof (pstats, z. B. für snakeviz) und <id>.json (Metadaten, Top-Funktionen).
+PROFILE_HANDLERS = {name.strip() for name in os.getenv('PROFILE_HANDLERS', '').split(',') if name.strip()}
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 1.0))
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_HEADER = 'x-profile-token'
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 50))
+PROFILE_TOP_FUNCTIONS = int(os.getenv('PROFILE_TOP_FUNCTIONS', 30))
+
+class ProfileStore:
+    """Ablage der Profile; über max_files hinaus werden die ältesten gelöscht (thread-sicher)"""
+
+    NAME_PATTERN = re.compile(r'^[\w.-]+\.(prof|json)$')
+
+    def __init__(self, directory, max_files):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile_id, profiler, meta):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.directory, f"{profile_id}.prof"))
+            with open(os.path.join(self.directory, f"{profile_id}.json"), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            self._prune()
+
+    def _prune(self):
+        # Lock muss gehalten werden; IDs beginnen mit dem Zeitstempel, sortieren also chronologisch
+        ids = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+        for profile_id in ids[:max(len(ids) - self.max_files, 0)]:
+            for suffix in ('.prof', '.json'):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+
+    def list(self):
+        """Metadaten aller Profile, neueste zuerst"""
+        if not os.path.isdir(self.directory):
+            return []
+        metas = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                meta.pop('top_functions', None)
+                metas.append(meta)
+        return metas
+
+    def path(self, name):
+        """Pfad zu einer Profil-Datei oder None (nur Dateinamen aus dieser Ablage)"""
+        if not self.NAME_PATTERN.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+profile_store = ProfileStore(PROFILE_DIR, PROFILE_MAX_FILES)
+
+# cProfile hängt sich an den ganzen Thread (ab Python 3.12 über sys.monitoring an den ganzen Prozess):
+# je Event-Loop bzw. Prozess darf deshalb nur ein profilierter Aufruf laufen, weitere laufen ohne Profil.
+# Ein zweites enable() würde sonst den Hook des ersten ersetzen (ab 3.12: ValueError im Handler).
+_profile_scopes = set()
+_profile_scopes_lock = threading.Lock()
+
+def _profile_scope(is_async):
+    """Bereich, in dem sich Profiler gegenseitig stören: Prozess (ab 3.12), Event-Loop oder None"""
+    if sys.version_info >= (3, 12):
+        return 'process'
+    if is_async:
+        return asyncio.get_running_loop()
+    # Synchrone Schritte schalten den Profiler auf ihrem Worker-Thread ohne Unterbrechung ein und aus
+    return None
+
+def _claim_profile_scope(scope):
+    if scope is None:
+        return True
+    with _profile_scopes_lock:
+        if scope in _profile_scopes:
+            return False
+        _profile_scopes.add(scope)
+        return True
+
+def _release_profile_scope(scope):
+    if scope is not None:
+        with _profile_scopes_lock:
+            _profile_scopes.discard(scope)
+
+def _current_request():
+    """gr.Request des laufenden Events (Gradio setzt ihn vor jedem Schritt des Handlers)"""
+    from gradio.context import LocalContext
+    return LocalContext.request.get()
+
+class _ProfiledCall:
+    """Ein profilierter Handler-Aufruf; step() schaltet den Profiler je Schritt ein, weil Gradio
+    die Schritte eines Generators auf wechselnden Worker-Threads ausführt."""
+
+    def __init__(self, handler, trigger, args, request, scope=None):
+        self.scope = scope
+        self.profiler = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.profiled_seconds = 0.0
+        self.steps = 0
+        self.id = f"{datetime.now():%Y%m%d-%H%M%S}-{handler}-{os.urandom(3).hex()}"
+        self.meta = {
+            'id': self.id,
+            'handler': handler,
+            'trigger': trigger,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            # Nur Typ und Länge, keine Inhalte (Protokolle können vertraulich sein)
+            'args': [type(arg).__name__ + (f"[{len(arg)}]" if isinstance(arg, (str, list, tuple, dict)) else "") for arg in args],
+            'session_hash': getattr(request, 'session_hash', None),
+            'username': getattr(request, 'username', None),
+            'client': getattr(getattr(request, 'client', None), 'host', None),
+            'user_agent': request.headers.get('user-agent') if request is not None else None,
+            'pid': os.getpid(),
+        }
+
+    @contextlib.contextmanager
+    def step(self):
+        started = time.perf_counter()
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+            self.steps += 1
+            self.profiled_seconds += time.perf_counter() - started
+
+    def finish(self, error=None, is_async=False):
+        _release_profile_scope(self.scope)
+        wall_seconds = time.perf_counter() - self.started
+        if error is None:
+            outcome = 'ok'
+        elif isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+            outcome = 'cancelled'
+        else:
+            outcome = 'error'
+        summary = io.StringIO()
+        pstats.Stats(self.profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        self.meta.update({
+            'wall_seconds': round(wall_seconds, 4),
+            'profiled_seconds': round(self.profiled_seconds, 4),
+            'steps': self.steps,
+            'outcome': outcome,
+            'error': None if outcome == 'ok' else f"{type(error).__name__}: {error}",
+            # cProfile sieht nur den Thread des Handlers: Arbeit in Thread-Pools erscheint als Warten
+            # (wait/as_completed), bei Async-Handlern laufen andere Coroutinen des Loops mit ins Profil
+            'async': is_async,
+            'top_functions': summary.getvalue(),
+        })
+        try:
+            profile_store.save(self.id, self.profiler, self.meta)
+            debug_log("Profil %s gespeichert (%s, %.2fs)", self.id, outcome, self.meta['wall_seconds'], level=logging.INFO)
+        except OSError as e:
+            debug_log("Profil %s nicht speicherbar: %s", self.id, e, level=logging.WARNING)
+
+def _start_profile(handler, args, is_async=False):
+    """_ProfiledCall, wenn dieser Aufruf profiliert werden soll (Header oder PROFILE_HANDLERS) und kein
+    anderer im selben Bereich läuft, sonst None"""
+    request = _current_request()
+    trigger = None
+    if PROFILE_TOKEN and request is not None:
+        token = request.headers.get(PROFILE_HEADER) or ''
+        if token and hmac.compare_digest(token, PROFILE_TOKEN):
+            trigger = 'header'
+    if trigger is None and (handler in PROFILE_HANDLERS or 'all' in PROFILE_HANDLERS) and random.random() < PROFILE_SAMPLE_RATE:
+        trigger = 'env'
+    if trigger is None:
+        return None
+    scope = _profile_scope(is_async)
+    if not _claim_profile_scope(scope):
+        debug_log("Profil für %s übersprungen: es läuft bereits ein profilierter Aufruf", handler, level=logging.INFO)
+        return None
+    return _ProfiledCall(handler, trigger, args, request, scope)
+
+def profiled(handler):
+    """Decorator für Gradio-Handler: profiliert einzelne Aufrufe auf Anforderung. Die Art der Funktion
+    (Generator, Coroutine, ...) bleibt erhalten, weil Gradio daran das Streaming-Verhalten festmacht."""
+    def decorate(fn):
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def asyncgen_wrapper(*args, **kwargs):
+                call = _start_profile(handler, args, is_async=True)
+                if call is None:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                    return
+                iterator = fn(*args, **kwargs)
+                error = None
+                try:
+                    while True:
+                        with call.step():
+                            try:
+                                item = await iterator.__anext__()
+                            except StopAsyncIteration:
+                                break
+                        yield item
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    await iterator.aclose()
+                    call.finish(error, is_async=True)
+            return asyncgen_wrapper
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                call = _start_profile(handler, args)
+                if call is None:
+                    return (yield from fn(*args, **kwargs))
+                iterator = fn(*args, **kwargs)
+                error = None
+                try:
+                    while True:
+                        with call.step():
+                            try:
+                                item = next(iterator)
+                            except StopIteration:
+                                break
+                        yield item
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    iterator.close()
+                    call.finish(error)
+            return gen_wrapper
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                call = _start_profile(handler, args, is_async=True)
+                if call is None:
+                    return await fn(*args, **kwargs)
+                error = None
+                try:
+                    with call.step():
+                        return await fn(*args, **kwargs)
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    call.finish(error, is_async=True)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call = _start_profile(handler, args)
+            if call is None:
+                return fn(*args, **kwargs)
+            error = None
+            try:
+                with call.step():
+                    return fn(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                call.finish(error)
+        return wrapper
+    return decorate
+
+# Async-Handler (ASYNC_HANDLERS=1): KI-Analyse, Anlegen und Metadaten laufen als Coroutinen auf
+# dem Event-Loop von Gradio, statt je Nutzer einen Worker-Thread für die Dauer der Netzwerkaufrufe
+# zu blockieren. Asana wird dafür direkt über httpx angesprochen, OpenAI über ChatCompletion.acreate.
+ASYNC_HANDLERS = os.getenv('ASYNC_HANDLERS', '').lower() in ('1', 'true', 'yes')
+# aiohttp kennt keinen Lese-Timeout je Chunk, nur eine Gesamtdauer für die gestreamte Antwort
+OPENAI_ASYNC_TOTAL_TIMEOUT = float(os.getenv('OPENAI_ASYNC_TOTAL_TIMEOUT', 300))
+
+class AsyncAsanaClient:
+    """Asynchroner Zugriff auf die Asana-REST-API über httpx, mit denselben Pool-Grenzen und
+    Timeouts wie der synchrone Client. HTTP-Fehler werden als ApiException (mit status, body
+    und headers) geworfen, damit Retry und Fallbacks unverändert greifen."""
+
+    def __init__(self, pool_size=None, connect_timeout=None, read_timeout=None, base_url=None):
+        import httpx
+        pool_size = pool_size or ASANA_POOL_SIZE
+        self._stats = http_pool_stats['asana']
+        self._client = httpx.AsyncClient(
+            base_url=base_url or ASANA_BASE_URL,
+            headers={'Authorization': f"Bearer {os.getenv('ASANA_API_TOKEN')}", 'Accept': 'application/json'},
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout or ASANA_READ_TIMEOUT, connect=connect_timeout or HTTP_CONNECT_TIMEOUT)
+        )
+
+    async def _trace(self, event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            self._stats.count('new_connections')
+
+    async def request(self, method, path, params=None, data=None):
+        """Ein Request; liefert die komplette JSON-Antwort ('data' und ggf. 'next_page' bzw. 'sync')"""
+        self._stats.count('requests')
+        response = await self._client.request(
+            method, path, params=params, json=None if data is None else {'data': data},
+            extensions={'trace': self._trace}
+        )
+        if response.status_code >= 400:
+            error = ApiException(status=response.status_code, reason=response.reason_phrase)
+            error.body = response.text
+            error.headers = response.headers
+            raise error
+        return response.json()
+
+    async def iter_items(self, path, params=None, item_limit=None):
+        """Einträge einer Liste Seite für Seite, wie die PageIterator des SDK"""
+        params = dict(params or {})
+        params.setdefault('limit', 100)
+        count = 0
+        while True:
+            payload = await self.request('GET', path, params)
+            for item in payload.get('data') or []:
+                yield item
+                count += 1
+                if item_limit and count >= item_limit:
+                    return
+            next_page = payload.get('next_page') or {}
+            if not next_page.get('offset'):
+                return
+            params['offset'] = next_page['offset']
+
+    async def aclose(self):
+        await self._client.aclose()
+
+# httpx- und aiohttp-Pools sind an ihren Event-Loop gebunden: ein Client je Loop
+_async_asana_clients = weakref.WeakKeyDictionary()
+_async_openai_sessions = weakref.WeakKeyDictionary()
+
+def get_async_asana():
+    """AsyncAsanaClient des laufenden Event-Loops"""
+    loop = asyncio.get_running_loop()
+    client = _async_asana_clients.get(loop)
+    if client is None:
+        client = _async_asana_clients[loop] = AsyncAsanaClient()
+    return client
+
+def create_openai_aiosession(pool_size=None):
+    """aiohttp-Session für ChatCompletion.acreate mit begrenztem Pool; zählt wie die requests-Session mit"""
+    import aiohttp
+    stats = http_pool_stats['openai']
+
+    async def on_request_start(session, context, params):
+        stats.count('requests')
+
+    async def on_connection_create_end(session, context, params):
+        stats.count('new_connections')
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    connector = aiohttp.TCPConnector(limit=pool_size or OPENAI_POOL_SIZE)
+    return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+_openai = None
+_openai_lock = threading.Lock()
+
+def get_openai():
+    """Importiert openai beim ersten Aufruf, setzt den API Key und die gemeinsame Session"""
+    global _openai
+    if _openai is None:
+        with _openai_lock:
+            if _openai is None:
+                import openai
+                # OpenAI API Key setzen
+                openai.api_key = os.getenv('OPENAI_API_KEY')
+                openai.requestssession = create_openai_session()
+                _openai = openai
+    return _openai
+
+def get_async_openai():
+    """Wie get_openai, setzt zusätzlich die aiohttp-Session des laufenden Event-Loops für acreate"""
+    openai = get_openai()
+    loop = asyncio.get_running_loop()
+    session = _async_openai_sessions.get(loop)
+    if session is None or session.closed:
+        session = _async_openai_sessions[loop] = create_openai_aiosession()
+    # openai liest die Session aus einer ContextVar, die Zuweisung gilt also nur für den aktuellen Task
+    openai.aiosession.set(session)
+    return openai
+
+async def close_async_clients():
+    """Schließt die Asana- und OpenAI-Pools des laufenden Event-Loops (für Skripte mit eigenem Loop)"""
+    loop = asyncio.get_running_loop()
+    client = _async_asana_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+    session = _async_openai_sessions.pop(loop, None)
+    if session is not None:
+        await session.close()
 
 # Asana Client konfigurieren (OpenAPI)
-configuration = asana.Configuration()
-configuration.access_token = os.getenv('ASANA_API_TOKEN')
-api_client = asana.ApiClient(configuration)
+api_client = create_asana_client()
+
+def _close_asana_thread_pool():
+    # Das SDK schließt seinen ThreadPool erst in __del__, beim Beenden des Interpreters zu spät
+    # (Tracebacks am Ende von Skripten wie "test.py bulk"); daher vorher schließen
+    pool = api_client.__dict__.pop('pool', None)
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+atexit.register(_close_asana_thread_pool)
+configuration = api_client.configuration
 workspaces_api = asana.WorkspacesApi(api_client)
 tasks_api = asana.TasksApi(api_client)
 projects_api = asana.ProjectsApi(api_client)
 users_api = asana.UsersApi(api_client)
+batch_api = asana.BatchAPIApi(api_client)
+events_api = asana.EventsApi(api_client)
 
 # Pydantic-Konfiguration für die Anwendung
 class Config:
     arbitrary_types_allowed = True
 
-# Anzahl maximal unterstützter Aufgaben
-MAX_TASKS = 10
+# Obergrenze für im Editor angezeigte Aufgaben (der Editor wird dynamisch gerendert)
+MAX_TASKS = int(os.getenv('MAX_TASKS', 200))
+# Beim Streamen wird bis TASK_RENDER_EAGER jede Aufgabe sofort angezeigt, danach in
+# Schritten von TASK_RENDER_BATCH (jedes Rendern überträgt den ganzen Editor)
+TASK_RENDER_EAGER = 10
+TASK_RENDER_BATCH = 10
 
 # Liste der auszuschließenden (externen) Mitglieder
 EXCLUDED_USERS = [
@@ -65,107 +820,1247 @@ EXCLUDED_USERS = [
     "Alexandra"
 ]
 
-def get_workspaces():
-    """Holt alle verfügbaren Workspaces"""
+# Cache für Asana-Metadaten (Workspaces, Projekte, Benutzer, Aufgaben)
+# TTL in Sekunden pro Eintragstyp, per Umgebungsvariable überschreibbar
+ASANA_CACHE_TTLS = {
+    'workspaces': float(os.getenv('ASANA_CACHE_TTL_WORKSPACES', 600)),
+    'projects': float(os.getenv('ASANA_CACHE_TTL_PROJECTS', 300)),
+    'users': float(os.getenv('ASANA_CACHE_TTL_USERS', 600)),
+    'tasks': float(os.getenv('ASANA_CACHE_TTL_TASKS', 60)),
+}
+# Abgeleitete Daten leben so lange wie die Aufgabenliste, aus der sie gebaut wurden
+ASANA_CACHE_TTLS['scorer'] = ASANA_CACHE_TTLS['tasks']
+ASANA_CACHE_TTLS['assignees'] = ASANA_CACHE_TTLS['users']
+ASANA_CACHE_MAX_ENTRIES = int(os.getenv('ASANA_CACHE_MAX_ENTRIES', 256))
+
+class _Flight:
+    """Laufende Abfrage, auf die parallele Aufrufer warten (Single-Flight)"""
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-sicherer In-Memory-Cache mit TTL pro Typ, LRU-Verdrängung und Single-Flight.
+
+    Gleichzeitige Anfragen nach demselben Schlüssel teilen sich eine einzige
+    Abfrage; Fehler werden an alle Wartenden weitergereicht, aber nicht gecacht.
+    """
+
+    def __init__(self, ttls, max_entries):
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (kind, key) -> (expires_at, value)
+        self._inflight = {}
+        self._async_inflight = {}  # (kind, key) -> asyncio.Task
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.lookups = Counter()  # (kind, 'hit'|'miss') -> Anzahl
+
+    def _cached(self, cache_key):
+        """Gültiger Eintrag oder _MISSING (Lock muss gehalten werden); zählt Treffer"""
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                self.lookups[(cache_key[0], 'hit')] += 1
+                return entry[1]
+            del self._entries[cache_key]
+        self.misses += 1
+        self.lookups[(cache_key[0], 'miss')] += 1
+        return _MISSING
+
+    def _store(self, cache_key, value):
+        # Lock muss gehalten werden
+        ttl = self.ttls.get(cache_key[0], 60)
+        self._entries[cache_key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_load(self, kind, key, loader):
+        """Gibt den gecachten Wert zurück oder lädt ihn genau einmal über loader()"""
+        cache_key = (kind, key)
+        with self._lock:
+            value = self._cached(cache_key)
+            if value is not _MISSING:
+                return value
+            flight = self._inflight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[cache_key] = flight
+                generation = self._generation
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                # Nur speichern, wenn zwischenzeitlich nicht invalidiert wurde
+                if generation == self._generation:
+                    self._store(cache_key, flight.value)
+            return flight.value
+        finally:
+            with self._lock:
+                if self._inflight.get(cache_key) is flight:
+                    del self._inflight[cache_key]
+            flight.event.set()
+
+    async def aget_or_load(self, kind, key, loader):
+        """Wie get_or_load für Coroutinen: loader ist eine async-Funktion, parallele Aufrufer
+        im selben Event-Loop warten auf denselben Task statt einen Thread zu blockieren"""
+        cache_key = (kind, key)
+        with self._lock:
+            value = self._cached(cache_key)
+            if value is not _MISSING:
+                return value
+            task = self._async_inflight.get(cache_key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = asyncio.ensure_future(self._aload(cache_key, loader, self._generation))
+                self._async_inflight[cache_key] = task
+        # shield: bricht ein Wartender ab (z. B. Browser geschlossen), lädt der Task für die anderen weiter
+        return await asyncio.shield(task)
+
+    async def _aload(self, cache_key, loader, generation):
+        try:
+            value = await loader()
+            with self._lock:
+                if generation == self._generation:
+                    self._store(cache_key, value)
+            return value
+        finally:
+            with self._lock:
+                if self._async_inflight.get(cache_key) is asyncio.current_task():
+                    del self._async_inflight[cache_key]
+
+    def put(self, kind, key, value):
+        """Legt einen Wert direkt ab (z.B. abgeleitete Daten, die neu berechnet wurden)"""
+        with self._lock:
+            self._store((kind, key), value)
+
+    def invalidate(self, kind=None, key=None):
+        """Entfernt Einträge: alle, alle eines Typs oder einen einzelnen Schlüssel"""
+        with self._lock:
+            self._generation += 1
+            if kind is None:
+                self._entries.clear()
+                self._inflight.clear()
+                self._async_inflight.clear()
+                return
+            if key is not None:
+                self._entries.pop((kind, key), None)
+                self._inflight.pop((kind, key), None)
+                self._async_inflight.pop((kind, key), None)
+                return
+            for cache_key in [k for k in self._entries if k[0] == kind]:
+                del self._entries[cache_key]
+            for pending in (self._inflight, self._async_inflight):
+                for cache_key in [k for k in pending if k[0] == kind]:
+                    del pending[cache_key]
+
+asana_cache = TTLCache(ASANA_CACHE_TTLS, ASANA_CACHE_MAX_ENTRIES)
+
+def _asana_cache_metrics():
+    with asana_cache._lock:
+        lookups = dict(asana_cache.lookups)
+    for (kind, result), count in lookups.items():
+        yield 'app_cache_requests_total', {'cache': 'asana', 'kind': kind, 'result': result}, count
+
+metrics.add_collector(_asana_cache_metrics)
+
+def _name_gid_pairs(items):
+    """(Name, GID)-Paare aus Asana-Antworten; unvollständige Einträge werden übersprungen"""
+    return [(item['name'], item['gid']) for item in items if isinstance(item, dict) and 'name' in item and 'gid' in item]
+
+@metrics.timed('asana.workspaces')
+def _fetch_workspaces():
+    return _name_gid_pairs(workspaces_api.get_workspaces({}))
+
+def _projects_opts(workspace_gid):
+    return {
+        'workspace': workspace_gid,
+        'archived': False,
+        'opt_fields': 'name,gid'
+    }
+
+@metrics.timed('asana.projects')
+def _fetch_projects(workspace_gid):
+    project_pairs = _name_gid_pairs(projects_api.get_projects(_projects_opts(workspace_gid)))
+    project_pairs.sort(key=lambda x: x[0])
+    return project_pairs
+
+def _users_opts(workspace_gid):
+    return {'workspace': workspace_gid, 'opt_fields': 'name,email,gid'}
+
+def _innpuls_user_records(users):
+    """(Name, GID, E-Mail) der @innpuls.at-Benutzer, sortiert nach Name"""
+    # Debug: Logge eine Stichprobe der User mit Name und E-Mail
+    if LOG_USER_SAMPLE_EVERY > 0 and logger.isEnabledFor(logging.DEBUG):
+        debug_log("%s User geladen, logge jeden %s.", len(users), LOG_USER_SAMPLE_EVERY)
+        for user in users[::LOG_USER_SAMPLE_EVERY]:
+            name = user.get('name', '') if isinstance(user, dict) else str(user)
+            email = user.get('email', '') if isinstance(user, dict) else ''
+            debug_log("User: %s | Email: %s", name, email)
+    user_pairs = []
+    for user in users:
+        if isinstance(user, dict) and 'name' in user and 'gid' in user:
+            email = user.get('email', '')
+            if email.endswith('@innpuls.at'):
+                # E-Mail wird für den Assignee-Index mitgecacht
+                user_pairs.append((user['name'], user['gid'], email))
+    user_pairs.sort(key=lambda x: x[0])
+    return user_pairs
+
+@metrics.timed('asana.users')
+def _fetch_workspace_users(workspace_gid):
+    return _innpuls_user_records(list(users_api.get_users(_users_opts(workspace_gid))))
+
+# Aufgabenlisten werden seitenweise geladen (Asana erlaubt max. 100 pro Seite);
+# ASANA_TASK_LIMIT > 0 bricht nach so vielen Aufgaben ab (sehr große Projekte)
+ASANA_TASK_PAGE_SIZE = min(int(os.getenv('ASANA_TASK_PAGE_SIZE', 100)), 100)
+ASANA_TASK_LIMIT = int(os.getenv('ASANA_TASK_LIMIT', 0))
+
+class TaskList:
+    """Offene Aufgaben eines Projekts, nach Namen sortiert (ohne Groß-/Kleinschreibung).
+
+    Hält nur drei parallele Listen (Sortierschlüssel, Namen, GIDs) statt Dicts pro Aufgabe;
+    Suche nach Name oder Namensanfang per bisect. Iteriert wie bisher als (Name, GID)-Paare.
+    """
+
+    __slots__ = ('_keys', 'names', 'gids')
+
+    def __init__(self, pairs=()):
+        pairs = sorted(pairs, key=lambda pair: pair[0].casefold())
+        self._keys = [name.casefold() for name, _ in pairs]
+        self.names = [name for name, _ in pairs]
+        self.gids = [gid for _, gid in pairs]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return zip(self.names, self.gids)
+
+    def __getitem__(self, idx):
+        return self.names[idx], self.gids[idx]
+
+    def find(self, name):
+        """GID der ersten Aufgabe mit genau diesem Namen (ohne Groß-/Kleinschreibung) oder None"""
+        key = name.casefold()
+        idx = bisect.bisect_left(self._keys, key)
+        if idx < len(self._keys) and self._keys[idx] == key:
+            return self.gids[idx]
+        return None
+
+    def with_prefix(self, prefix):
+        """Alle Aufgaben, deren Name mit prefix beginnt, als (Name, GID)-Paare"""
+        key = prefix.casefold()
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + '\U0010ffff', lo)
+        return list(zip(self.names[lo:hi], self.gids[lo:hi]))
+
+def _tasks_opts(project_gid):
+    return {
+        'project': project_gid,
+        'limit': ASANA_TASK_PAGE_SIZE,
+        # gid kommt immer mit; completed nur zur Sicherheit, completed_since=now liefert ohnehin nur offene
+        'opt_fields': 'name,completed',
+        'completed_since': 'now'
+    }
+
+def _open_task_pair(task):
+    """(Name, GID) einer offenen Aufgabe, sonst None"""
+    if isinstance(task, dict) and 'name' in task and 'gid' in task and not task.get('completed', False):
+        return task['name'], task['gid']
+    return None
+
+def _finish_task_list(project_gid, task_pairs, fetched, limit):
+    if limit > 0 and fetched >= limit:
+        debug_log("Aufgabenliste von Projekt %s nach %s Aufgaben abgeschnitten", project_gid, limit, level=logging.WARNING)
+    debug_log("%s offene Aufgaben in Projekt %s geladen", len(task_pairs), project_gid)
+    return TaskList(task_pairs)
+
+@metrics.timed('asana.tasks')
+def _fetch_tasks(project_gid, limit=None):
+    limit = ASANA_TASK_LIMIT if limit is None else limit
+    kwargs = {'item_limit': limit} if limit > 0 else {}
+    # Die Seiten werden nacheinander geladen und sofort gefiltert, die Rohdaten nicht aufgehoben
+    task_pairs = []
+    fetched = 0
+    for task in tasks_api.get_tasks(_tasks_opts(project_gid), **kwargs):
+        fetched += 1
+        pair = _open_task_pair(task)
+        if pair:
+            task_pairs.append(pair)
+    return _finish_task_list(project_gid, task_pairs, fetched, limit)
+
+# Lokaler SQLite-Spiegel der Asana-Daten: überlebt Neustarts. Workspaces, Projekte und
+# Benutzer werden nach Ablauf ihrer Cache-TTL komplett ersetzt (kleine Listen), Aufgaben
+# per Delta abgeglichen (Events-API für Löschungen, modified_since für Änderungen).
+ASANA_MIRROR_PATH = os.getenv('ASANA_MIRROR_PATH', 'asana_mirror.sqlite3')
+ASANA_MIRROR_DISABLED = os.getenv('ASANA_MIRROR_DISABLED', '').lower() in ('1', 'true', 'yes')
+# Spätestens nach dieser Zeit wird die Aufgabenliste eines Projekts wieder komplett geladen
+ASANA_MIRROR_FULL_SYNC_SECONDS = float(os.getenv('ASANA_MIRROR_FULL_SYNC_SECONDS', 24 * 3600))
+# Sicherheitsabstand für modified_since (Uhrenabweichung zu Asana)
+ASANA_MIRROR_SKEW_SECONDS = 120
+
+class AsanaMirror:
+    """SQLite-Spiegel von (Name, GID, Extra)-Datensätzen je Typ und Elternobjekt plus Sync-Status.
+
+    Typen: 'workspaces' (Elternobjekt ''), 'projects' und 'users' (Workspace), 'tasks'
+    (Projekt); Extra ist bei Benutzern die E-Mail. Die Reihenfolge eines kompletten
+    Abgleichs bleibt erhalten, per Delta hinzugekommene Datensätze stehen am Ende.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "kind TEXT NOT NULL, parent TEXT NOT NULL, gid TEXT NOT NULL, name TEXT NOT NULL, "
+                "extra TEXT, position INTEGER NOT NULL, PRIMARY KEY (kind, parent, gid))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                "kind TEXT NOT NULL, parent TEXT NOT NULL, synced_at REAL NOT NULL, "
+                "full_synced_at REAL NOT NULL, token TEXT, PRIMARY KEY (kind, parent))"
+            )
+        return self._conn
+
+    def state(self, kind, parent):
+        """(synced_at, full_synced_at, token) des letzten Abgleichs oder None"""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT synced_at, full_synced_at, token FROM sync_state WHERE kind = ? AND parent = ?",
+                (kind, str(parent))
+            ).fetchone()
+
+    def read(self, kind, parent):
+        """Datensätze als (Name, GID, Extra)-Tupel"""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT name, gid, extra FROM records WHERE kind = ? AND parent = ? ORDER BY position",
+                (kind, str(parent))
+            ).fetchall()
+
+    def replace(self, kind, parent, records, synced_at, token=None):
+        """Ersetzt alle Datensätze (kompletter Abgleich)"""
+        parent = str(parent)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM records WHERE kind = ? AND parent = ?", (kind, parent))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO records (kind, parent, gid, name, extra, position) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(kind, parent, gid, name, extra, position) for position, (name, gid, extra) in enumerate(records)]
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (kind, parent, synced_at, full_synced_at, token) VALUES (?, ?, ?, ?, ?)",
+                    (kind, parent, synced_at, synced_at, token)
+                )
+
+    def apply_delta(self, kind, parent, upserts, deletes, synced_at, token=None):
+        """Schreibt nur geänderte und entfernte Datensätze (Delta-Abgleich)"""
+        parent = str(parent)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                position = conn.execute(
+                    "SELECT COALESCE(MAX(position), -1) + 1 FROM records WHERE kind = ? AND parent = ?", (kind, parent)
+                ).fetchone()[0]
+                conn.executemany(
+                    "INSERT INTO records (kind, parent, gid, name, extra, position) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (kind, parent, gid) DO UPDATE SET name = excluded.name, extra = excluded.extra",
+                    [(kind, parent, gid, name, extra, position + i) for i, (name, gid, extra) in enumerate(upserts)]
+                )
+                conn.executemany(
+                    "DELETE FROM records WHERE kind = ? AND parent = ? AND gid = ?",
+                    [(kind, parent, gid) for gid in deletes]
+                )
+                conn.execute(
+                    "UPDATE sync_state SET synced_at = ?, token = ? WHERE kind = ? AND parent = ?",
+                    (synced_at, token, kind, parent)
+                )
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM records")
+                conn.execute("DELETE FROM sync_state")
+
+asana_mirror = AsanaMirror(ASANA_MIRROR_PATH)
+
+def _mirror_rows(kind, parent):
+    # Nur Benutzer tragen ein drittes Feld (E-Mail)
+    return [record if kind == 'users' else record[:2] for record in asana_mirror.read(kind, parent or '')]
+
+def _mirror_fresh(kind, parent):
+    """(Sync-Status, Zeilen); Zeilen nur, wenn der Spiegel jünger als die Cache-TTL ist"""
+    state = asana_mirror.state(kind, parent or '')
+    if state and time.time() - state[0] < ASANA_CACHE_TTLS[kind]:
+        return state, _mirror_rows(kind, parent)
+    return state, None
+
+def _mirror_store(kind, parent, rows, started):
+    try:
+        asana_mirror.replace(kind, parent or '', [row if kind == 'users' else (row[0], row[1], None) for row in rows], started)
+    except sqlite3.Error as e:
+        debug_log("Asana-Spiegel nicht beschreibbar: %s", e, level=logging.WARNING)
+
+def _load_mirrored(kind, parent, fetch):
+    """Kleine Listen: aus dem Spiegel, solange er jünger als die Cache-TTL ist, sonst neu laden und ersetzen.
+    Ist Asana nicht erreichbar, wird der (veraltete) Spiegel geliefert."""
+    if ASANA_MIRROR_DISABLED:
+        return fetch()
+    try:
+        state, rows = _mirror_fresh(kind, parent)
+        if rows is not None:
+            return rows
+    except sqlite3.Error as e:
+        debug_log("Asana-Spiegel nicht lesbar: %s", e, level=logging.WARNING)
+        return fetch()
+    started = time.time()
+    try:
+        rows = fetch()
+    except ApiException as e:
+        if not state:
+            raise
+        debug_log("Asana nicht erreichbar (%s), verwende Spiegel für %s %s", e, kind, parent, level=logging.WARNING)
+        return _mirror_rows(kind, parent)
+    _mirror_store(kind, parent, rows, started)
+    return rows
+
+@metrics.timed('asana.events')
+def _fetch_events(resource_gid, sync_token=None):
+    """Events seit sync_token als (Events, neues Token). Ohne oder mit abgelaufenem Token
+    antwortet Asana mit 412 und einem frischen Token; dann ist Events None."""
+    opts = {'sync': sync_token} if sync_token else {}
+    events = []
+    while True:
+        try:
+            payload = events_api.get_events(resource_gid, dict(opts), full_payload=True)
+        except ApiException as e:
+            if e.status == 412:
+                return None, json.loads(e.body or '{}').get('sync')
+            raise
+        events.extend(payload.get('data') or [])
+        opts['sync'] = payload.get('sync')
+        if not payload.get('has_more'):
+            return events, opts['sync']
+
+@metrics.timed('asana.tasks_delta')
+def _sync_tasks_delta(project_gid, token, synced_at, started):
+    """Gleicht die Aufgaben eines Projekts seit synced_at ab; False, wenn ein kompletter Abgleich nötig ist"""
+    try:
+        events, token = _fetch_events(project_gid, token)
+    except ApiException as e:
+        # Ohne Events werden nur Löschungen verpasst; die holt der nächste komplette Abgleich
+        debug_log("Events für Projekt %s nicht abrufbar: %s", project_gid, e, level=logging.WARNING)
+        events = []
+    if events is None:
+        return False
+    removed = _removed_task_gids(events)
+    _apply_task_delta(project_gid, tasks_api.get_tasks(_delta_tasks_opts(project_gid, synced_at)), removed, started, token)
+    return True
+
+def _removed_task_gids(events):
+    removed = set()
+    for event in events:
+        resource = event.get('resource') or {}
+        if resource.get('resource_type') == 'task' and event.get('action') in ('deleted', 'removed'):
+            removed.add(resource.get('gid'))
+    return removed
+
+def _delta_tasks_opts(project_gid, synced_at):
+    since = datetime.fromtimestamp(synced_at - ASANA_MIRROR_SKEW_SECONDS, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    return {
+        'project': project_gid,
+        'limit': ASANA_TASK_PAGE_SIZE,
+        'opt_fields': 'name,completed',
+        'modified_since': since
+    }
+
+def _apply_task_delta(project_gid, modified_tasks, removed, started, token):
+    """Schreibt geänderte (bzw. erledigte) Aufgaben und entfernte GIDs in den Spiegel"""
+    upserts = []
+    for task in modified_tasks:
+        if not (isinstance(task, dict) and 'name' in task and 'gid' in task):
+            continue
+        if task.get('completed', False):
+            removed.add(task['gid'])
+        else:
+            upserts.append((task['name'], task['gid'], None))
+            removed.discard(task['gid'])
+    asana_mirror.apply_delta('tasks', project_gid, upserts, removed, started, token)
+    debug_log("Delta-Abgleich Projekt %s: %s geändert, %s entfernt", project_gid, len(upserts), len(removed))
+
+def _mirrored_task_list(project_gid):
+    return TaskList(record[:2] for record in asana_mirror.read('tasks', project_gid))
+
+def _load_tasks(project_gid):
+    """Offene Aufgaben eines Projekts über den Spiegel: Delta-Abgleich, wenn möglich, sonst komplett laden"""
+    if ASANA_MIRROR_DISABLED:
+        return _fetch_tasks(project_gid)
+    started = time.time()
+    try:
+        state = asana_mirror.state('tasks', project_gid)
+        if state and state[2] and started - state[1] < ASANA_MIRROR_FULL_SYNC_SECONDS:
+            try:
+                if _sync_tasks_delta(project_gid, state[2], state[0], started):
+                    return _mirrored_task_list(project_gid)
+            except ApiException as e:
+                debug_log("Asana nicht erreichbar (%s), verwende Spiegel für Projekt %s", e, project_gid, level=logging.WARNING)
+                return _mirrored_task_list(project_gid)
+        # Kompletter Abgleich; das Sync-Token vorher holen, damit keine Änderung dazwischen verloren geht
+        try:
+            _, token = _fetch_events(project_gid)
+        except ApiException as e:
+            debug_log("Kein Events-Token für Projekt %s: %s", project_gid, e, level=logging.WARNING)
+            token = None
+        task_list = _fetch_tasks(project_gid)
+        asana_mirror.replace('tasks', project_gid, [(name, gid, None) for name, gid in task_list], started, token)
+        return task_list
+    except sqlite3.Error as e:
+        debug_log("Asana-Spiegel nicht nutzbar: %s", e, level=logging.WARNING)
+        return _fetch_tasks(project_gid)
+
+# Die *_choices-Funktionen liefern (Name, GID)-Paare, wie sie die Dropdowns
+# direkt als Auswahl verwenden; doppelte Namen bleiben dabei unterscheidbar.
+def get_workspace_choices():
+    """Holt alle verfügbaren Workspaces als (Name, GID)-Paare"""
     try:
-        workspaces = list(workspaces_api.get_workspaces({}))
-        workspace_dict = {}
-        for workspace in workspaces:
-            if isinstance(workspace, dict) and 'name' in workspace and 'gid' in workspace:
-                workspace_dict[workspace['name']] = workspace['gid']
-        return workspace_dict
+        return list(asana_cache.get_or_load('workspaces', None, lambda: _load_mirrored('workspaces', None, _fetch_workspaces)))
     except ApiException as e:
         print(f"Fehler beim Abrufen der Workspaces: {str(e)}")
-        return {}
+        return []
 
-def get_projects(workspace_gid):
-    """Holt alle Projekte eines Workspaces"""
+def get_project_choices(workspace_gid):
+    """Holt alle Projekte eines Workspaces als (Name, GID)-Paare, sortiert nach Name"""
     if not workspace_gid:
-        return {}
+        return []
     try:
-        opts = {
-            'workspace': workspace_gid,
-            'archived': False,
-            'opt_fields': 'name,gid'
-        }
-        projects = list(projects_api.get_projects(opts))
-        project_dict = {}
-        for project in projects:
-            if isinstance(project, dict) and 'name' in project and 'gid' in project:
-                project_dict[project['name']] = project['gid']
-        return project_dict
+        return list(asana_cache.get_or_load('projects', workspace_gid, lambda: _load_mirrored('projects', workspace_gid, lambda: _fetch_projects(workspace_gid))))
     except ApiException as e:
         print(f"Fehler beim Abrufen der Projekte: {str(e)}")
-        return {}
+        return []
 
-def get_workspace_users(workspace_gid):
-    """Holt alle Benutzer eines Workspaces, nur @innpuls.at-Adressen"""
+def _get_workspace_user_records(workspace_gid):
+    """(Name, GID, E-Mail) aller @innpuls.at-Benutzer aus Cache bzw. Spiegel"""
+    return asana_cache.get_or_load('users', workspace_gid, lambda: _load_mirrored('users', workspace_gid, lambda: _fetch_workspace_users(workspace_gid)))
+
+def get_user_choices(workspace_gid):
+    """Holt alle Benutzer eines Workspaces als (Name, GID)-Paare, nur @innpuls.at-Adressen"""
     if not workspace_gid:
-        return {}
+        return []
     try:
-        opts = {'workspace': workspace_gid, 'opt_fields': 'name,email,gid'}
-        users = list(users_api.get_users(opts))
-        # Debug: Logge alle User mit Name und E-Mail
-        for user in users:
-            name = user.get('name', '') if isinstance(user, dict) else str(user)
-            email = user.get('email', '') if isinstance(user, dict) else ''
-            debug_log(f"User: {name} | Email: {email}")
-        user_dict = {}
-        for user in users:
-            if isinstance(user, dict) and 'name' in user and 'gid' in user:
-                email = user.get('email', '')
-                if email.endswith('@innpuls.at'):
-                    user_dict[user['name']] = user['gid']
-        return user_dict
+        return [(name, gid) for name, gid, _ in _get_workspace_user_records(workspace_gid)]
     except ApiException as e:
         print(f"Fehler beim Abrufen der Benutzer: {str(e)}")
-        return {}
+        return []
+
+def get_task_choices(project_gid):
+    """Holt alle offenen Aufgaben eines Projekts als (Name, GID)-Paare, alphabetisch sortiert"""
+    if not project_gid:
+        debug_log("Keine project_gid übergeben")
+        return []
+    try:
+        return list(asana_cache.get_or_load('tasks', project_gid, lambda: _load_tasks(project_gid)))
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Aufgaben: {str(e)}")
+        return []
+
+def get_workspaces():
+    """Holt alle verfügbaren Workspaces"""
+    return dict(get_workspace_choices())
+
+def get_projects(workspace_gid):
+    """Holt alle Projekte eines Workspaces"""
+    return dict(get_project_choices(workspace_gid))
+
+def get_workspace_users(workspace_gid):
+    """Holt alle Benutzer eines Workspaces, nur @innpuls.at-Adressen"""
+    return dict(get_user_choices(workspace_gid))
 
 def get_tasks(project_gid):
     """Holt alle Aufgaben eines Projekts und sortiert sie alphabetisch"""
+    return dict(get_task_choices(project_gid))
+
+def get_task_list(project_gid):
+    """Offene Aufgaben eines Projekts als TaskList (sortiert, per Name durchsuchbar)"""
     if not project_gid:
-        print("DEBUG: Keine project_gid übergeben")
-        return {}
+        return TaskList()
     try:
-        opts = {
-            'project': project_gid,
-            'opt_fields': 'name,gid,completed',
-            'completed_since': 'now'
-        }
-        tasks = list(tasks_api.get_tasks(opts))
-        task_dict = {}
-        task_list = []
-        for task in tasks:
-            if isinstance(task, dict) and 'name' in task and 'gid' in task:
-                if not task.get('completed', False):
-                    task_list.append(task)
-        task_list.sort(key=lambda x: x['name'].lower())
-        for task in task_list:
-            task_dict[task['name']] = task['gid']
-        print(f"DEBUG: Gefundene Aufgaben (sortiert): {task_dict}")
-        return task_dict
+        return asana_cache.get_or_load('tasks', project_gid, lambda: _load_tasks(project_gid))
     except ApiException as e:
         print(f"Fehler beim Abrufen der Aufgaben: {str(e)}")
-        return {}
+        return TaskList()
 
-def update_tasks(workspace_name, project_name):
-    if not workspace_name or not project_name:
-        return gr.update(choices=[])
-    workspaces = get_workspaces()
-    workspace_gid = workspaces.get(workspace_name)
-    if workspace_gid:
-        projects = get_projects(workspace_gid)
-        project_gid = projects.get(project_name)
-        if project_gid:
-            tasks = get_tasks(project_gid)
-            task_names = sorted(list(tasks.keys()))
-            return gr.update(choices=task_names)
-    return gr.update(choices=[])
+# Async-Gegenstücke der Loader für die Async-Handler: derselbe Cache und derselbe Spiegel,
+# Asana über get_async_asana(). SQLite-Zugriffe laufen in Worker-Threads (kurz, aber blockierend).
+async def _aload_mirrored(kind, parent, fetch):
+    """Wie _load_mirrored; fetch ist eine async-Funktion"""
+    if ASANA_MIRROR_DISABLED:
+        return await fetch()
+    try:
+        state, rows = await asyncio.to_thread(_mirror_fresh, kind, parent)
+        if rows is not None:
+            return rows
+    except sqlite3.Error as e:
+        debug_log("Asana-Spiegel nicht lesbar: %s", e, level=logging.WARNING)
+        return await fetch()
+    started = time.time()
+    try:
+        rows = await fetch()
+    except ApiException as e:
+        if not state:
+            raise
+        debug_log("Asana nicht erreichbar (%s), verwende Spiegel für %s %s", e, kind, parent, level=logging.WARNING)
+        return await asyncio.to_thread(_mirror_rows, kind, parent)
+    await asyncio.to_thread(_mirror_store, kind, parent, rows, started)
+    return rows
 
-def analyze_text_with_ai(protocol_text):
-    """Analysiert den Text mit OpenAI und extrahiert Aufgaben"""
+@metrics.timed('asana.workspaces')
+async def _afetch_workspaces():
+    return _name_gid_pairs([workspace async for workspace in get_async_asana().iter_items('/workspaces')])
+
+@metrics.timed('asana.projects')
+async def _afetch_projects(workspace_gid):
+    project_pairs = _name_gid_pairs([project async for project in get_async_asana().iter_items('/projects', _projects_opts(workspace_gid))])
+    project_pairs.sort(key=lambda x: x[0])
+    return project_pairs
+
+@metrics.timed('asana.users')
+async def _afetch_workspace_users(workspace_gid):
+    return _innpuls_user_records([user async for user in get_async_asana().iter_items('/users', _users_opts(workspace_gid))])
+
+@metrics.timed('asana.tasks')
+async def _afetch_tasks(project_gid, limit=None):
+    limit = ASANA_TASK_LIMIT if limit is None else limit
+    task_pairs = []
+    fetched = 0
+    async for task in get_async_asana().iter_items('/tasks', _tasks_opts(project_gid), item_limit=limit if limit > 0 else None):
+        fetched += 1
+        pair = _open_task_pair(task)
+        if pair:
+            task_pairs.append(pair)
+    return _finish_task_list(project_gid, task_pairs, fetched, limit)
+
+@metrics.timed('asana.events')
+async def _afetch_events(resource_gid, sync_token=None):
+    """Wie _fetch_events"""
+    params = {'resource': resource_gid}
+    if sync_token:
+        params['sync'] = sync_token
+    events = []
+    while True:
+        try:
+            payload = await get_async_asana().request('GET', '/events', params)
+        except ApiException as e:
+            if e.status == 412:
+                return None, json.loads(e.body or '{}').get('sync')
+            raise
+        events.extend(payload.get('data') or [])
+        params['sync'] = payload.get('sync')
+        if not payload.get('has_more'):
+            return events, params['sync']
+
+@metrics.timed('asana.tasks_delta')
+async def _async_tasks_delta(project_gid, token, synced_at, started):
+    """Wie _sync_tasks_delta"""
+    try:
+        events, token = await _afetch_events(project_gid, token)
+    except ApiException as e:
+        debug_log("Events für Projekt %s nicht abrufbar: %s", project_gid, e, level=logging.WARNING)
+        events = []
+    if events is None:
+        return False
+    modified_tasks = [task async for task in get_async_asana().iter_items('/tasks', _delta_tasks_opts(project_gid, synced_at))]
+    await asyncio.to_thread(_apply_task_delta, project_gid, modified_tasks, _removed_task_gids(events), started, token)
+    return True
+
+async def _aload_tasks(project_gid):
+    """Wie _load_tasks"""
+    if ASANA_MIRROR_DISABLED:
+        return await _afetch_tasks(project_gid)
+    started = time.time()
+    try:
+        state = await asyncio.to_thread(asana_mirror.state, 'tasks', project_gid)
+        if state and state[2] and started - state[1] < ASANA_MIRROR_FULL_SYNC_SECONDS:
+            try:
+                if await _async_tasks_delta(project_gid, state[2], state[0], started):
+                    return await asyncio.to_thread(_mirrored_task_list, project_gid)
+            except ApiException as e:
+                debug_log("Asana nicht erreichbar (%s), verwende Spiegel für Projekt %s", e, project_gid, level=logging.WARNING)
+                return await asyncio.to_thread(_mirrored_task_list, project_gid)
+        try:
+            _, token = await _afetch_events(project_gid)
+        except ApiException as e:
+            debug_log("Kein Events-Token für Projekt %s: %s", project_gid, e, level=logging.WARNING)
+            token = None
+        task_list = await _afetch_tasks(project_gid)
+        await asyncio.to_thread(asana_mirror.replace, 'tasks', project_gid, [(name, gid, None) for name, gid in task_list], started, token)
+        return task_list
+    except sqlite3.Error as e:
+        debug_log("Asana-Spiegel nicht nutzbar: %s", e, level=logging.WARNING)
+        return await _afetch_tasks(project_gid)
+
+async def aget_workspace_choices():
+    """Wie get_workspace_choices"""
+    try:
+        return list(await asana_cache.aget_or_load('workspaces', None, lambda: _aload_mirrored('workspaces', None, _afetch_workspaces)))
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Workspaces: {str(e)}")
+        return []
+
+async def aget_project_choices(workspace_gid):
+    """Wie get_project_choices"""
+    if not workspace_gid:
+        return []
+    try:
+        return list(await asana_cache.aget_or_load('projects', workspace_gid, lambda: _aload_mirrored('projects', workspace_gid, lambda: _afetch_projects(workspace_gid))))
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Projekte: {str(e)}")
+        return []
+
+async def _aget_workspace_user_records(workspace_gid):
+    return await asana_cache.aget_or_load('users', workspace_gid, lambda: _aload_mirrored('users', workspace_gid, lambda: _afetch_workspace_users(workspace_gid)))
+
+async def aget_user_choices(workspace_gid):
+    """Wie get_user_choices"""
+    if not workspace_gid:
+        return []
+    try:
+        return [(name, gid) for name, gid, _ in await _aget_workspace_user_records(workspace_gid)]
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Benutzer: {str(e)}")
+        return []
+
+async def aget_task_list(project_gid):
+    """Wie get_task_list"""
+    if not project_gid:
+        return TaskList()
+    try:
+        return await asana_cache.aget_or_load('tasks', project_gid, lambda: _aload_tasks(project_gid))
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Aufgaben: {str(e)}")
+        return TaskList()
+
+async def aget_task_choices(project_gid):
+    """Wie get_task_choices"""
+    return list(await aget_task_list(project_gid))
+
+# Parallele Aufgabenerstellung mit begrenztem Worker-Pool
+ASANA_CREATE_WORKERS = int(os.getenv('ASANA_CREATE_WORKERS', 5))
+ASANA_MAX_RETRIES = int(os.getenv('ASANA_MAX_RETRIES', 4))
+ASANA_RETRY_BASE_DELAY = float(os.getenv('ASANA_RETRY_BASE_DELAY', 1.0))
+ASANA_RETRY_MAX_DELAY = float(os.getenv('ASANA_RETRY_MAX_DELAY', 60.0))
+CREATE_TASK_OPTS = {"opt_fields": "name,gid,completed"}
+# "batch": bis zu 10 Aufgaben pro Request über /batch, "parallel": ein Request pro Aufgabe
+ASANA_CREATE_MODE = os.getenv('ASANA_CREATE_MODE', 'batch')
+ASANA_BATCH_SIZE = 10  # Maximum der Asana Batch API
+
+def _is_retryable(e):
+    """Nur Rate-Limits (429) und Serverfehler (5xx) werden wiederholt"""
+    status = getattr(e, 'status', None) or 0
+    return status == 429 or 500 <= status <= 599
+
+def _retry_delay(e, attempt):
+    """Wartezeit vor dem nächsten Versuch: Retry-After-Header oder exponentieller Backoff mit Jitter"""
+    headers = getattr(e, 'headers', None) or {}
+    retry_after = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if retry_after:
+        try:
+            return min(float(retry_after), ASANA_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    delay = ASANA_RETRY_BASE_DELAY * (2 ** attempt)
+    return min(delay, ASANA_RETRY_MAX_DELAY) * random.uniform(0.5, 1.0)
+
+def call_with_retry(fn, *args, recover=None, **kwargs):
+    """Führt einen Asana-Aufruf aus und wiederholt ihn bei 429/5xx bis zu ASANA_MAX_RETRIES Mal.
+
+    Bei nicht idempotenten POSTs wird nach einem 5xx vor der Wiederholung recover(e) aufgerufen:
+    liefert es ein Ergebnis (die bereits angelegte Aufgabe), wird nicht erneut gesendet.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except ApiException as e:
+            if not _is_retryable(e) or attempt >= ASANA_MAX_RETRIES:
+                raise
+            delay = _retry_delay(e, attempt)
+            debug_log("Asana-Status %s, neuer Versuch %s in %.1fs", e.status, attempt + 1, delay, level=logging.INFO)
+            metrics.inc('app_retries_total', service='asana', status=e.status)
+            time.sleep(delay)
+            if recover is not None and _is_ambiguous(e.status):
+                recovered = recover(e)
+                if recovered is not None:
+                    return recovered
+            attempt += 1
+
+async def acall_with_retry(fn, *args, recover=None, **kwargs):
+    """Wie call_with_retry für Coroutinen (recover ist dann ebenfalls eine Coroutine);
+    wartet mit asyncio.sleep, ohne einen Thread zu blockieren"""
+    attempt = 0
+    while True:
+        try:
+            return await fn(*args, **kwargs)
+        except ApiException as e:
+            if not _is_retryable(e) or attempt >= ASANA_MAX_RETRIES:
+                raise
+            delay = _retry_delay(e, attempt)
+            debug_log("Asana-Status %s, neuer Versuch %s in %.1fs", e.status, attempt + 1, delay, level=logging.INFO)
+            metrics.inc('app_retries_total', service='asana', status=e.status)
+            await asyncio.sleep(delay)
+            if recover is not None and _is_ambiguous(e.status):
+                recovered = await recover(e)
+                if recovered is not None:
+                    return recovered
+            attempt += 1
+
+# Nach einem 5xx oder einem fehlgeschlagenen Batch kann Asana die Aufgabe trotzdem angelegt haben.
+# Vor dem erneuten Senden wird deshalb unter derselben übergeordneten Aufgabe (bzw. im Projekt)
+# nach einer seit Beginn des Vorgangs angelegten Aufgabe gleichen Namens gesucht.
+ASANA_DEDUP_SKEW_SECONDS = float(os.getenv('ASANA_DEDUP_SKEW_SECONDS', 60))
+DEDUP_TASK_OPTS = 'name,gid,completed,created_at'
+
+def _is_ambiguous(status):
+    """Bei 5xx (oder ohne Status, z. B. abgebrochenem Batch) ist offen, ob die Aufgabe angelegt wurde"""
+    return not status or status >= 500
+
+def _no_resend(e):
+    """recover für Batches: nicht als Ganzes wiederholen, sondern einzeln mit Duplikatprüfung nachholen"""
+    raise e
+
+def _duplicate_lookup(task_data, started):
+    """(Pfad, Parameter) für die Liste, in der die Aufgabe angelegt würde; None ohne Parent und Projekt"""
+    if task_data.get('parent'):
+        return f"/tasks/{task_data['parent']}/subtasks", {'opt_fields': DEDUP_TASK_OPTS, 'limit': 100}
+    projects = task_data.get('projects') or []
+    if not projects:
+        return None
+    since = datetime.fromtimestamp(started - ASANA_DEDUP_SKEW_SECONDS, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    return '/tasks', {'project': projects[0], 'modified_since': since, 'opt_fields': DEDUP_TASK_OPTS, 'limit': 100}
+
+def _pick_duplicate(candidates, task_data, started, claimed):
+    """Erste seit started angelegte Aufgabe gleichen Namens, die noch keinem Eingabeeintrag gehört"""
+    for task in candidates:
+        if task.get('name') != task_data.get('name') or task.get('gid') in claimed:
+            continue
+        created_at = task.get('created_at')
+        if created_at:
+            if isinstance(created_at, str):
+                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+            if created_at.timestamp() < started - ASANA_DEDUP_SKEW_SECONDS:
+                continue
+        debug_log("Aufgabe '%s' wurde bereits angelegt (%s), kein erneuter Request", task.get('name'), task.get('gid'), level=logging.WARNING)
+        metrics.inc('app_duplicates_avoided_total', service='asana')
+        return task
+    return None
+
+def find_created_task(task_data, started, claimed=()):
+    """Sucht eine seit started angelegte Aufgabe gleichen Namens am Zielort von task_data"""
+    lookup = _duplicate_lookup(task_data, started)
+    if not lookup:
+        return None
+    path, params = lookup
+    if task_data.get('parent'):
+        candidates = call_with_retry(lambda: list(tasks_api.get_subtasks_for_task(task_data['parent'], params)))
+    else:
+        candidates = call_with_retry(lambda: list(tasks_api.get_tasks(params)))
+    return _pick_duplicate(candidates, task_data, started, claimed)
+
+async def afind_created_task(task_data, started, claimed=()):
+    """Wie find_created_task über AsyncAsanaClient"""
+    lookup = _duplicate_lookup(task_data, started)
+    if not lookup:
+        return None
+    path, params = lookup
+
+    async def load():
+        return [task async for task in get_async_asana().iter_items(path, params)]
+
+    return _pick_duplicate(await acall_with_retry(load), task_data, started, claimed)
+
+def _batch_actions(chunk):
+    return [
+        {
+            "relative_path": "/tasks",
+            "method": "post",
+            "data": task_data,
+            "options": {"fields": CREATE_TASK_OPTS["opt_fields"].split(",")}
+        }
+        for _, task_data in chunk
+    ]
+
+@metrics.timed('asana.create_task')
+def _create_single_task(task_data, started=None, claimed=()):
+    """Legt eine Aufgabe an. Mit started (Beginn eines früheren Versuchs mit offenem Ausgang) wird
+    vorher geprüft, ob Asana die Aufgabe schon angelegt hat; ebenso vor jeder Wiederholung nach 5xx."""
+    if started is not None:
+        existing = find_created_task(task_data, started, claimed)
+        if existing is not None:
+            return existing
+    started = time.time() if started is None else started
+
+    def recover(error):
+        try:
+            return find_created_task(task_data, started, claimed)
+        except Exception as lookup_error:
+            # Ohne Prüfung nicht erneut senden: lieber ein gemeldeter Fehler als ein Duplikat
+            debug_log("Duplikatprüfung für '%s' fehlgeschlagen: %s", task_data.get('name'), lookup_error, level=logging.WARNING)
+            raise error from lookup_error
+
+    return call_with_retry(tasks_api.create_task, {"data": task_data}, CREATE_TASK_OPTS, recover=recover)
+
+@metrics.timed('asana.batch')
+def _create_task_batch(chunk):
+    """Schickt bis zu ASANA_BATCH_SIZE Aufgaben in einem /batch-Request; liefert die Einzelantworten.
+    Nach einem 5xx wird der Batch nicht wiederholt, sondern einzeln (mit Duplikatprüfung) nachgeholt."""
+    response = call_with_retry(batch_api.create_batch_request, {"data": {"actions": _batch_actions(chunk)}}, {}, full_payload=True, recover=_no_resend)
+    return response.get('data', []) if isinstance(response, dict) else []
+
+def _batch_outcomes(chunk, responses):
+    """(Index, Ergebnis, nachholen, prüfen) je Aktion eines Batches; bei fehlgeschlagenen Aktionen ist
+    das Ergebnis die task_data für den Einzelaufruf, prüfen heißt: vorher nach Duplikaten suchen"""
+    for pos, (idx, task_data) in enumerate(chunk):
+        response = responses[pos] if pos < len(responses) else None
+        status_code = response.get('status_code', 0) if isinstance(response, dict) else 0
+        if 200 <= status_code < 300:
+            body = response.get('body') or {}
+            yield idx, body.get('data', body), False, False
+        else:
+            debug_log("Batch-Aktion %s fehlgeschlagen (Status %s), Einzelaufruf als Fallback", idx, status_code, level=logging.WARNING)
+            yield idx, task_data, True, _is_ambiguous(status_code)
+
+def _result_gid(result):
+    return result.get('gid') if isinstance(result, dict) else getattr(result, 'gid', None)
+
+def iter_create_tasks(task_payloads, mode=None):
+    """Legt Aufgaben parallel in Asana an und liefert (Index, Ergebnis, Fehler) in Abschlussreihenfolge.
+
+    task_payloads ist eine Liste von task_data-Dicts; der Index verweist auf die Eingabeliste.
+    Im Batch-Modus werden fehlgeschlagene Aktionen (oder ganze fehlgeschlagene Batches)
+    einzeln über create_task nachgeholt, bei offenem Ausgang nach einer Duplikatprüfung.
+    """
+    if not task_payloads:
+        return
+    mode = mode or ASANA_CREATE_MODE
+    indexed = list(enumerate(task_payloads))
+    workers = max(1, min(ASANA_CREATE_WORKERS, len(task_payloads)))
+    started = time.time()
+    # GIDs, die schon einem Eingabeeintrag gehören (bei gleichnamigen Aufgaben nicht doppelt zuordnen)
+    claimed = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit_single(idx, task_data, check=False):
+            future = pool.submit(_create_single_task, task_data, started if check else None, claimed)
+            pending[future] = ('single', idx)
+
+        pending = {}
+        if mode == 'batch' and len(indexed) > 1:
+            for start in range(0, len(indexed), ASANA_BATCH_SIZE):
+                chunk = indexed[start:start + ASANA_BATCH_SIZE]
+                pending[pool.submit(_create_task_batch, chunk)] = ('batch', chunk)
+        else:
+            for idx, task_data in indexed:
+                submit_single(idx, task_data)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, ref = pending.pop(future)
+                if kind == 'single':
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        yield ref, None, e
+                        continue
+                    claimed.add(_result_gid(result))
+                    yield ref, result, None
+                    continue
+                try:
+                    responses = future.result()
+                except Exception as e:
+                    debug_log("Batch-Request fehlgeschlagen, Einzelaufrufe als Fallback: %s", e, level=logging.WARNING)
+                    responses = []
+                for idx, result, retry, check in _batch_outcomes(ref, responses):
+                    if retry:
+                        submit_single(idx, result, check)
+                    else:
+                        claimed.add(_result_gid(result))
+                        yield idx, result, None
+
+async def aiter_create_tasks(task_payloads, mode=None):
+    """Wie iter_create_tasks, aber als Coroutinen auf dem Event-Loop (über AsyncAsanaClient);
+    höchstens ASANA_CREATE_WORKERS Requests laufen gleichzeitig."""
+    if not task_payloads:
+        return
+    mode = mode or ASANA_CREATE_MODE
+    client = get_async_asana()
+    semaphore = asyncio.Semaphore(max(1, ASANA_CREATE_WORKERS))
+    started = time.time()
+    claimed = set()
+
+    async def create_single(idx, task_data, check=False):
+        async def recover(error):
+            try:
+                return await afind_created_task(task_data, started, claimed)
+            except Exception as lookup_error:
+                debug_log("Duplikatprüfung für '%s' fehlgeschlagen: %s", task_data.get('name'), lookup_error, level=logging.WARNING)
+                raise error from lookup_error
+
+        async with semaphore:
+            try:
+                with metrics.span('asana.create_task'):
+                    existing = await afind_created_task(task_data, started, claimed) if check else None
+                    if existing is not None:
+                        return 'single', idx, existing, None
+                    payload = await acall_with_retry(client.request, 'POST', '/tasks', CREATE_TASK_OPTS, task_data, recover=recover)
+                # recover liefert die Aufgabe selbst, create_task die komplette Antwort
+                return 'single', idx, payload.get('data', payload), None
+            except Exception as e:
+                return 'single', idx, None, e
+
+    async def create_batch(chunk):
+        async def no_resend(error):
+            raise error
+
+        async with semaphore:
+            try:
+                with metrics.span('asana.batch'):
+                    payload = await acall_with_retry(client.request, 'POST', '/batch', None, {"actions": _batch_actions(chunk)}, recover=no_resend)
+                responses = payload.get('data', [])
+            except Exception as e:
+                debug_log("Batch-Request fehlgeschlagen, Einzelaufrufe als Fallback: %s", e, level=logging.WARNING)
+                responses = []
+            return 'batch', chunk, responses, None
+
+    indexed = list(enumerate(task_payloads))
+    if mode == 'batch' and len(indexed) > 1:
+        pending = {asyncio.ensure_future(create_batch(indexed[start:start + ASANA_BATCH_SIZE])) for start in range(0, len(indexed), ASANA_BATCH_SIZE)}
+    else:
+        pending = {asyncio.ensure_future(create_single(idx, task_data)) for idx, task_data in indexed}
     try:
-        prompt = f"""Analysiere das folgende Meetingprotokoll und extrahiere daraus Aufgaben.
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                kind, ref, result, error = future.result()
+                if kind == 'single':
+                    if error is None:
+                        claimed.add(_result_gid(result))
+                    yield ref, result, error
+                    continue
+                for idx, result, retry, check in _batch_outcomes(ref, result):
+                    if retry:
+                        pending.add(asyncio.ensure_future(create_single(idx, result, check)))
+                    else:
+                        claimed.add(_result_gid(result))
+                        yield idx, result, None
+    finally:
+        # Bricht der Aufrufer ab, laufen keine Requests im Hintergrund weiter
+        for future in pending:
+            future.cancel()
+
+def create_tasks_concurrently(task_payloads):
+    """Wie iter_create_tasks, aber gibt eine Liste von (Ergebnis, Fehler) in Eingabereihenfolge zurück"""
+    results = [(None, None)] * len(task_payloads)
+    for idx, result, error in iter_create_tasks(task_payloads):
+        results[idx] = (result, error)
+    return results
+
+def update_tasks(workspace_gid, project_gid):
+    if not workspace_gid or not project_gid:
+        return gr.update(choices=[])
+    return gr.update(choices=get_task_choices(project_gid))
+
+# KI-Parameter; PROMPT_VERSION erhöhen, wenn sich der Prompt ändert (macht alte Cache-Einträge ungültig)
+LLM_MODEL = "gpt-4"
+LLM_TEMPERATURE = 0.3
+PROMPT_VERSION = 1
+
+# Persistenter Cache für KI-Ergebnisse (SQLite), LLM_CACHE_DISABLED=1 umgeht ihn komplett
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', 'llm_cache.sqlite3')
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 500))
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+LLM_CACHE_DISABLED = os.getenv('LLM_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes')
+
+def normalize_protocol_text(text):
+    """Normalisiert Zeilenenden und Leerraum, damit gleiche Protokolle denselben Cache-Schlüssel ergeben"""
+    lines = (' '.join(line.split()) for line in (text or '').replace('\r\n', '\n').replace('\r', '\n').split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+class LLMResultCache:
+    """Auf der Platte persistierter KI-Ergebnis-Cache mit LRU-Verdrängung nach Anzahl und Größe.
+
+    Fehler der Datenbank werden geloggt und wie ein Cache-Miss behandelt.
+    """
+
+    def __init__(self, path, max_entries, max_bytes):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_results_last_used ON llm_results (last_used)")
+        return self._conn
+
+    @staticmethod
+    def make_key(text, model, temperature, prompt_version):
+        raw = json.dumps([normalize_protocol_text(text), model, temperature, prompt_version], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute("SELECT value FROM llm_results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE llm_results SET last_used = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            debug_log("KI-Cache nicht lesbar: %s", e, level=logging.WARNING)
+            return None
+
+    def put(self, key, value):
+        try:
+            data = json.dumps(value, ensure_ascii=False)
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, data, len(data.encode('utf-8')), time.time())
+                )
+                self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            debug_log("KI-Cache nicht beschreibbar: %s", e, level=logging.WARNING)
+
+    def _evict(self, conn):
+        """Löscht die am längsten nicht genutzten Einträge, bis beide Grenzen eingehalten sind"""
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_results").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM llm_results ORDER BY last_used ASC").fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM llm_results WHERE key = ?", stale)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_results")
+            conn.commit()
+
+llm_cache = LLMResultCache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES)
+
+class JsonArrayStreamParser:
+    """Inkrementeller Parser für ein JSON-Array aus Objekten.
+
+    feed() nimmt beliebig zerstückelte Text-Chunks entgegen und gibt alle Objekte
+    zurück, die mit diesem Chunk vollständig geworden sind. Text vor dem ersten '['
+    (z.B. ```json-Zäune) wird ignoriert.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buffer = []
+
+    def feed(self, chunk):
+        objects = []
+        for ch in chunk:
+            if not self._started:
+                if ch == '[':
+                    self._started = True
+                continue
+            if self._depth == 0:
+                # Zwischen den Objekten: Kommas, Whitespace, schließende Klammer
+                if ch == '{':
+                    self._depth = 1
+                    self._buffer = ['{']
+                continue
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        obj = json.loads(''.join(self._buffer))
+                    except ValueError:
+                        obj = None
+                    if isinstance(obj, dict):
+                        objects.append(obj)
+                    self._buffer = []
+        return objects
+
+def _normalize_ai_task(task):
+    """Stellt sicher, dass das Datum im richtigen Format ist"""
+    if task.get('due_date'):
+        try:
+            # Versuche das Datum zu parsen und zu formatieren
+            date_obj = datetime.strptime(task['due_date'], '%Y-%m-%d')
+            # Für die Anzeige im UI: deutsches Format
+            task['due_date'] = date_obj.strftime('%d.%m.%Y')
+        except ValueError:
+            # Wenn das Datum nicht im richtigen Format ist, setze es auf None
+            task['due_date'] = None
+    else:
+        task['due_date'] = None
+    return task
+
+def _extraction_messages(protocol_text):
+    prompt = f"""Analysiere das folgende Meetingprotokoll und extrahiere daraus Aufgaben.
         Für jede Aufgabe solltest du folgende Informationen identifizieren:
         - Name der Aufgabe
         - Beschreibung (Details, Kontext, Anforderungen)
@@ -179,50 +2074,336 @@ def analyze_text_with_ai(protocol_text):
         Wenn du keine klare Zuweisung oder kein klares Datum findest, lass diese Felder leer.
         Das Datum sollte im Format YYYY-MM-DD sein.
         """
+    return [
+        {"role": "system", "content": "Du bist ein Experte für die Analyse von Meetingprotokollen und die Extraktion von Aufgaben."},
+        {"role": "user", "content": prompt}
+    ]
 
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Du bist ein Experte für die Analyse von Meetingprotokollen und die Extraktion von Aufgaben."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3
-        )
+class _ExtractionStream:
+    """Zerlegt die gestreamte KI-Antwort in Aufgaben (für den synchronen und den async-Pfad)"""
 
-        # Extrahiere die JSON-Antwort
-        tasks = json.loads(response.choices[0].message.content)
-        
-        # Stelle sicher, dass das Datum im richtigen Format ist
-        for task in tasks:
-            if task.get('due_date'):
-                try:
-                    # Versuche das Datum zu parsen und zu formatieren
-                    date_obj = datetime.strptime(task['due_date'], '%Y-%m-%d')
-                    # Für die Anzeige im UI: deutsches Format
-                    task['due_date'] = date_obj.strftime('%d.%m.%Y')
-                except ValueError:
-                    # Wenn das Datum nicht im richtigen Format ist, setze es auf None
-                    task['due_date'] = None
-            else:
-                task['due_date'] = None
+    def __init__(self):
+        self.parser = JsonArrayStreamParser()
+        self.content = []
+        self.collected = []
 
+    def feed(self, chunk):
+        """Aufgaben, die mit diesem Chunk vollständig geworden sind"""
+        delta = chunk['choices'][0].get('delta', {}) if chunk.get('choices') else {}
+        text = delta.get('content')
+        if not text:
+            return []
+        self.content.append(text)
+        return self._collect(self.parser.feed(text))
+
+    def finish(self):
+        """Fallback: Antwort ließ sich nicht inkrementell zerlegen"""
+        if self.collected:
+            return []
+        return self._collect(json.loads(''.join(self.content)))
+
+    def _collect(self, tasks):
+        tasks = [_normalize_ai_task(task) for task in tasks]
+        self.collected.extend(dict(task) for task in tasks)
         return tasks
 
+def _count_llm_tokens(messages, stream):
+    """Token-Zähler für /metrics; gestreamte Antworten liefern in openai 0.28 keine usage-Angaben"""
+    if not metrics.enabled:
+        return
+    metrics.inc('app_llm_tokens_total', sum(count_tokens(message['content']) for message in messages), kind='prompt')
+    metrics.inc('app_llm_tokens_total', count_tokens(''.join(stream.content)), kind='completion')
+
+def iter_analyze_text_with_ai(protocol_text, use_cache=True):
+    """Analysiert den Text mit OpenAI und liefert jede Aufgabe, sobald sie vollständig gestreamt ist.
+
+    Identische (normalisierte) Texte werden aus dem KI-Cache beantwortet, außer use_cache ist
+    False oder LLM_CACHE_DISABLED gesetzt.
+    """
+    use_cache = use_cache and not LLM_CACHE_DISABLED
+    cache_key = LLMResultCache.make_key(protocol_text, LLM_MODEL, LLM_TEMPERATURE, PROMPT_VERSION)
+    if use_cache:
+        cached_tasks = llm_cache.get(cache_key)
+        metrics.inc('app_cache_requests_total', cache='llm', kind='extraction', result='miss' if cached_tasks is None else 'hit')
+        if cached_tasks is not None:
+            debug_log("KI-Cache-Treffer für %s", cache_key[:12])
+            yield from cached_tasks
+            return
+    try:
+        messages = _extraction_messages(protocol_text)
+        with metrics.span('analyze_text_with_ai') as span:
+            response = get_openai().ChatCompletion.create(
+                model=LLM_MODEL,
+                messages=messages,
+                temperature=LLM_TEMPERATURE,
+                stream=True,
+                request_timeout=(HTTP_CONNECT_TIMEOUT, OPENAI_READ_TIMEOUT)
+            )
+
+            # Extrahiere die Aufgaben inkrementell aus dem gestreamten JSON-Array;
+            # die Zeit, in der der Aufrufer eine Aufgabe verarbeitet, zählt nicht als KI-Zeit
+            stream = _ExtractionStream()
+            for chunk in response:
+                for task in stream.feed(chunk):
+                    with span.paused():
+                        yield task
+            for task in stream.finish():
+                with span.paused():
+                    yield task
+        _count_llm_tokens(messages, stream)
+
+        # Nur vollständig empfangene Antworten werden gecacht
+        if not LLM_CACHE_DISABLED:
+            llm_cache.put(cache_key, stream.collected)
+
     except Exception as e:
         print(f"Fehler bei der KI-Analyse: {str(e)}")
-        return []
 
-def create_tasks_in_asana(tasks, workspace_name, project_name):
+async def aiter_analyze_text_with_ai(protocol_text, use_cache=True):
+    """Wie iter_analyze_text_with_ai, aber über ChatCompletion.acreate (der KI-Cache läuft im Worker-Thread)"""
+    use_cache = use_cache and not LLM_CACHE_DISABLED
+    cache_key = LLMResultCache.make_key(protocol_text, LLM_MODEL, LLM_TEMPERATURE, PROMPT_VERSION)
+    if use_cache:
+        cached_tasks = await asyncio.to_thread(llm_cache.get, cache_key)
+        metrics.inc('app_cache_requests_total', cache='llm', kind='extraction', result='miss' if cached_tasks is None else 'hit')
+        if cached_tasks is not None:
+            debug_log("KI-Cache-Treffer für %s", cache_key[:12])
+            for task in cached_tasks:
+                yield task
+            return
+    try:
+        messages = _extraction_messages(protocol_text)
+        with metrics.span('analyze_text_with_ai') as span:
+            response = await get_async_openai().ChatCompletion.acreate(
+                model=LLM_MODEL,
+                messages=messages,
+                temperature=LLM_TEMPERATURE,
+                stream=True,
+                request_timeout=(HTTP_CONNECT_TIMEOUT, OPENAI_ASYNC_TOTAL_TIMEOUT)
+            )
+            stream = _ExtractionStream()
+            async for chunk in response:
+                for task in stream.feed(chunk):
+                    with span.paused():
+                        yield task
+            for task in stream.finish():
+                with span.paused():
+                    yield task
+        await asyncio.to_thread(_count_llm_tokens, messages, stream)
+        if not LLM_CACHE_DISABLED:
+            await asyncio.to_thread(llm_cache.put, cache_key, stream.collected)
+    except Exception as e:
+        print(f"Fehler bei der KI-Analyse: {str(e)}")
+
+def analyze_text_with_ai(protocol_text, use_cache=True):
+    """Analysiert den Text mit OpenAI und extrahiert Aufgaben"""
+    return list(iter_analyze_text_with_ai(protocol_text, use_cache))
+
+# Lange Protokolle werden in Abschnitte unter einem Token-Budget zerlegt und parallel analysiert.
+# Jeder weitere Abschnitt beginnt mit der ersten Zeile des Protokolls (Titel/Datum bzw. Excel-Spaltenköpfe)
+# und wiederholt bis zu EXTRACTION_CHUNK_OVERLAP_TOKENS vom Ende des vorigen Abschnitts.
+EXTRACTION_CHUNK_TOKENS = int(os.getenv('EXTRACTION_CHUNK_TOKENS', 3000))
+EXTRACTION_CHUNK_OVERLAP_TOKENS = int(os.getenv('EXTRACTION_CHUNK_OVERLAP_TOKENS', 200))
+EXTRACTION_HEADER_MAX_TOKENS = int(os.getenv('EXTRACTION_HEADER_MAX_TOKENS', 150))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+TASK_DEDUP_THRESHOLD = float(os.getenv('TASK_DEDUP_THRESHOLD', 0.85))
+_token_encoding = None
+
+def _get_token_encoding():
+    """tiktoken-Encoding des Modells oder False, wenn tiktoken fehlt"""
+    global _token_encoding
+    if _token_encoding is None:
+        try:
+            import tiktoken
+            _token_encoding = tiktoken.encoding_for_model(LLM_MODEL)
+        except ImportError:  # optional
+            _token_encoding = False
+    return _token_encoding
+
+def count_tokens(text):
+    """Zählt die Tokens für GPT-4 (tiktoken), ohne tiktoken grob mit 4 Zeichen pro Token"""
+    encoding = _get_token_encoding()
+    if encoding is False:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+def _split_by_tokens(text, max_tokens):
+    """Teilt eine zu lange Zeile in Stücke von höchstens max_tokens Tokens"""
+    encoding = _get_token_encoding()
+    if encoding is False:
+        # Passend zur Schätzung in count_tokens (Zeichen // 4 + 1)
+        step = max(1, (max_tokens - 1) * 4)
+        return [text[i:i + step] for i in range(0, len(text), step)]
+    tokens = encoding.encode(text)
+    step = max(1, max_tokens)
+    return [encoding.decode(tokens[i:i + step]) for i in range(0, len(tokens), step)]
+
+def split_text_into_chunks(text, max_tokens=None, overlap_tokens=None):
+    """Teilt den Text an Absatz- bzw. Zeilengrenzen (Excel: eine Zeile pro Datensatz) in Abschnitte,
+    die jeweils höchstens max_tokens Tokens groß sind. Zu lange Einzelzeilen werden nach Tokens geteilt.
+    Ab dem zweiten Abschnitt stehen vorne die Kopfzeile des Textes und das Ende des vorigen Abschnitts."""
+    max_tokens = max_tokens or EXTRACTION_CHUNK_TOKENS
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    overlap_tokens = EXTRACTION_CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    # Kopfzeile: erste nicht leere Zeile, sofern sie kurz genug ist
+    header, _, body = text.strip().partition('\n')
+    header = header.strip()
+    header_tokens = count_tokens(header) + 1
+    if header_tokens > min(EXTRACTION_HEADER_MAX_TOKENS, max_tokens // 4):
+        header, header_tokens, body = '', 0, text
+    budget = max_tokens - header_tokens
+    overlap_tokens = min(overlap_tokens, budget // 2)
+    # Einheiten sammeln: ganze Absätze, wenn sie passen, sonst einzelne Zeilen (jeweils mit Tokenzahl samt Zeilenumbruch)
+    units = []
+    for paragraph in re.split(r'\n\s*\n', body):
+        if not paragraph.strip():
+            continue
+        paragraph_tokens = count_tokens(paragraph) + 1
+        if paragraph_tokens <= budget:
+            units.append((paragraph, paragraph_tokens))
+            continue
+        for line in paragraph.split('\n'):
+            if not line.strip():
+                continue
+            line_tokens = count_tokens(line) + 1
+            if line_tokens <= budget:
+                units.append((line, line_tokens))
+            else:
+                units.extend((piece, count_tokens(piece) + 1) for piece in _split_by_tokens(line, budget - 1))
+    # Einheiten gierig zu Abschnitten zusammenfassen; der nächste Abschnitt übernimmt das Ende des vorigen
+    chunks = []
+    current = []
+    current_tokens = 0
+    for unit in units:
+        if current and current_tokens + unit[1] > budget:
+            chunks.append(current)
+            carried = []
+            carried_tokens = 0
+            for previous in reversed(current):
+                if carried_tokens + previous[1] > overlap_tokens or carried_tokens + previous[1] + unit[1] > budget:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous[1]
+            current, current_tokens = carried, carried_tokens
+        current.append(unit)
+        current_tokens += unit[1]
+    if current:
+        chunks.append(current)
+    return ['\n'.join(([header] if header else []) + [unit for unit, _ in chunk]) for chunk in chunks]
+
+def _normalize_task_name(name):
+    return ' '.join(str(name or '').casefold().split())
+
+def _find_duplicate_task(task, existing_tasks):
+    """Sucht eine fast gleiche Aufgabe (difflib-Ähnlichkeit der Namen über TASK_DEDUP_THRESHOLD)"""
+    name = _normalize_task_name(task.get('name'))
+    matcher = difflib.SequenceMatcher(None, '', name)
+    for other in existing_tasks:
+        matcher.set_seq1(_normalize_task_name(other.get('name')))
+        if (matcher.real_quick_ratio() >= TASK_DEDUP_THRESHOLD
+                and matcher.quick_ratio() >= TASK_DEDUP_THRESHOLD
+                and matcher.ratio() >= TASK_DEDUP_THRESHOLD):
+            return other
+    return None
+
+def _merge_task_into(target, duplicate):
+    """Ergänzt leere Felder der behaltenen Aufgabe aus dem Duplikat"""
+    for field in ('description', 'assignee', 'due_date'):
+        if not target.get(field) and duplicate.get(field):
+            target[field] = duplicate[field]
+    if len(duplicate.get('description') or '') > len(target.get('description') or ''):
+        target['description'] = duplicate['description']
+
+def iter_extract_tasks(text, use_cache=True, max_concurrency=None):
+    """Extrahiert Aufgaben aus beliebig langem Text (Map-Reduce über Abschnitte).
+
+    Passt der Text in einen Abschnitt, wird direkt gestreamt. Sonst werden die Abschnitte
+    mit höchstens max_concurrency (Standard: LLM_MAX_CONCURRENCY) parallelen Aufrufen
+    analysiert; die Aufgaben kommen
+    in Dokumentreihenfolge (siehe _ready_chunk_tasks), fast gleiche Aufgaben werden
+    zusammengeführt, bevor sie geliefert werden.
+    """
+    chunks = split_text_into_chunks(text)
+    if len(chunks) == 1:
+        yield from iter_analyze_text_with_ai(chunks[0], use_cache)
+        return
+    debug_log("Protokoll in %s Abschnitte aufgeteilt", len(chunks), level=logging.INFO)
+    seen = []
+    results = [None] * len(chunks)
+    emitted = 0
+    workers = max(1, min(max_concurrency or LLM_MAX_CONCURRENCY, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze_text_with_ai, chunk, use_cache): idx for idx, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            ready, emitted = _ready_chunk_tasks(results, emitted, seen)
+            yield from ready
+
+def _ready_chunk_tasks(results, emitted, seen):
+    """Aufgaben der Abschnitte, die jetzt in Dokumentreihenfolge an der Reihe sind, und der neue Zähler.
+
+    results enthält je Abschnitt die Aufgabenliste oder None (noch nicht fertig). Ein Abschnitt ist an
+    der Reihe, wenn alle früheren geliefert sind und der nächste fertig ist (der letzte sofort): so
+    landen die Duplikate aus der Überlappung mit dem nächsten Abschnitt schon vor dem Ausliefern in
+    der Aufgabe, ebenso die aus allen anderen bereits fertigen späteren Abschnitten.
+    """
+    ready = []
+    while emitted < len(results) and results[emitted] is not None \
+            and (emitted + 1 == len(results) or results[emitted + 1] is not None):
+        chunk_tasks = list(_new_tasks(results[emitted], seen))
+        for later in results[emitted + 1:]:
+            for task in later or ():
+                duplicate = _find_duplicate_task(task, chunk_tasks)
+                if duplicate is not None:
+                    _merge_task_into(duplicate, task)
+        ready.extend(chunk_tasks)
+        emitted += 1
+    return ready, emitted
+
+def _new_tasks(tasks, seen):
+    """Aufgaben, die noch nicht (fast gleich) in seen stehen; Duplikate werden in die bekannte Aufgabe gemischt"""
+    for task in tasks:
+        duplicate = _find_duplicate_task(task, seen)
+        if duplicate is not None:
+            _merge_task_into(duplicate, task)
+            continue
+        seen.append(task)
+        yield task
+
+async def aiter_extract_tasks(text, use_cache=True):
+    """Wie iter_extract_tasks; die Abschnitte laufen als Coroutinen (höchstens LLM_MAX_CONCURRENCY gleichzeitig)"""
+    chunks = split_text_into_chunks(text)
+    if len(chunks) == 1:
+        async for task in aiter_analyze_text_with_ai(chunks[0], use_cache):
+            yield task
+        return
+    debug_log("Protokoll in %s Abschnitte aufgeteilt", len(chunks), level=logging.INFO)
+    semaphore = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+
+    async def analyze(idx, chunk):
+        async with semaphore:
+            return idx, [task async for task in aiter_analyze_text_with_ai(chunk, use_cache)]
+
+    seen = []
+    results = [None] * len(chunks)
+    emitted = 0
+    pending = [asyncio.ensure_future(analyze(idx, chunk)) for idx, chunk in enumerate(chunks)]
+    try:
+        for finished in asyncio.as_completed(pending):
+            idx, results[idx] = await finished
+            ready, emitted = _ready_chunk_tasks(results, emitted, seen)
+            for task in ready:
+                yield task
+    finally:
+        for future in pending:
+            future.cancel()
+
+def create_tasks_in_asana(tasks, workspace_gid, project_gid):
     """Erstellt die Aufgaben in Asana"""
     try:
-        # Hole Workspace und Projekt IDs
-        workspaces = get_workspaces()
-        workspace_gid = workspaces.get(workspace_name)
         if not workspace_gid:
             return "❌ Fehler: Workspace nicht gefunden"
-        
-        projects = get_projects(workspace_gid)
-        project_gid = projects.get(project_name)
         if not project_gid:
             return "❌ Fehler: Projekt nicht gefunden"
         
@@ -230,240 +2411,222 @@ def create_tasks_in_asana(tasks, workspace_name, project_name):
         users = get_workspace_users(workspace_gid)
         user_names = set(users.keys())
         
-        # Erstelle die Aufgaben
-        created_tasks = []
+        # Baue die Task-Daten
+        task_payloads = []
         for task in tasks:
-            try:
-                task_data = {
-                    "name": task['name'],
-                    "notes": task.get('description', ''),
-                    "workspace": workspace_gid,
-                    "projects": [project_gid]
-                }
-                # Füge Bearbeiter hinzu, wenn vorhanden und gültig
-                assignee = task.get('assignee')
-                if assignee and assignee in user_names:
-                    task_data["assignee"] = users[assignee]
-                # Füge Fälligkeitsdatum hinzu
-                if task.get('due_date'):
-                    task_data["due_on"] = task['due_date']
-                # API-Aufruf mit opts
-                opts = {"opt_fields": "name,gid,completed"}
-                result = tasks_api.create_task({"data": task_data}, opts)
+            task_data = {
+                "name": task['name'],
+                "notes": task.get('description', ''),
+                "workspace": workspace_gid,
+                "projects": [project_gid]
+            }
+            # Füge Bearbeiter hinzu, wenn vorhanden und gültig
+            assignee = task.get('assignee')
+            if assignee and assignee in user_names:
+                task_data["assignee"] = users[assignee]
+            # Füge Fälligkeitsdatum hinzu
+            if task.get('due_date'):
+                task_data["due_on"] = task['due_date']
+            task_payloads.append(task_data)
+        # Erstelle die Aufgaben parallel
+        created_tasks = []
+        for task, (result, error) in zip(tasks, create_tasks_concurrently(task_payloads)):
+            if error is None:
                 created_tasks.append(f"✅ {task['name']}")
-            except Exception as e:
-                created_tasks.append(f"❌ {task['name']} - Fehler: {str(e)}")
+            else:
+                created_tasks.append(f"❌ {task['name']} - Fehler: {str(error)}")
+        # Aufgabenliste des Projekts ist jetzt veraltet
+        asana_cache.invalidate('tasks', project_gid)
         return "\n".join(created_tasks)
     except Exception as e:
         return f"❌ Fehler beim Erstellen der Aufgaben: {str(e)}"
 
-def update_project_choices(workspace_name):
+@profiled('update_project_choices')
+def update_project_choices(workspace_gid):
     """Aktualisiert die Projektliste basierend auf dem ausgewählten Workspace"""
-    if not workspace_name:
+    if not workspace_gid:
         return gr.Dropdown(choices=[])
-    
-    workspaces = get_workspaces()
-    workspace_gid = workspaces.get(workspace_name)
-    
-    if workspace_gid:
-        projects = get_projects(workspace_gid)
-        project_names = sorted(list(projects.keys()))
-        return gr.Dropdown(choices=project_names)
-    return gr.Dropdown(choices=[])
+    return gr.Dropdown(choices=get_project_choices(workspace_gid))
 
-def update_user_choices(workspace_name):
+def update_user_choices(workspace_gid):
     """Aktualisiert die Benutzerliste basierend auf dem ausgewählten Workspace"""
-    if not workspace_name:
+    if not workspace_gid:
         return gr.Dropdown(choices=[])
-    
-    workspaces = get_workspaces()
-    workspace_gid = workspaces.get(workspace_name)
-    
-    if workspace_gid:
-        users = get_workspace_users(workspace_gid)
-        user_names = sorted(list(users.keys()))
-        return gr.Dropdown(choices=user_names)
-    return gr.Dropdown(choices=[])
-
-def update_tasks_on_project_change(workspace_name, project_name):
-    print(f"DEBUG: update_tasks_on_project_change aufgerufen mit workspace={workspace_name}, project={project_name}")
-    if not workspace_name or not project_name:
-        print("DEBUG: Kein Workspace oder Projekt ausgewählt")
-        dropdown = gr.Dropdown(choices=["(Bitte Projekt wählen)"], value=None, interactive=True)
-        suggestion = gr.Dropdown(choices=["(Bitte Projekt wählen)"], value=None, interactive=False)
-        return dropdown, suggestion
+    return gr.Dropdown(choices=get_user_choices(workspace_gid))
+
+def _parent_task_dropdowns(choices):
+    """Auswahl und (nicht editierbarer) Vorschlag für die übergeordnete Aufgabe"""
+    dropdown = gr.Dropdown(choices=choices, value=None, interactive=True)
+    suggestion = gr.Dropdown(choices=choices, value=None, interactive=False)
+    return dropdown, suggestion
+
+@profiled('update_tasks_on_project_change')
+def update_tasks_on_project_change(workspace_gid, project_gid):
+    debug_log("update_tasks_on_project_change aufgerufen mit workspace=%s, project=%s", workspace_gid, project_gid)
+    if not workspace_gid or not project_gid:
+        debug_log("Kein Workspace oder Projekt ausgewählt")
+        return _parent_task_dropdowns(["(Bitte Projekt wählen)"])
     try:
-        workspaces = get_workspaces()
-        print(f"DEBUG: Gefundene Workspaces: {workspaces}")
-        workspace_gid = workspaces.get(workspace_name)
-        print(f"DEBUG: Workspace GID: {workspace_gid}")
-        if not workspace_gid:
-            print("DEBUG: Keine Workspace GID gefunden")
-            dropdown = gr.Dropdown(choices=["(Kein Workspace gefunden)"], value=None, interactive=True)
-            suggestion = gr.Dropdown(choices=["(Kein Workspace gefunden)"], value=None, interactive=False)
-            return dropdown, suggestion
-        projects = get_projects(workspace_gid)
-        print(f"DEBUG: Gefundene Projekte: {projects}")
-        project_gid = projects.get(project_name)
-        print(f"DEBUG: Projekt GID: {project_gid}")
-        if not project_gid:
-            print("DEBUG: Keine Projekt GID gefunden")
-            dropdown = gr.Dropdown(choices=["(Kein Projekt gefunden)"], value=None, interactive=True)
-            suggestion = gr.Dropdown(choices=["(Kein Projekt gefunden)"], value=None, interactive=False)
-            return dropdown, suggestion
-        tasks = get_tasks(project_gid)
-        print(f"DEBUG: Gefundene Aufgaben: {tasks}")
-        if not tasks:
-            print("DEBUG: Keine Aufgaben gefunden")
-            dropdown = gr.Dropdown(choices=["(Keine Aufgaben gefunden)"], value=None, interactive=True)
-            suggestion = gr.Dropdown(choices=["(Keine Aufgaben gefunden)"], value=None, interactive=False)
-            return dropdown, suggestion
-        task_names = sorted(list(tasks.keys()))
-        print(f"DEBUG: Sortierte Aufgaben: {task_names}")
-        dropdown = gr.Dropdown(choices=task_names, value=None, interactive=True)
-        suggestion = gr.Dropdown(choices=task_names, value=None, interactive=False)
-        return dropdown, suggestion
+        task_choices = get_task_choices(project_gid)
+        if not task_choices:
+            debug_log("Keine Aufgaben gefunden")
+            return _parent_task_dropdowns(["(Keine Aufgaben gefunden)"])
+        debug_log("Anzahl Aufgaben: %s", len(task_choices))
+        return _parent_task_dropdowns(task_choices)
     except Exception as e:
-        print(f"DEBUG: Fehler in update_tasks_on_project_change: {str(e)}")
-        dropdown = gr.Dropdown(choices=["(Fehler beim Laden)"], value=None, interactive=True)
-        suggestion = gr.Dropdown(choices=["(Fehler beim Laden)"], value=None, interactive=False)
-        return dropdown, suggestion
+        debug_log("Fehler in update_tasks_on_project_change: %s", e, level=logging.ERROR)
+        return _parent_task_dropdowns(["(Fehler beim Laden)"])
+
+@profiled('update_project_choices')
+async def aupdate_project_choices(workspace_gid):
+    """Wie update_project_choices"""
+    if not workspace_gid:
+        return gr.Dropdown(choices=[])
+    return gr.Dropdown(choices=await aget_project_choices(workspace_gid))
 
-def create_tasks(result_markdown, workspace_name, project_gid, *assignee_and_due_values):
+@profiled('update_tasks_on_project_change')
+async def aupdate_tasks_on_project_change(workspace_gid, project_gid):
+    """Wie update_tasks_on_project_change"""
+    if not workspace_gid or not project_gid:
+        return _parent_task_dropdowns(["(Bitte Projekt wählen)"])
+    try:
+        task_choices = await aget_task_choices(project_gid)
+    except Exception as e:
+        debug_log("Fehler in aupdate_tasks_on_project_change: %s", e, level=logging.ERROR)
+        return _parent_task_dropdowns(["(Fehler beim Laden)"])
+    return _parent_task_dropdowns(task_choices or ["(Keine Aufgaben gefunden)"])
+
+def _parse_task_markdown(result_markdown, assignees, due_dates):
+    """Liest Aufgaben aus dem Ergebnis-Markdown ("- **Name**" mit Fällig-/Kontext-Zeilen) und
+    ergänzt Assignee und Fälligkeitsdatum aus den UI-Werten (Standard: heute)"""
+    tasks = []
+    current_task = {}
+    idx = 0
+    today_str = datetime.today().strftime("%Y-%m-%d")
+    for line in result_markdown.split('\n'):
+        if line.startswith('- **'):
+            if current_task:
+                if idx < len(assignees):
+                    current_task['assignee'] = assignees[idx]
+                # Setze heutiges Datum, falls kein due_date
+                if idx < len(due_dates) and due_dates[idx] and due_dates[idx] != "YYYY-MM-DD":
+                    current_task['due_date'] = due_dates[idx]
+                else:
+                    current_task['due_date'] = today_str
+                tasks.append(current_task)
+                debug_log("Aufgabe extrahiert: %s", LazyJson(current_task, indent=2))
+                current_task = {}
+                idx += 1
+            task_name = line.replace('- **', '').replace('**', '').strip()
+            current_task = {'name': task_name}
+        elif '📅 Fällig am:' in line:
+            current_task['due_date'] = line.split(':', 1)[1].strip()
+        elif '📝 Kontext:' in line:
+            current_task['context'] = line.split(':', 1)[1].strip()
+    if current_task:
+        if idx < len(assignees):
+            current_task['assignee'] = assignees[idx]
+        # Setze heutiges Datum, falls kein due_date
+        if idx < len(due_dates) and due_dates[idx] and due_dates[idx] != "YYYY-MM-DD":
+            current_task['due_date'] = due_dates[idx]
+        else:
+            current_task['due_date'] = today_str
+        tasks.append(current_task)
+        debug_log("Letzte Aufgabe extrahiert: %s", LazyJson(current_task, indent=2))
+    return tasks
+
+def create_tasks(result_markdown, workspace_gid, project_gid, *assignee_and_due_values):
     """Erstellt die Aufgaben in Asana direkt im gewählten Projekt (ohne Unteraufgabenstruktur)"""
     try:
         debug_log("create_tasks wurde aufgerufen")
-        debug_log(f"workspace_name = {workspace_name}")
-        debug_log(f"project_gid = {project_gid}")
-        debug_log(f"result_markdown = {result_markdown}")
-        debug_log(f"assignee_and_due_values = {assignee_and_due_values}")
+        debug_log("workspace_gid = %s", workspace_gid)
+        debug_log("project_gid = %s", project_gid)
+        debug_log("result_markdown = %s", result_markdown)
+        debug_log("assignee_and_due_values = %s", assignee_and_due_values)
         
         if not result_markdown or result_markdown.startswith("Bitte") or result_markdown.startswith("❌"):
             return "Bitte analysiere zuerst das Protokoll."
         
         # Extrahiere die Aufgaben
-        tasks = []
-        current_task = {}
-        idx = 0
         num_fields = int(len(assignee_and_due_values) / 2)
         assignees = assignee_and_due_values[:num_fields]
         due_dates = assignee_and_due_values[num_fields:]
-        today_str = datetime.today().strftime("%Y-%m-%d")
-        
-        debug_log(f"Anzahl der Assignees: {len(assignees)}")
-        debug_log(f"Anzahl der Due Dates: {len(due_dates)}")
         
-        for line in result_markdown.split('\n'):
-            if line.startswith('- **'):
-                if current_task:
-                    if idx < len(assignees):
-                        current_task['assignee'] = assignees[idx]
-                    # Setze heutiges Datum, falls kein due_date
-                    if idx < len(due_dates) and due_dates[idx] and due_dates[idx] != "YYYY-MM-DD":
-                        current_task['due_date'] = due_dates[idx]
-                    else:
-                        current_task['due_date'] = today_str
-                    tasks.append(current_task)
-                    debug_log(f"Aufgabe extrahiert: {json.dumps(current_task, ensure_ascii=False, indent=2)}")
-                    current_task = {}
-                    idx += 1
-                task_name = line.replace('- **', '').replace('**', '').strip()
-                current_task = {'name': task_name}
-            elif '📅 Fällig am:' in line:
-                current_task['due_date'] = line.split(':', 1)[1].strip()
-            elif '📝 Kontext:' in line:
-                current_task['context'] = line.split(':', 1)[1].strip()
-        if current_task:
-            if idx < len(assignees):
-                current_task['assignee'] = assignees[idx]
-            # Setze heutiges Datum, falls kein due_date
-            if idx < len(due_dates) and due_dates[idx] and due_dates[idx] != "YYYY-MM-DD":
-                current_task['due_date'] = due_dates[idx]
-            else:
-                current_task['due_date'] = today_str
-            tasks.append(current_task)
-            debug_log(f"Letzte Aufgabe extrahiert: {json.dumps(current_task, ensure_ascii=False, indent=2)}")
+        debug_log("Anzahl der Assignees: %s", len(assignees))
+        debug_log("Anzahl der Due Dates: %s", len(due_dates))
+        tasks = _parse_task_markdown(result_markdown, assignees, due_dates)
         
-        debug_log(f"Alle extrahierten Aufgaben: {json.dumps(tasks, ensure_ascii=False, indent=2)}")
+        debug_log("Alle extrahierten Aufgaben: %s", LazyJson(tasks, indent=2))
         
         if not tasks:
             return "Keine Aufgaben zum Erstellen gefunden."
         
-        # Hole Workspace und Projekt-IDs
-        workspaces = get_workspaces()
-        workspace_gid = workspaces.get(workspace_name)
-        user_dict = get_workspace_users(workspace_gid)
         # Prüfe IDs
         if not workspace_gid:
-            return f"❌ Fehler: Workspace-ID für '{workspace_name}' nicht gefunden."
+            return "❌ Fehler: Workspace-ID nicht gefunden oder nicht ausgewählt."
+        user_dict = get_workspace_users(workspace_gid)
         if not project_gid:
-            return f"❌ Fehler: Projekt-ID nicht gefunden oder nicht ausgewählt."
+            return "❌ Fehler: Projekt-ID nicht gefunden oder nicht ausgewählt."
+        
+        # Baue die Task-Daten im korrekten Format
+        task_payloads = []
+        for task in tasks:
+            task_data = {
+                "name": task['name'],
+                "notes": task.get('context', ''),
+                "workspace": workspace_gid,
+                "projects": [str(project_gid)]  # Verwende projects für Hauptaufgaben
+            }
+            
+            # Assignee
+            if task.get('assignee') and user_dict.get(task['assignee']):
+                task_data["assignee"] = user_dict[task['assignee']]
+            
+            # Due Date
+            if task.get('due_date'):
+                try:
+                    parsed_date = datetime.strptime(task['due_date'], "%Y-%m-%d")
+                    task_data["due_on"] = parsed_date.strftime("%Y-%m-%d")
+                except ValueError:
+                    pass
+            
+            debug_log("Task Data für API-Aufruf: %s", LazyJson(task_data, indent=2))
+            task_payloads.append(task_data)
         
-        # Erstelle die Aufgaben in Asana direkt im Projekt
+        # Erstelle die Aufgaben in Asana direkt im Projekt (parallel, Reihenfolge bleibt erhalten)
         created_tasks = []
-        for task in tasks:
-            try:
-                # Erstelle die Task-Daten im korrekten Format
-                task_data = {
-                    "data": {
-                        "name": task['name'],
-                        "notes": task.get('context', ''),
-                        "workspace": workspace_gid,
-                        "projects": [str(project_gid)]  # Verwende projects für Hauptaufgaben
-                    }
-                }
-                
-                # Assignee
-                if task.get('assignee') and user_dict.get(task['assignee']):
-                    task_data["data"]["assignee"] = user_dict[task['assignee']]
-                
-                # Due Date
-                if task.get('due_date'):
-                    try:
-                        parsed_date = datetime.strptime(task['due_date'], "%Y-%m-%d")
-                        task_data["data"]["due_on"] = parsed_date.strftime("%Y-%m-%d")
-                    except ValueError:
-                        pass
-                
-                debug_log(f"Task Data für API-Aufruf: {json.dumps(task_data, ensure_ascii=False, indent=2)}")
-                
-                # Debug-Ausgaben für API-Aufruf
-                api_data = {"data": task_data["data"]}
-                api_opts = {"opt_fields": "name,gid,completed"}
-                debug_log(f"API Data: {api_data}")
-                debug_log(f"API Options: {api_opts}")
-                debug_log(f"API Call: tasks_api.create_task({api_data}, {api_opts})")
-                
-                # API-Aufruf mit korrekter Struktur und Reihenfolge der Parameter
-                result = tasks_api.create_task(api_data, api_opts)
-                debug_log(f"API Response: {result}")
-                
-                created_name = None
-                if hasattr(result, '_data'):
-                    # Wenn result ein Objekt mit _data Attribut ist
-                    data = result._data
-                    if isinstance(data, dict):
-                        created_name = data.get('name')
-                elif isinstance(result, dict):
-                    # Wenn result direkt ein Dictionary ist
-                    if 'data' in result:
-                        created_name = result['data'].get('name')
-                    else:
-                        created_name = result.get('name')
-                
-                created_tasks.append({
-                    "name": created_name or task['name'],
-                    "assignee": task.get('assignee', ''),
-                    "due_date": task.get('due_date', ''),
-                    "status": "erstellt"
-                })
-            except Exception as e:
-                print("Unexpected Error:", str(e))  # Debug-Ausgabe
+        for task, (result, error) in zip(tasks, create_tasks_concurrently(task_payloads)):
+            if error is not None:
+                print("Unexpected Error:", str(error))  # Debug-Ausgabe
                 created_tasks.append({
                     "name": task['name'],
-                    "error": str(e),
+                    "error": str(error),
                     "status": "fehlgeschlagen"
                 })
+                continue
+            debug_log("API Response: %s", result)
+            
+            created_name = None
+            if hasattr(result, '_data'):
+                # Wenn result ein Objekt mit _data Attribut ist
+                data = result._data
+                if isinstance(data, dict):
+                    created_name = data.get('name')
+            elif isinstance(result, dict):
+                # Wenn result direkt ein Dictionary ist
+                if 'data' in result:
+                    created_name = result['data'].get('name')
+                else:
+                    created_name = result.get('name')
+            
+            created_tasks.append({
+                "name": created_name or task['name'],
+                "assignee": task.get('assignee', ''),
+                "due_date": task.get('due_date', ''),
+                "status": "erstellt"
+            })
+        # Aufgabenliste des Projekts ist jetzt veraltet
+        asana_cache.invalidate('tasks', str(project_gid))
         
         # Formatiere die Ausgabe
         output = "### Erstellte Aufgaben:\n\n"
@@ -484,17 +2647,15 @@ def create_tasks(result_markdown, workspace_name, project_gid, *assignee_and_due
         print("Unexpected Error:", str(e))  # Debug-Ausgabe
         return f"❌ Fehler beim Erstellen der Aufgaben: {str(e)}"
 
-def suggest_matching_parent_task(protocol_text, parent_task_names):
-    """Analysiert den Protokolltext und schlägt die passendste Parent-Task vor."""
-    # Konvertiere Text und Aufgabennamen zu Kleinbuchstaben für besseren Vergleich
-    text_lower = protocol_text.lower()
-    # Extrahiere potenzielle Projekt-IDs aus dem Text
-    project_ids = re.findall(r'[A-Z]{3,4}(?:[A-Z0-9]+)?', protocol_text)
-    project_ids = [pid.lower() for pid in project_ids]
-    # Extrahiere Schlüsselwörter aus dem Text
-    text_keywords = set(text_lower.split())
-    # Schlüsselwörter und ihre Gewichtung
-    keywords = {
+# Gewichte für den Parent-Task-Vorschlag, per PARENT_TASK_WEIGHTS (JSON) teilweise überschreibbar
+DEFAULT_PARENT_TASK_WEIGHTS = {
+    'project_id_exact': 50,
+    'project_id_prefix': 30,
+    'common_word': 3,
+    # Nur im TF-IDF-Modus: Faktor für die Kosinus-Ähnlichkeit (0..1) der Zeichen-N-Gramme
+    'tfidf_similarity': 100,
+    # Schlüsselwörter zählen je einmal für den Task-Namen und einmal für den Protokolltext
+    'keywords': {
         'website': 3,
         'web': 2,
         'entwicklung': 2,
@@ -505,63 +2666,537 @@ def suggest_matching_parent_task(protocol_text, parent_task_names):
         'startseite': 3,
         'mockup': 3,
         'staging': 2
+    },
+    # Zeitliche Relevanz: nur das erste passende Jahr zählt
+    'years': {
+        '2025': 3,
+        '2024': 2
     }
-    # Bewertung für jede Aufgabe
-    task_scores = {}
-    for task_name in parent_task_names:
-        score = 0
-        task_lower = task_name.lower()
-        # Extrahiere Projekt-ID aus dem Task-Namen
-        task_match = re.search(r'([A-Z]{3,4}[A-Z0-9]*)', task_name)
-        if task_match:
-            task_project_id = task_match.group(1).lower()
-            # Prüfe auf exakte Projekt-ID Übereinstimmungen
-            if task_project_id in project_ids:
-                score += 50
-            else:
-                for pid in project_ids:
-                    if pid[:3] == task_project_id[:3]:
-                        score += 30
-        # Prüfe auf thematische Übereinstimmungen
-        task_words = set(task_lower.split())
-        # Score für gemeinsame Wörter
-        common_words = text_keywords.intersection(task_words)
-        score += len(common_words) * 3
-        # Score basierend auf Schlüsselwörtern
-        for keyword, weight in keywords.items():
-            if keyword in task_lower:
-                score += weight
-            if keyword in text_lower:
-                score += weight
-        # Zeitliche Relevanz
-        if "2025" in task_name:
-            score += 3
-        elif "2024" in task_name:
-            score += 2
-        # Speichere Score nur für relevante Aufgaben
-        if score > 0:
-            task_scores[task_name] = score
-    # Sortiere Aufgaben nach Score
-    sorted_tasks = sorted(
-        task_scores.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )
-    # Debug-Ausgabe der Scores
-    debug_log("\nParent-Task-Scores:")
-    for task, score in sorted_tasks[:10]:
-        debug_log(f"{task}: {score}")
-    # Gib die Top-Aufgabe zurück
-    if sorted_tasks:
-        return sorted_tasks[0][0]
-    elif parent_task_names:
-        return parent_task_names[0]
-    else:
+}
+PARENT_TASK_WEIGHTS = dict(DEFAULT_PARENT_TASK_WEIGHTS, **json.loads(os.getenv('PARENT_TASK_WEIGHTS', '{}')))
+# Bewertungsmodus: 'keywords' (Schlüsselwörter/gemeinsame Wörter) oder 'tfidf' (Zeichen-N-Gramme, benötigt numpy/scipy)
+PARENT_TASK_SCORING = os.getenv('PARENT_TASK_SCORING', 'keywords').lower()
+TFIDF_NGRAM_RANGE = (3, 5)
+
+class ParentTaskScorer:
+    """Bewertet die Aufgaben eines Projekts als Parent-Task für einen Protokolltext.
+
+    Wird einmal pro Aufgabenliste gebaut: Alle nur vom Task-Namen abhängigen Anteile
+    (Schlüsselwörter, Jahr) sind vorberechnet, Wörter und Projekt-IDs der Namen liegen
+    in invertierten Indizes (numpy-Arrays). Pro Anfrage werden nur die Merkmale des Textes
+    einmal berechnet; die Punkte aller Aufgaben entstehen ohne Python-Schleife je Treffer
+    (bincount über die Postings der Textwörter), sodass auch häufige Wörter billig bleiben.
+    """
+
+    TEXT_PROJECT_ID = re.compile(r'[A-Z]{3,4}(?:[A-Z0-9]+)?')
+    TASK_PROJECT_ID = re.compile(r'([A-Z]{3,4}[A-Z0-9]*)')
+
+    def __init__(self, task_names, weights=None, task_gids=None):
+        import numpy as np
+        self.task_names = list(task_names)
+        self.task_gids = list(task_gids) if task_gids is not None else [None] * len(self.task_names)
+        self.weights = weights or PARENT_TASK_WEIGHTS
+        keywords = self.weights['keywords']
+        years = self.weights['years']
+        base_scores = []
+        self._task_project_ids = []
+        self._by_prefix = defaultdict(list)
+        by_word = defaultdict(list)
+        for idx, task_name in enumerate(self.task_names):
+            task_lower = task_name.lower()
+            base = sum(weight for keyword, weight in keywords.items() if keyword in task_lower)
+            for year, weight in years.items():
+                if year in task_name:
+                    base += weight
+                    break
+            base_scores.append(base)
+            task_match = self.TASK_PROJECT_ID.search(task_name)
+            task_project_id = task_match.group(1).lower() if task_match else None
+            self._task_project_ids.append(task_project_id)
+            if task_project_id:
+                self._by_prefix[task_project_id[:3]].append(idx)
+            for word in set(task_lower.split()):
+                by_word[word].append(idx)
+        self._base_scores = np.asarray(base_scores, dtype=np.float64)
+        # Alle Postings hintereinander in einem Array, je Wort (Anfang, Ende)
+        postings = []
+        self._word_spans = {}
+        for word, idxs in by_word.items():
+            self._word_spans[word] = (len(postings), len(postings) + len(idxs))
+            postings.extend(idxs)
+        self._postings = np.asarray(postings, dtype=np.int32)
+        # Projekt-IDs als Zahlen (-1 ohne ID), damit ganze Präfix-Listen auf einmal verglichen werden
+        project_id_codes = {}
+        self._project_id_codes = np.asarray(
+            [project_id_codes.setdefault(pid, len(project_id_codes)) if pid else -1 for pid in self._task_project_ids],
+            dtype=np.int32
+        )
+        self._project_id_vocabulary = project_id_codes
+        self._prefix_postings = {prefix: np.asarray(idxs, dtype=np.int32) for prefix, idxs in self._by_prefix.items()}
+
+    def _text_features(self, protocol_text):
+        text_lower = protocol_text.lower()
+        project_ids = [pid.lower() for pid in self.TEXT_PROJECT_ID.findall(protocol_text)]
+        text_bonus = sum(weight for keyword, weight in self.weights['keywords'].items() if keyword in text_lower)
+        return set(project_ids), Counter(pid[:3] for pid in project_ids), set(text_lower.split()), text_bonus
+
+    def _project_id_scores(self, project_ids, prefix_counts):
+        """Punkte für Aufgaben, deren Projekt-ID (oder deren Präfix) im Text vorkommt"""
+        scores = defaultdict(int)
+        for prefix, count in prefix_counts.items():
+            for idx in self._by_prefix.get(prefix, ()):
+                if self._task_project_ids[idx] in project_ids:
+                    scores[idx] += self.weights['project_id_exact']
+                else:
+                    scores[idx] += self.weights['project_id_prefix'] * count
+        return scores
+
+    def _score_array(self, protocol_text):
+        """Punkte aller Aufgaben für den Text als numpy-Array"""
+        import numpy as np
+        project_ids, prefix_counts, text_words, text_bonus = self._text_features(protocol_text)
+        scores = self._base_scores + text_bonus
+        spans = [self._word_spans[word] for word in text_words if word in self._word_spans]
+        if spans:
+            hits = np.concatenate([self._postings[start:end] for start, end in spans])
+            scores += self.weights['common_word'] * np.bincount(hits, minlength=len(self.task_names))
+        exact_codes = [self._project_id_vocabulary[pid] for pid in project_ids if pid in self._project_id_vocabulary]
+        for prefix, count in prefix_counts.items():
+            idxs = self._prefix_postings.get(prefix)
+            if idxs is None:
+                continue
+            # Jede Aufgabe steht unter genau einem Präfix, die Indizes sind also eindeutig
+            exact = np.isin(self._project_id_codes[idxs], exact_codes)
+            scores[idxs] += np.where(exact, self.weights['project_id_exact'], self.weights['project_id_prefix'] * count)
+        return scores
+
+    def top(self, protocol_text, k=1):
+        """Die k besten Aufgaben als (Index, Name, Punkte), nur Aufgaben mit Punkten > 0;
+        bei Gleichstand gewinnt die frühere Aufgabe"""
+        import numpy as np
+        if not self.task_names:
+            return []
+        scores = self._score_array(protocol_text)
+        if k == 1:
+            ranked = [int(np.argmax(scores))]
+        else:
+            k = min(k, len(scores))
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            candidates = np.flatnonzero(scores >= threshold)
+            ranked = candidates[np.lexsort((candidates, -scores[candidates]))][:k].tolist()
+        return [(idx, self.task_names[idx], scores[idx].item()) for idx in ranked if scores[idx] > 0]
+
+    def scores(self, protocol_text):
+        """Alle Aufgaben mit Punkten > 0 als {Name: Punkte} (zum Debuggen)"""
+        import numpy as np
+        if not self.task_names:
+            return {}
+        scores = self._score_array(protocol_text)
+        return {self.task_names[idx]: scores[idx].item() for idx in np.flatnonzero(scores > 0).tolist()}
+
+    def suggest(self, protocol_text):
+        """Passendster Parent-Task als (Name, GID); ohne Treffer die erste Aufgabe, ohne Aufgaben (None, None)"""
+        ranked = self.top(protocol_text, k=10 if logger.isEnabledFor(logging.DEBUG) else 1)
+        # Debug-Ausgabe der Scores
+        if logger.isEnabledFor(logging.DEBUG):
+            debug_log("\nParent-Task-Scores:")
+            for _, task_name, score in ranked:
+                debug_log("%s: %s", task_name, score)
+        if ranked:
+            idx = ranked[0][0]
+        elif self.task_names:
+            idx = 0
+        else:
+            return None, None
+        return self.task_names[idx], self.task_gids[idx]
+
+_UMLAUT_TRANSLATION = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+def _char_ngrams(text, ngram_range=TFIDF_NGRAM_RANGE):
+    """Zeichen-N-Gramme je Wort (mit Leerzeichen als Wortgrenze) als Counter; Umlaute und Groß-/Kleinschreibung gefaltet"""
+    text = re.sub(r'[^0-9a-z]+', ' ', text.casefold().translate(_UMLAUT_TRANSLATION))
+    n_min, n_max = ngram_range
+    counts = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for n in range(n_min, n_max + 1):
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+    return counts
+
+class TfidfParentTaskScorer(ParentTaskScorer):
+    """Parent-Task-Vorschlag über TF-IDF-gewichtete Zeichen-N-Gramme.
+
+    Die Task-Namen liegen als dünn besetzte Matrix (CSR, Rohhäufigkeiten) vor; IDF und
+    Zeilennormen werden beim Bauen bzw. Erweitern berechnet. Eine Anfrage ist ein
+    einziges Matrix-Vektor-Produkt, danach kommen die Projekt-ID-Punkte obendrauf.
+    Neue Aufgaben werden mit with_tasks() angehängt, ohne die bestehenden Zeilen neu
+    zu zerlegen; die Instanz selbst wird nie verändert (sicher bei parallelen Anfragen).
+    """
+
+    def __init__(self, task_names, weights=None, task_gids=None):
+        import numpy as np
+        self.weights = weights or PARENT_TASK_WEIGHTS
+        self.task_names = []
+        self.task_gids = []
+        self._task_project_ids = []
+        self._by_prefix = defaultdict(list)
+        self._vocabulary = {}
+        self._df = []
+        self._data = np.zeros(0, dtype=np.float64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._add_tasks(task_names, task_gids)
+
+    def with_tasks(self, task_names, task_gids=None):
+        """Neuer Scorer mit zusätzlichen Aufgaben; bestehende Zeilen werden übernommen"""
+        scorer = object.__new__(type(self))
+        scorer.weights = self.weights
+        scorer.task_names = list(self.task_names)
+        scorer.task_gids = list(self.task_gids)
+        scorer._task_project_ids = list(self._task_project_ids)
+        scorer._by_prefix = defaultdict(list, {prefix: list(idxs) for prefix, idxs in self._by_prefix.items()})
+        scorer._vocabulary = dict(self._vocabulary)
+        scorer._df = list(self._df)
+        scorer._data, scorer._indices, scorer._indptr = self._data, self._indices, self._indptr
+        scorer._add_tasks(task_names, task_gids)
+        return scorer
+
+    def _add_tasks(self, task_names, task_gids):
+        import numpy as np
+        from scipy import sparse
+        task_names = list(task_names)
+        task_gids = list(task_gids) if task_gids is not None else [None] * len(task_names)
+        data, indices, indptr = [], [], []
+        for task_name, task_gid in zip(task_names, task_gids):
+            idx = len(self.task_names)
+            self.task_names.append(task_name)
+            self.task_gids.append(task_gid)
+            task_match = self.TASK_PROJECT_ID.search(task_name)
+            task_project_id = task_match.group(1).lower() if task_match else None
+            self._task_project_ids.append(task_project_id)
+            if task_project_id:
+                self._by_prefix[task_project_id[:3]].append(idx)
+            for gram, count in _char_ngrams(task_name).items():
+                col = self._vocabulary.setdefault(gram, len(self._vocabulary))
+                if col == len(self._df):
+                    self._df.append(0)
+                self._df[col] += 1
+                indices.append(col)
+                data.append(count)
+            indptr.append(int(self._indptr[-1]) + len(indices))
+        # Sublineare Termhäufigkeit, damit wiederholte Wörter nicht dominieren
+        self._data = np.concatenate([self._data, 1.0 + np.log(np.asarray(data, dtype=np.float64))])
+        self._indices = np.concatenate([self._indices, np.asarray(indices, dtype=np.int32)])
+        self._indptr = np.concatenate([self._indptr, np.asarray(indptr, dtype=np.int64)])
+        self._matrix = sparse.csr_matrix((self._data, self._indices, self._indptr),
+                                         shape=(len(self.task_names), len(self._vocabulary)))
+        # Glatte IDF wie bei scikit-learn; sie ändert sich mit jeder neuen Aufgabe, daher
+        # werden die Zeilennormen (O(Einträge), ohne Python-Schleife) neu berechnet
+        df = np.asarray(self._df, dtype=np.float64)
+        self._idf = np.log((1.0 + len(self.task_names)) / (1.0 + df)) + 1.0
+        squared = self._matrix.multiply(self._matrix).tocsr()
+        norms = np.sqrt(squared @ (self._idf ** 2))
+        norms[norms == 0] = 1.0
+        self._row_norms = norms
+
+    def _similarities(self, protocol_text):
+        """Kosinus-Ähnlichkeit des Textes zu allen Task-Namen (ein Matrix-Vektor-Produkt)"""
+        import numpy as np
+        query = np.zeros(len(self._vocabulary), dtype=np.float64)
+        for gram, count in _char_ngrams(protocol_text).items():
+            col = self._vocabulary.get(gram)
+            if col is not None:
+                query[col] = 1.0 + math.log(count)
+        query *= self._idf
+        query_norm = np.linalg.norm(query)
+        if not query_norm:
+            return np.zeros(len(self.task_names), dtype=np.float64)
+        return (self._matrix @ (query * self._idf)) / (self._row_norms * query_norm)
+
+    def _score_vector(self, protocol_text):
+        scores = self._similarities(protocol_text) * self.weights['tfidf_similarity']
+        project_ids, prefix_counts, _, _ = self._text_features(protocol_text)
+        for idx, score in self._project_id_scores(project_ids, prefix_counts).items():
+            scores[idx] += score
+        return scores
+
+    def top(self, protocol_text, k=1):
+        """Die k besten Aufgaben als (Index, Name, Punkte), nur Aufgaben mit Punkten > 0"""
+        import numpy as np
+        if not self.task_names:
+            return []
+        scores = self._score_vector(protocol_text)
+        k = min(k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = sorted(candidates.tolist(), key=lambda i: (-scores[i], i))
+        return [(idx, self.task_names[idx], float(scores[idx])) for idx in ranked if scores[idx] > 0]
+
+    def scores(self, protocol_text):
+        """Alle Aufgaben mit Punkten > 0 als {Name: Punkte} (zum Debuggen, O(Aufgaben))"""
+        if not self.task_names:
+            return {}
+        scores = self._score_vector(protocol_text)
+        return {self.task_names[idx]: float(scores[idx]) for idx in scores.nonzero()[0].tolist() if scores[idx] > 0}
+
+def _build_parent_task_scorer(task_pairs, previous=None):
+    """Scorer im konfigurierten Modus; im TF-IDF-Modus werden neue Aufgaben an den vorherigen Scorer angehängt"""
+    task_names = [name for name, _ in task_pairs]
+    task_gids = [gid for _, gid in task_pairs]
+    if PARENT_TASK_SCORING == 'tfidf':
+        try:
+            if isinstance(previous, TfidfParentTaskScorer):
+                known = len(previous.task_names)
+                # Nur reiner Zuwachs am Ende wird angehängt: sind bisherige (Name, GID)-Paare umbenannt,
+                # weggefallen oder umsortiert, neu bauen (sonst alte N-Gramme und andere Reihenfolge)
+                if list(zip(task_names[:known], task_gids[:known])) == list(zip(previous.task_names, previous.task_gids)):
+                    if len(task_pairs) == known:
+                        return previous
+                    return previous.with_tasks(task_names[known:], task_gids[known:])
+            return TfidfParentTaskScorer(task_names, task_gids=task_gids)
+        except ImportError as e:
+            debug_log("TF-IDF-Bewertung nicht verfügbar (%s), verwende Schlüsselwörter", e, level=logging.WARNING)
+    return ParentTaskScorer(task_names, task_gids=task_gids)
+
+def get_parent_task_scorer(project_gid):
+    """ParentTaskScorer für die offenen Aufgaben eines Projekts; wird neu gebaut, sobald sich die Aufgabenliste ändert"""
+    if not project_gid:
+        return ParentTaskScorer([])
+    try:
+        task_pairs = asana_cache.get_or_load('tasks', project_gid, lambda: _load_tasks(project_gid))
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Aufgaben: {str(e)}")
+        return ParentTaskScorer([])
+    return _parent_task_scorer_for(project_gid, task_pairs)
+
+def _parent_task_scorer_for(project_gid, task_pairs):
+    """Gecachter Scorer zu genau dieser Aufgabenliste (sonst inkrementell bzw. neu gebaut)"""
+    built_from, scorer = asana_cache.get_or_load('scorer', project_gid, lambda: (task_pairs, _build_parent_task_scorer(task_pairs)))
+    if built_from is not task_pairs:
+        scorer = _build_parent_task_scorer(task_pairs, previous=scorer)
+        asana_cache.put('scorer', project_gid, (task_pairs, scorer))
+    return scorer
+
+async def aget_parent_task_scorer(project_gid):
+    """Wie get_parent_task_scorer; der Scorer wird in einem Worker-Thread gebaut"""
+    if not project_gid:
+        return ParentTaskScorer([])
+    try:
+        task_pairs = await asana_cache.aget_or_load('tasks', project_gid, lambda: _aload_tasks(project_gid))
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Aufgaben: {str(e)}")
+        return ParentTaskScorer([])
+    return await asyncio.to_thread(_parent_task_scorer_for, project_gid, task_pairs)
+
+def suggest_matching_parent_task(protocol_text, parent_task_names):
+    """Analysiert den Protokolltext und schlägt die passendste Parent-Task vor."""
+    return _build_parent_task_scorer([(name, None) for name in parent_task_names]).suggest(protocol_text)[0]
+
+# Excel-Import: 'stream' liest .xlsx zeilenweise mit openpyxl (read-only, alle Blätter),
+# 'pandas' lädt wie bisher das erste Blatt komplett; .xls geht immer über pandas
+EXCEL_READER = os.getenv('EXCEL_READER', 'stream').lower()
+EXCEL_MAX_ROWS = int(os.getenv('EXCEL_MAX_ROWS', 10000))
+EXCEL_MAX_CHARS = int(os.getenv('EXCEL_MAX_CHARS', 300000))
+# Anzahl Zeilen je Blatt, anhand derer über die Kopfzeile entschieden wird
+EXCEL_HEADER_SAMPLE_ROWS = 20
+
+def _format_excel_cell(value):
+    if isinstance(value, datetime):
+        return value.strftime('%d.%m.%Y') if not (value.hour or value.minute or value.second) else value.strftime('%d.%m.%Y %H:%M')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+def _detect_excel_header(sample_rows):
+    """Erste Zeile ist Kopfzeile, wenn sie aus mind. zwei verschiedenen Texten besteht, die in ihrer Spalte nicht wiederkehren"""
+    if not sample_rows:
+        return None
+    first = sample_rows[0]
+    cells = [(col, value) for col, value in enumerate(first) if value is not None and str(value).strip()]
+    if len(cells) < 2 or not all(isinstance(value, str) for _, value in cells):
         return None
+    if len({value.strip() for _, value in cells}) != len(cells):
+        return None
+    for row in sample_rows[1:]:
+        if any(col < len(row) and row[col] == value for col, value in cells):
+            return None
+    return {col: value.strip() for col, value in cells}
+
+def iter_excel_rows(file_path):
+    """Liefert die bereinigten Zeilen aller Blätter einer .xlsx-Datei einzeln (konstanter Speicherbedarf).
+
+    Leere Zellen entfallen, leere Zeilen werden übersprungen; mit erkannter Kopfzeile
+    wird jede Zelle als "Spalte: Wert" ausgegeben. Jedes Blatt beginnt mit seinem Namen.
+    """
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            sample = []
+            for row in rows:
+                if any(value is not None and str(value).strip() for value in row):
+                    sample.append(row)
+                    if len(sample) >= EXCEL_HEADER_SAMPLE_ROWS:
+                        break
+            if not sample:
+                continue
+            header = _detect_excel_header(sample)
+            yield f"[{sheet.title}]"
+            pending = iter(sample[1:] if header else sample)
+            for row in (r for source in (pending, rows) for r in source):
+                cells = []
+                for col, value in enumerate(row):
+                    if value is None:
+                        continue
+                    text = _format_excel_cell(value)
+                    if not text:
+                        continue
+                    cells.append(f"{header[col]}: {text}" if header and col in header else text)
+                if cells:
+                    yield ', '.join(cells)
+    finally:
+        workbook.close()
+
+def _excel_to_text_stream(file_path):
+    lines = []
+    chars = 0
+    for line in iter_excel_rows(file_path):
+        if len(lines) >= EXCEL_MAX_ROWS or chars + len(line) > EXCEL_MAX_CHARS:
+            debug_log("Excel-Datei nach %d Zeilen / %d Zeichen gekürzt", len(lines), chars, level=logging.WARNING)
+            lines.append("[... gekürzt]")
+            break
+        lines.append(line)
+        chars += len(line) + 1
+    return '\n'.join(lines)
+
+# Mindestähnlichkeit (difflib-Ratio) für die unscharfe Assignee-Zuordnung
+ASSIGNEE_FUZZY_CUTOFF = float(os.getenv('ASSIGNEE_FUZZY_CUTOFF', 0.85))
+_NAME_TITLES = frozenset({'herr', 'hr', 'frau', 'fr', 'dr', 'mag', 'ing', 'di', 'dipl', 'prof', 'msc', 'bsc', 'ba', 'ma'})
+
+def _fold_name(text):
+    """Vergleichsform eines Namens: casefold, Umlaute als ae/oe/ue/ss, Akzente und Satzzeichen entfernt, Titel weggelassen"""
+    text = unicodedata.normalize('NFKD', text.casefold().translate(_UMLAUT_TRANSLATION))
+    text = re.sub(r'[^0-9a-z]+', ' ', ''.join(ch for ch in text if not unicodedata.combining(ch)))
+    return ' '.join(word for word in text.split() if word not in _NAME_TITLES)
+
+class AssigneeIndex:
+    """Ordnet von der KI erkannte Namen den Workspace-Benutzern zu.
+
+    Wird einmal pro Benutzerliste gebaut. Die Schlüssel liegen in Stufen von eindeutig
+    (voller Name, E-Mail) bis vage (Vorname, Initialen); eine Anfrage prüft die Stufen
+    nacheinander per Dictionary-Zugriff. Ist die erste getroffene Stufe mehrdeutig, gibt
+    es keine Zuordnung. Erst danach wird unscharf (difflib) mit vollen Namen und
+    Nachnamen verglichen; diese Ergebnisse werden je Index gecacht.
+    """
+
+    def __init__(self, user_records, excluded=EXCLUDED_USERS):
+        excluded = frozenset(_fold_name(entry) for entry in excluded) | frozenset(entry.casefold() for entry in excluded)
+        # Stufen: voller Name/E-Mail, Vor- und Nachname, Initial und Nachname, Nachname, Vorname, Initialen
+        self._tiers = [defaultdict(set) for _ in range(6)]
+        self._users = {}
+        self._fuzzy_cache = {}
+        for name, gid, email in user_records:
+            folded = _fold_name(name)
+            email = (email or '').casefold()
+            if folded in excluded or email in excluded:
+                continue
+            self._users[gid] = name
+            words = folded.split()
+            local_part = email.split('@')[0]
+            full, pair, initial, last, first, initials = self._tiers
+            full[folded].add(gid)
+            if _fold_name(local_part):
+                full[_fold_name(local_part)].add(gid)
+            if len(words) >= 2:
+                pair[f"{words[0]} {words[-1]}"].add(gid)
+                pair[f"{words[-1]} {words[0]}"].add(gid)
+                initial[f"{words[0][0]} {words[-1]}"].add(gid)
+                initial[f"{words[0][0]}{words[-1]}"].add(gid)
+                last[words[-1]].add(gid)
+                first[words[0]].add(gid)
+                initials[''.join(word[0] for word in words)].add(gid)
+            elif words:
+                first[words[0]].add(gid)
+        # Kandidaten für den unscharfen Vergleich: volle Namen, E-Mail-Teile und Nachnamen
+        self._fuzzy_keys = defaultdict(set)
+        for tier in (self._tiers[0], self._tiers[3]):
+            for key, gids in tier.items():
+                self._fuzzy_keys[key] |= gids
+
+    def resolve(self, assignee):
+        """Benutzer als (Name, GID) oder (None, None), wenn nichts eindeutig passt"""
+        query = _fold_name(assignee or '')
+        if not query:
+            return None, None
+        for tier in self._tiers:
+            gids = tier.get(query)
+            if gids:
+                if len(gids) == 1:
+                    gid = next(iter(gids))
+                    return self._users[gid], gid
+                return None, None
+        if query not in self._fuzzy_cache:
+            self._fuzzy_cache[query] = self._fuzzy_match(query)
+        gid = self._fuzzy_cache[query]
+        return (self._users[gid], gid) if gid else (None, None)
+
+    def _fuzzy_match(self, query):
+        matches = difflib.get_close_matches(query, self._fuzzy_keys, n=2, cutoff=ASSIGNEE_FUZZY_CUTOFF)
+        if not matches:
+            return None
+        gids = self._fuzzy_keys[matches[0]]
+        if len(gids) != 1:
+            return None
+        # Zwei fast gleich gute Kandidaten verschiedener Personen gelten als mehrdeutig
+        if len(matches) > 1 and self._fuzzy_keys[matches[1]] != gids:
+            first_ratio = difflib.SequenceMatcher(None, query, matches[0]).ratio()
+            second_ratio = difflib.SequenceMatcher(None, query, matches[1]).ratio()
+            if first_ratio - second_ratio < 0.05:
+                return None
+        return next(iter(gids))
+
+def get_assignee_index(workspace_gid):
+    """AssigneeIndex für die Benutzer eines Workspaces; wird neu gebaut, sobald sich die Benutzerliste ändert"""
+    if not workspace_gid:
+        return AssigneeIndex([])
+    try:
+        user_records = _get_workspace_user_records(workspace_gid)
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Benutzer: {str(e)}")
+        return AssigneeIndex([])
+    return _assignee_index_for(workspace_gid, user_records)
+
+def _assignee_index_for(workspace_gid, user_records):
+    built_from, index = asana_cache.get_or_load('assignees', workspace_gid, lambda: (user_records, AssigneeIndex(user_records)))
+    if built_from is not user_records:
+        index = AssigneeIndex(user_records)
+        asana_cache.put('assignees', workspace_gid, (user_records, index))
+    return index
+
+async def aget_assignee_index(workspace_gid):
+    """Wie get_assignee_index"""
+    if not workspace_gid:
+        return AssigneeIndex([])
+    try:
+        user_records = await _aget_workspace_user_records(workspace_gid)
+    except ApiException as e:
+        print(f"Fehler beim Abrufen der Benutzer: {str(e)}")
+        return AssigneeIndex([])
+    # Im Thread, weil ein paralleler synchroner Aufbau desselben Index sonst den Event-Loop warten ließe
+    return await asyncio.to_thread(_assignee_index_for, workspace_gid, user_records)
 
+@metrics.timed('excel_to_text')
 def excel_to_text(file_path):
     """Wandelt eine Excel-Datei in einen gut lesbaren Text (CSV-ähnlich) um, auch ohne Header."""
+    if EXCEL_READER == 'stream' and not str(file_path).lower().endswith('.xls'):
+        try:
+            return _excel_to_text_stream(file_path)
+        except Exception as e:
+            debug_log("Fehler beim Umwandeln von Excel in Text: %s", e, level=logging.ERROR)
+            return ""
     try:
+        import pandas as pd
         df = pd.read_excel(file_path, header=None)
         # Prüfe, ob die erste Zeile Header ist (grob: viele verschiedene Werte)
         first_row = df.iloc[0].tolist()
@@ -578,131 +3213,392 @@ def excel_to_text(file_path):
                 text_lines.append(line)
         return '\n'.join(text_lines)
     except Exception as e:
-        debug_log(f"Fehler beim Umwandeln von Excel in Text: {str(e)}")
+        debug_log("Fehler beim Umwandeln von Excel in Text: %s", e, level=logging.ERROR)
         return ""
 
+# Word-Import: 'stream' liest word/document.xml inkrementell (inkl. Tabellen),
+# 'python-docx' baut wie bisher das komplette Dokumentmodell (nur Absätze)
+DOCX_READER = os.getenv('DOCX_READER', 'stream').lower()
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+def iter_docx_blocks(file_path):
+    """Liefert Absätze und Tabellenzeilen einer .docx-Datei in Dokumentreihenfolge.
+
+    Parst nur word/document.xml direkt aus dem Zip-Archiv mit iterparse und verwirft
+    abgearbeitete Elemente sofort; Bilder, Formatvorlagen usw. werden nie gelesen.
+    Tabellenzeilen werden als "Zelle | Zelle | ..." ausgegeben, Text in verschachtelten
+    Tabellen landet in der Zelle der äußeren Tabelle.
+    """
+    import zipfile
+    from xml.etree.ElementTree import iterparse
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml_file:
+        body = None
+        table_depth = 0
+        # Ausweichdarstellungen (mc:Fallback) enthalten denselben Text noch einmal
+        fallback_depth = 0
+        paragraphs = []
+        row = cell = None
+        for event, elem in iterparse(xml_file, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == _MC_FALLBACK:
+                    fallback_depth += 1
+                elif fallback_depth:
+                    continue
+                elif tag == _W_NS + 'p':
+                    # Absätze in Textfeldern sind in den umgebenden Absatz geschachtelt
+                    paragraphs.append([])
+                elif tag == _W_NS + 'tbl':
+                    table_depth += 1
+                elif tag == _W_NS + 'tr' and table_depth == 1:
+                    row = []
+                elif tag == _W_NS + 'tc' and table_depth == 1:
+                    cell = []
+                elif tag == _W_NS + 'body':
+                    body = elem
+                continue
+            if tag == _MC_FALLBACK:
+                fallback_depth -= 1
+                elem.clear()
+                continue
+            if fallback_depth:
+                continue
+            if tag == _W_NS + 't':
+                if paragraphs:
+                    paragraphs[-1].append(elem.text or '')
+            elif tag == _W_NS + 'tab':
+                if paragraphs:
+                    paragraphs[-1].append('\t')
+            elif tag in (_W_NS + 'br', _W_NS + 'cr'):
+                if paragraphs:
+                    paragraphs[-1].append('\n')
+            elif tag == _W_NS + 'noBreakHyphen':
+                if paragraphs:
+                    paragraphs[-1].append('-')
+            elif tag == _W_NS + 'p':
+                text = ''.join(paragraphs.pop()).strip()
+                if text:
+                    if cell is not None:
+                        cell.append(text)
+                    else:
+                        yield text
+            elif tag == _W_NS + 'tc' and table_depth == 1:
+                row.append(' '.join(cell).replace('\n', ' '))
+                cell = None
+            elif tag == _W_NS + 'tr' and table_depth == 1:
+                if any(row):
+                    yield ' | '.join(row)
+                row = None
+            elif tag == _W_NS + 'tbl':
+                table_depth -= 1
+            else:
+                continue
+            # Fertige Blöcke auf oberster Ebene freigeben, damit der Baum nicht wächst
+            if body is not None and table_depth == 0 and not paragraphs:
+                body.clear()
+
+@metrics.timed('word_to_text')
 def word_to_text(file_path):
     """Extrahiert den Text aus einer Word-Datei (.docx)."""
+    if DOCX_READER == 'stream':
+        try:
+            return '\n'.join(iter_docx_blocks(file_path))
+        except Exception as e:
+            debug_log("Fehler beim Umwandeln von Word in Text: %s", e, level=logging.ERROR)
+            return ""
     try:
+        import docx
         doc = docx.Document(file_path)
         text = '\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
         return text
     except Exception as e:
-        debug_log(f"Fehler beim Umwandeln von Word in Text: {str(e)}")
+        debug_log("Fehler beim Umwandeln von Word in Text: %s", e, level=logging.ERROR)
         return ""
 
-def analyze_protocol_and_show(protocol_text, workspace_name, project_name, upload_file=None):
-    print("DEBUG: analyze_protocol_and_show wurde aufgerufen")
-    print(f"DEBUG: protocol_text: {protocol_text}")
-    print(f"DEBUG: workspace_name: {workspace_name}")
-    print(f"DEBUG: project_name: {project_name}")
-    print(f"DEBUG: upload_file: {upload_file}")
+def _editor_tasks(tasks, run_id):
+    """Aufgaben für den Editor: Titel, Beschreibung, Zugewiesen (User-GID), Fälligkeitsdatum und ein
+    Schlüssel je Analyse, damit Gradio beim Neu-Rendern nur Felder derselben Analyse wiederverwendet"""
+    return [{
+        'key': f"{run_id}-{i}",
+        'name': task.get('name', ''),
+        'description': task.get('description', ''),
+        'assignee': task.get('assignee_gid'),
+        'due_date': task.get('due_date') or ''
+    } for i, task in enumerate(tasks)]
+
+_FILE_CONVERSION_ERROR = "❌ Datei konnte nicht in Text umgewandelt werden. Siehe debug.log."
+
+def _protocol_file_text(upload_file):
+    """Text einer hochgeladenen .xlsx/.xls/.docx-Datei, leer bei anderen Formaten"""
+    if str(upload_file).lower().endswith('.xlsx') or str(upload_file).lower().endswith('.xls'):
+        return excel_to_text(upload_file)
+    elif str(upload_file).lower().endswith('.docx'):
+        return word_to_text(upload_file)
+    return ""
+
+def _combine_protocol_text(protocol_text, file_text):
+    if protocol_text and protocol_text.strip():
+        return protocol_text.strip() + "\n" + file_text
+    return file_text
+
+def _resolve_task_assignee(task, assignee_index):
+    # Automatisches Mapping für Assignee; die GID bleibt erhalten, weil Anzeigenamen nicht eindeutig sind
+    if task.get('assignee'):
+        task['assignee'], task['assignee_gid'] = assignee_index.resolve(task['assignee'])
+    return task
+
+def _analysis_context(workspace_gid, project_gid, protocol_text):
+    """Benutzer, Assignee-Index, Parent-Task-Auswahl und Vorschlag; wird parallel zur KI-Extraktion geladen"""
+    user_choices = get_user_choices(workspace_gid)
+    assignee_index = get_assignee_index(workspace_gid)
+    debug_log("Verfügbare User: %s", len(user_choices))
+    # Hole bestehende Aufgaben für Vorschlag (hängt nur vom Protokolltext ab, nicht von den Aufgaben)
+    parent_task_choices = get_task_choices(project_gid) if project_gid else []
+    # Erweiterte Vorschlagslogik (Scorer wird pro Aufgabenliste nur einmal gebaut)
+    with metrics.span('suggest_parent_task'):
+        best_match, best_match_gid = get_parent_task_scorer(project_gid).suggest(protocol_text or "")
+    debug_log("Vorgeschlagener Parent-Task: %s (%s)", best_match, best_match_gid)
+    return user_choices, assignee_index, parent_task_choices, best_match_gid
+
+async def _aanalysis_context(workspace_gid, project_gid, protocol_text):
+    """Wie _analysis_context; Benutzer, Assignee-Index und Aufgabenliste werden gleichzeitig geladen"""
+    user_choices, assignee_index, scorer = await asyncio.gather(
+        aget_user_choices(workspace_gid),
+        aget_assignee_index(workspace_gid),
+        aget_parent_task_scorer(project_gid)
+    )
+    parent_task_choices = await aget_task_choices(project_gid) if project_gid else []
+    with metrics.span('suggest_parent_task'):
+        best_match, best_match_gid = await asyncio.to_thread(scorer.suggest, protocol_text or "")
+    debug_log("Vorgeschlagener Parent-Task: %s (%s)", best_match, best_match_gid)
+    return user_choices, assignee_index, parent_task_choices, best_match_gid
+
+def _analysis_result(tasks, context, run_id):
+    # Rückgabe: Aufgaben für den Editor, Assignees, User-(Name, GID)-Paare, Parent-Task-(Name, GID)-Paare, Vorschlag.
+    # Solange der Kontext noch lädt (context None), bleiben Benutzer und Parent-Task-Auswahl unverändert (None).
+    if context is None:
+        return [_editor_tasks(tasks, run_id), [task.get('assignee_gid') for task in tasks], None, None, None, None]
+    user_choices, _, parent_task_choices, best_match_gid = context
+    return [_editor_tasks(tasks, run_id), [task.get('assignee_gid') for task in tasks], user_choices, parent_task_choices, best_match_gid, best_match_gid]
+
+def _resolve_new_assignees(tasks, context, resolved):
+    """Ordnet die Assignees der noch offenen Aufgaben zu, sobald der Kontext geladen ist; liefert die neue Anzahl"""
+    if context is None:
+        return resolved
+    for task in tasks[resolved:]:
+        _resolve_task_assignee(task, context[1])
+    return len(tasks)
+
+def iter_analyze_protocol(protocol_text, workspace_gid, project_gid, upload_file=None):
+    """Analysiert das Protokoll und liefert (Updates und Daten, Status, fertig) nach jeder
+    gestreamten Aufgabe, damit die Aufgabenblöcke nacheinander gefüllt werden können.
+    Benutzer und Parent-Task-Vorschlag laden parallel zur KI; bis dahin angekommene Aufgaben
+    werden zugeordnet, sobald der Kontext da ist."""
+    debug_log("analyze_protocol_and_show wurde aufgerufen")
+    debug_log("protocol_text: %s", protocol_text)
+    debug_log("workspace_gid: %s, project_gid: %s, upload_file: %s", workspace_gid, project_gid, upload_file)
+    empty_result = [[], [], [], [], None, None]
     
-    if not workspace_name or (not protocol_text and not upload_file):
-        print("DEBUG: Fehlende Eingaben")
-        return ([gr.update(visible=False) for _ in range(MAX_TASKS * 5)], [], [], [], None, None, "❌ Bitte füllen Sie alle erforderlichen Felder aus.")
+    if not workspace_gid or (not protocol_text and not upload_file):
+        debug_log("Fehlende Eingaben")
+        yield empty_result, "❌ Bitte füllen Sie alle erforderlichen Felder aus.", True
+        return
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            context_future = pool.submit(_analysis_context, workspace_gid, project_gid, protocol_text)
+            combined_text = protocol_text or ""
+            if upload_file:
+                file_text = _protocol_file_text(upload_file)
+                debug_log("Umgewandelter Datei-Text: %s", file_text)
+                if not file_text.strip():
+                    yield empty_result, _FILE_CONVERSION_ERROR, True
+                    return
+                combined_text = _combine_protocol_text(protocol_text, file_text)
+
+            run_id = f"{time.time_ns():x}"
+            # Aufgaben extrahieren (immer über KI), jede Aufgabe wird sofort angezeigt
+            tasks = []
+            resolved = 0
+            for task in iter_extract_tasks(combined_text):
+                tasks.append(task)
+                context = context_future.result() if context_future.done() else None
+                resolved = _resolve_new_assignees(tasks, context, resolved)
+                debug_log("Aufgabe %s empfangen: %s", len(tasks), task.get('name', ''))
+                yield _analysis_result(tasks, context, run_id), f"🔄 Lade... {len(tasks)} Aufgabe(n) gefunden", False
+            context = context_future.result()
+            _resolve_new_assignees(tasks, context, resolved)
+        debug_log("Extrahierte Aufgaben: %s", LazyJson(tasks))
+        yield _analysis_result(tasks, context, run_id), None, True
+    except Exception as e:
+        debug_log("Fehler in analyze_protocol_and_show: %s", e, level=logging.ERROR)
+        yield empty_result, f"❌ Fehler: {str(e)}", True
+
+async def aiter_analyze_protocol(protocol_text, workspace_gid, project_gid, upload_file=None):
+    """Wie iter_analyze_protocol; Dateiumwandlung und Scorer laufen in Worker-Threads, Asana und KI als Coroutinen"""
+    debug_log("aiter_analyze_protocol wurde aufgerufen")
+    debug_log("workspace_gid: %s, project_gid: %s, upload_file: %s", workspace_gid, project_gid, upload_file)
+    empty_result = [[], [], [], [], None, None]
+
+    if not workspace_gid or (not protocol_text and not upload_file):
+        debug_log("Fehlende Eingaben")
+        yield empty_result, "❌ Bitte füllen Sie alle erforderlichen Felder aus.", True
+        return
+    context_task = asyncio.ensure_future(_aanalysis_context(workspace_gid, project_gid, protocol_text))
     try:
         combined_text = protocol_text or ""
         if upload_file:
-            if str(upload_file).lower().endswith('.xlsx') or str(upload_file).lower().endswith('.xls'):
-                file_text = excel_to_text(upload_file)
-            elif str(upload_file).lower().endswith('.docx'):
-                file_text = word_to_text(upload_file)
-            else:
-                file_text = ""
-            print(f"DEBUG: Umgewandelter Datei-Text: {file_text}")
+            file_text = await asyncio.to_thread(_protocol_file_text, upload_file)
             if not file_text.strip():
-                warn = "❌ Datei konnte nicht in Text umgewandelt werden. Siehe debug.log."
-                return ([gr.update(visible=False) for _ in range(MAX_TASKS * 5)] + [[], [], [], [], None, None], warn)
-            if combined_text.strip():
-                combined_text = combined_text.strip() + "\n" + file_text
-            else:
-                combined_text = file_text
-        # Aufgaben extrahieren (immer über KI)
-        tasks = analyze_text_with_ai(combined_text)
-        print(f"DEBUG: Extrahierte Aufgaben: {tasks}")
-        # User laden
-        workspaces = get_workspaces()
-        workspace_gid = workspaces.get(workspace_name)
-        user_dict = get_workspace_users(workspace_gid)
-        user_names = list(user_dict.keys())
-        print(f"DEBUG: Verfügbare User: {user_names}")
-        # Automatisches Mapping für Assignee
-        for task in tasks:
-            assignee = task.get('assignee')
-            if assignee:
-                matches = [uname for uname in user_names if assignee.lower() in uname.lower()]
-                if len(matches) == 1:
-                    task['assignee'] = matches[0]
-                else:
-                    task['assignee'] = None
-        # Hole bestehende Aufgaben für Vorschlag
-        project_names = get_projects(workspace_gid)
-        project_gid = project_names.get(project_name)
-        parent_tasks_dict = get_tasks(project_gid) if project_gid else {}
-        parent_task_names = list(parent_tasks_dict.keys())
-        # Erweiterte Vorschlagslogik
-        best_match = suggest_matching_parent_task(protocol_text, parent_task_names)
-        debug_log(f"Vorgeschlagener Parent-Task: {best_match}")
-        # Updates für jede Zeile vorbereiten
-        updates = []
-        for i in range(MAX_TASKS):
-            if i < len(tasks):
-                task = tasks[i]
-                print(f"DEBUG: Erstelle Update für Aufgabe {i+1}: {task.get('name','')}")
-                # Korrektes Mapping der Felder
-                name_value = task.get('name', '')
-                description_value = task.get('description', '')
-                assignee_value = task.get('assignee') if task.get('assignee') in user_names else None
-                due_date_value = task.get('due_date') or ''
-                updates.extend([
-                    gr.update(visible=True),  # Block
-                    gr.update(value=name_value, visible=True),  # Titel
-                    gr.update(value=description_value, visible=True),  # Beschreibung
-                    gr.update(choices=user_names, value=assignee_value, visible=True, interactive=True),  # Zugewiesen
-                    gr.update(value=due_date_value, visible=True)  # Fälligkeitsdatum
-                ])
-            else:
-                updates.extend([
-                    gr.update(visible=False),  # Block
-                    gr.update(value="", visible=False),  # Titel
-                    gr.update(value="", visible=False),  # Beschreibung
-                    gr.update(choices=[], value=None, visible=False),  # Zugewiesen
-                    gr.update(value=None, visible=False)  # Fälligkeitsdatum
-                ])
-        print(f"DEBUG: Anzahl der Updates: {len(updates)}")
-        print(f"DEBUG: Erste Updates: {updates[:4]}")
-        while len(updates) < MAX_TASKS * 5:
-            updates.extend([
-                gr.update(visible=False),  # Block
-                gr.update(value="", visible=False),  # Titel
-                gr.update(value="", visible=False),  # Beschreibung
-                gr.update(choices=[], value=None, visible=False),  # Zugewiesen
-                gr.update(value=None, visible=False)  # Fälligkeitsdatum
-            ])
-        # Rückgabe: Updates für Aufgabenfelder, extrahierte Aufgaben, Assignees, Usernamen, Parent-Task-Namen, Vorschlag
-        return (updates + [tasks, [task.get('assignee') for task in tasks], user_names, parent_task_names, best_match, best_match], None)
+                yield empty_result, _FILE_CONVERSION_ERROR, True
+                return
+            combined_text = _combine_protocol_text(protocol_text, file_text)
+        run_id = f"{time.time_ns():x}"
+
+        tasks = []
+        resolved = 0
+        async for task in aiter_extract_tasks(combined_text):
+            tasks.append(task)
+            context = context_task.result() if context_task.done() else None
+            resolved = _resolve_new_assignees(tasks, context, resolved)
+            yield _analysis_result(tasks, context, run_id), f"🔄 Lade... {len(tasks)} Aufgabe(n) gefunden", False
+        context = await context_task
+        _resolve_new_assignees(tasks, context, resolved)
+        debug_log("%s Aufgaben extrahiert", len(tasks))
+        yield _analysis_result(tasks, context, run_id), None, True
     except Exception as e:
-        print(f"DEBUG: Fehler in analyze_protocol_and_show: {str(e)}")
-        return ([gr.update(visible=False) for _ in range(MAX_TASKS * 5)] + [[], [], [], [], None, None], f"❌ Fehler: {str(e)}")
+        debug_log("Fehler in aiter_analyze_protocol: %s", e, level=logging.ERROR)
+        yield empty_result, f"❌ Fehler: {str(e)}", True
+    finally:
+        context_task.cancel()
 
-def analyze_protocol_with_loading(protocol_text, workspace_name, project_name, upload_file):
-    yield gr.update(value="🔄 Lade...", visible=True), gr.update(interactive=False), *[gr.update() for _ in range(MAX_TASKS * 5 + 7)]  # 5 Felder pro Task (ohne Button)
-    result = analyze_protocol_and_show(protocol_text, workspace_name, project_name, upload_file)
-    
-    # Prüfe, ob result ein Tupel mit Warnung ist oder nur die Ergebnisse
-    if isinstance(result, tuple) and len(result) == 2:
-        updates_and_data, warn = result
+def analyze_protocol_and_show(protocol_text, workspace_gid, project_gid, upload_file=None):
+    updates_and_data, warn = [], None
+    for updates_and_data, warn, _ in iter_analyze_protocol(protocol_text, workspace_gid, project_gid, upload_file):
+        pass
+    return (updates_and_data, warn)
+
+def _analysis_loading_updates():
+    return gr.update(value="🔄 Lade...", visible=True), gr.update(interactive=False), *[gr.update() for _ in range(5)]
+
+def _analysis_ui_updates(updates_and_data, warn, finished):
+    editor_tasks = updates_and_data[0]
+    parent_task_choices = updates_and_data[-3]
+    best_match = updates_and_data[-2]
+    if parent_task_choices is None:
+        # Parent-Tasks laden noch: Auswahl unverändert lassen
+        suggested_parent_task_dropdown_update = parent_task_dropdown_update = gr.update()
     else:
-        updates_and_data = result
-        warn = None
-    
-    parent_task_choices = updates_and_data[-3] if len(updates_and_data) > 2 else []
-    best_match = updates_and_data[-2] if len(updates_and_data) > 1 else None
-    suggested_parent_task_dropdown_update = gr.update(choices=parent_task_choices, value=best_match, interactive=False)
-    parent_task_dropdown_update = gr.update(choices=parent_task_choices, value=best_match, interactive=True)
+        suggested_parent_task_dropdown_update = gr.update(choices=parent_task_choices, value=best_match, interactive=False)
+        parent_task_dropdown_update = gr.update(choices=parent_task_choices, value=best_match, interactive=True)
     status = warn if warn else ""
-    yield gr.update(value=status, visible=True), gr.update(interactive=True), *(list(updates_and_data[:-3]) + [parent_task_dropdown_update, suggested_parent_task_dropdown_update])
+    # Unveränderter State löst kein Neu-Rendern des Editors aus
+    render = finished or len(editor_tasks) <= TASK_RENDER_EAGER or len(editor_tasks) % TASK_RENDER_BATCH == 0
+    tasks_update = editor_tasks if render else gr.update()
+    assignees, user_choices = updates_and_data[1:-3]
+    user_choices_update = gr.update() if user_choices is None else user_choices
+    return gr.update(value=status, visible=True), gr.update(interactive=finished), tasks_update, assignees, user_choices_update, parent_task_dropdown_update, suggested_parent_task_dropdown_update
+
+@profiled('analyze_protocol_with_loading')
+def analyze_protocol_with_loading(protocol_text, workspace_gid, project_gid, upload_file):
+    yield _analysis_loading_updates()
+    # Gestreamte Aufgaben erscheinen sofort im Editor; der Button bleibt bis zum Ende gesperrt
+    for updates_and_data, warn, finished in iter_analyze_protocol(protocol_text, workspace_gid, project_gid, upload_file):
+        yield _analysis_ui_updates(updates_and_data, warn, finished)
+
+@profiled('analyze_protocol_with_loading')
+async def analyze_protocol_with_loading_async(protocol_text, workspace_gid, project_gid, upload_file):
+    """Async-Variante von analyze_protocol_with_loading (ASYNC_HANDLERS)"""
+    yield _analysis_loading_updates()
+    async for updates_and_data, warn, finished in aiter_analyze_protocol(protocol_text, workspace_gid, project_gid, upload_file):
+        yield _analysis_ui_updates(updates_and_data, warn, finished)
+
+# Nebenläufigkeit der Gradio-Events: Jedes teure Event gehört zu einem Pool (concurrency_id)
+# mit eigenem Limit, damit lange KI-Analysen die Dropdown-Updates nicht blockieren.
+# CONCURRENCY_CONFIG enthält JSON oder den Pfad zu einer JSON-Datei und überschreibt
+# einzelne Werte, z. B. {"pools": {"llm": 8}, "events": {"create": "llm"}}.
+DEFAULT_CONCURRENCY_CONFIG = {
+    # Maximale Anzahl wartender Events; darüber meldet Gradio "Queue is full"
+    'queue_max_size': 64,
+    'pools': {
+        'llm': 4,
+        'asana_write': 2,
+        'asana_read': 8
+    },
+    # Event -> Pool
+    'events': {
+        'analyze': 'llm',
+        'create': 'asana_write',
+        'load_choices': 'asana_read',
+        'project_choices': 'asana_read',
+        'parent_task_choices': 'asana_read'
+    }
+}
+
+def _load_concurrency_config(raw):
+    config = json.loads(json.dumps(DEFAULT_CONCURRENCY_CONFIG))
+    if not raw:
+        return config
+    if not raw.lstrip().startswith('{'):
+        with open(raw, encoding='utf-8') as config_file:
+            raw = config_file.read()
+    overrides = json.loads(raw)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
+
+CONCURRENCY_CONFIG = _load_concurrency_config(os.getenv('CONCURRENCY_CONFIG', ''))
+
+def event_concurrency(event):
+    """concurrency_id und concurrency_limit eines Events für die Gradio-Listener"""
+    pool = CONCURRENCY_CONFIG['events'][event]
+    return {'concurrency_id': pool, 'concurrency_limit': CONCURRENCY_CONFIG['pools'][pool]}
+
+def get_due_date_choices():
+    """Schnellauswahl für das Fälligkeitsdatum als (Anzeige, TT.MM.JJJJ)-Paare"""
+    today = datetime.now()
+    choices = []
+    for label, days in (("Heute", 0), ("Morgen", 1), ("In einer Woche", 7), ("In einem Monat", 30)):
+        date_str = (today + timedelta(days=days)).strftime("%d.%m.%Y")
+        choices.append((f"{label} ({date_str})", date_str))
+    return choices
+
+# Start ohne Netzwerkzugriff: Die Oberfläche wird mit leeren Auswahllisten gebaut,
+# ein Hintergrund-Thread wärmt den Asana-Cache vor und app.load füllt die Listen.
+STARTUP_TARGET_SECONDS = float(os.getenv('STARTUP_TARGET_SECONDS', 8))
+
+def warm_up_asana_cache():
+    """Lädt Workspaces und die Projekte des ersten Workspaces vorab in den Cache"""
+    try:
+        workspace_choices = get_workspace_choices()
+        if workspace_choices:
+            get_project_choices(workspace_choices[0][1])
+    except Exception as e:
+        debug_log("Warm-up des Asana-Caches fehlgeschlagen: %s", e, level=logging.WARNING)
+
+def start_warm_up():
+    thread = threading.Thread(target=warm_up_asana_cache, name='asana-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+@profiled('load_initial_choices')
+def load_initial_choices():
+    """Füllt beim Laden der Seite Workspace- und Projektauswahl (teilt sich die Abfrage mit dem Warm-up)"""
+    workspace_choices = get_workspace_choices()
+    default_workspace = workspace_choices[0][1] if workspace_choices else None
+    initial_projects = get_project_choices(default_workspace) if default_workspace else []
+    return gr.update(choices=workspace_choices, value=default_workspace), gr.update(choices=initial_projects, value=None)
+
+@profiled('load_initial_choices')
+async def aload_initial_choices():
+    """Wie load_initial_choices"""
+    workspace_choices = await aget_workspace_choices()
+    default_workspace = workspace_choices[0][1] if workspace_choices else None
+    initial_projects = await aget_project_choices(default_workspace) if default_workspace else []
+    return gr.update(choices=workspace_choices, value=default_workspace), gr.update(choices=initial_projects, value=None)
 
 # Gradio Interface erstellen
 with gr.Blocks(title="Meeting-Protokoll zu Asana Aufgaben") as app:
@@ -710,27 +3606,24 @@ with gr.Blocks(title="Meeting-Protokoll zu Asana Aufgaben") as app:
     gr.Markdown("Füge dein Meetingprotokoll ein oder lade eine Excel-Datei hoch und erstelle automatisch Asana-Aufgaben.")
     
     loading_info = gr.Markdown("", visible=False)
+
+    # State für Aufgaben (Editor-Inhalt) und Assignees
+    tasks_state = gr.State([])
+    assignees_state = gr.State([])
+    user_choices_state = gr.State([])
     
     with gr.Row():
         with gr.Column(scale=1):
-            workspaces = get_workspaces()
-            workspace_names = list(workspaces.keys())
-            default_workspace = workspace_names[0] if workspace_names else None
-
-            initial_projects = []
-            if default_workspace:
-                workspace_gid = workspaces.get(default_workspace)
-                if workspace_gid:
-                    initial_projects = list(get_projects(workspace_gid).keys())
-
+            # Dropdowns tragen (Name, GID)-Paare: angezeigt wird der Name, als Wert kommt die GID an.
+            # Die Auswahl wird erst über app.load gefüllt (siehe load_initial_choices).
             workspace_dropdown = gr.Dropdown(
-                choices=workspace_names,
-                value=default_workspace,
+                choices=[],
+                value=None,
                 label="Workspace"
             )
             
             project_dropdown = gr.Dropdown(
-                choices=initial_projects,
+                choices=[],
                 value=None,
                 label="Abteilung (Bitte vorher auswählen)"
             )
@@ -760,177 +3653,146 @@ with gr.Blocks(title="Meeting-Protokoll zu Asana Aufgaben") as app:
             )
             analyze_button = gr.Button("Bitte Projekt auswählen", variant="secondary", interactive=False)
             
-            # Aufgaben-Container: Für jede Aufgabe ein Block untereinander
-            task_containers = []
-            for i in range(MAX_TASKS):
-                with gr.Column(visible=False) as task_block:
+            # Aufgaben-Editor: wird pro Analyse mit genau so vielen Blöcken gerendert, wie Aufgaben gefunden wurden
+            @gr.render(inputs=[tasks_state, user_choices_state], triggers=[app.load, tasks_state.change], concurrency_limit=None)
+            def render_task_editor(tasks, user_choices):
+                task_fields = []
+                due_date_choices = get_due_date_choices()
+                for i, task in enumerate(tasks[:MAX_TASKS]):
+                    key = task['key']
                     if i > 0:
-                        gr.HTML("<div style='height: 32px;'></div>")  # Abstand zwischen den Aufgaben
+                        gr.HTML("<div style='height: 32px;'></div>", key=f"{key}-spacer")  # Abstand zwischen den Aufgaben
                     
                     # Titel und Beschreibung als editierbare Felder
                     task_title = gr.Textbox(
+                        value=task['name'],
                         label="Aufgabentitel",
                         placeholder="Titel der Aufgabe...",
-                        visible=True,
-                        interactive=True
+                        interactive=True,
+                        key=f"{key}-title"
                     )
                     task_description = gr.Textbox(
+                        value=task['description'],
                         label="Beschreibung",
                         placeholder="Beschreibung der Aufgabe...",
                         lines=3,
-                        visible=True,
-                        interactive=True
+                        interactive=True,
+                        key=f"{key}-description"
                     )
                     
                     assignee_dropdown = gr.Dropdown(
-                        choices=[],
+                        choices=user_choices,
+                        value=task['assignee'],
                         label="Zugewiesen",
-                        visible=True
+                        interactive=True,
+                        key=f"{key}-assignee"
                     )
-                    due_date_picker = gr.Textbox(
-                        label="Fälligkeitsdatum",
-                        placeholder="TT.MM.JJJJ",
-                        visible=True,
-                        value=None,
-                        interactive=True
+                    # Schnellauswahl statt vier Datums-Buttons je Aufgabe: ein Feld, kein Event-Handler
+                    due_date_picker = gr.Dropdown(
+                        choices=due_date_choices,
+                        value=task['due_date'] or None,
+                        label="Fälligkeitsdatum (TT.MM.JJJJ)",
+                        allow_custom_value=True,
+                        interactive=True,
+                        key=f"{key}-due-date"
                     )
-                    with gr.Row():
-                        today_button = gr.Button(
-                            "Heute",
-                            size="sm",
-                            variant="secondary",
-                            visible=True
-                        )
-                        tomorrow_button = gr.Button(
-                            "Morgen",
-                            size="sm",
-                            variant="secondary",
-                            visible=True
-                        )
-                        week_button = gr.Button(
-                            "In einer Woche",
-                            size="sm",
-                            variant="secondary",
-                            visible=True
-                        )
-                        month_button = gr.Button(
-                            "In einem Monat",
-                            size="sm",
-                            variant="secondary",
-                            visible=True
-                        )
-                task_containers.append((task_block, task_title, task_description, assignee_dropdown, due_date_picker, today_button, tomorrow_button, week_button, month_button))
+                    task_fields.extend([task_title, task_description, assignee_dropdown, due_date_picker])
+                if len(tasks) > MAX_TASKS:
+                    gr.Markdown(f"⚠️ Es werden nur die ersten {MAX_TASKS} von {len(tasks)} Aufgaben angezeigt.")
+                # Der Erstellen-Button liest die gerade gerenderten Felder (wird bei jedem Rendern neu verbunden)
+                create_button.click(
+                    fn=create_subtasks_with_loading_async if ASYNC_HANDLERS else create_subtasks_with_loading,
+                    api_name="create_subtasks_with_loading",  # gleicher API-Name im synchronen und im Async-Modus
+                    inputs=[tasks_state, workspace_dropdown, project_dropdown, parent_task_dropdown, user_choices_state] + task_fields,  # Nur title, description, assignee, due_date (ohne Buttons)
+                    outputs=[status_output, create_button, json_preview_output],
+                    queue=True,
+                    **event_concurrency('create')
+                )
 
             create_button = gr.Button("Aufgaben in Asana erstellen", variant="primary")
             status_output = gr.Markdown(label="Status")
+    json_preview_output = gr.Markdown(label="JSON-Vorschau")
 
     # Event-Handler
-    def update_analyze_button_state(project_name):
+    app.load(
+        fn=aload_initial_choices if ASYNC_HANDLERS else load_initial_choices,
+        api_name="load_initial_choices",
+        outputs=[workspace_dropdown, project_dropdown],
+        **event_concurrency('load_choices')
+    )
+
+    # Reine UI-Updates laufen an der Warteschlange vorbei (queue=False)
+    def update_analyze_button_state(project_gid):
         """Aktiviert den Analyze-Button nur wenn ein Projekt ausgewählt ist"""
-        if project_name:
+        if project_gid:
             return gr.update(value="Aufgaben extrahieren", variant="primary", interactive=True)
         else:
             return gr.update(value="Bitte Projekt auswählen", variant="secondary", interactive=False)
     
     workspace_dropdown.change(
-        fn=update_project_choices,
+        fn=aupdate_project_choices if ASYNC_HANDLERS else update_project_choices,
+        api_name="update_project_choices",
         inputs=workspace_dropdown,
-        outputs=project_dropdown
+        outputs=project_dropdown,
+        **event_concurrency('project_choices')
     ).then(
         fn=update_analyze_button_state,
         inputs=project_dropdown,
-        outputs=analyze_button
+        outputs=analyze_button,
+        queue=False
     )
     project_dropdown.change(
-        fn=update_tasks_on_project_change,
+        fn=aupdate_tasks_on_project_change if ASYNC_HANDLERS else update_tasks_on_project_change,
+        api_name="update_tasks_on_project_change",
         inputs=[workspace_dropdown, project_dropdown],
-        outputs=[parent_task_dropdown, suggested_parent_task_dropdown]
+        outputs=[parent_task_dropdown, suggested_parent_task_dropdown],
+        **event_concurrency('parent_task_choices')
     )
     
     project_dropdown.change(
         fn=update_analyze_button_state,
         inputs=project_dropdown,
-        outputs=analyze_button
+        outputs=analyze_button,
+        queue=False
     )
 
-    # Event-Handler für Datums-Buttons
-    def set_today_date():
-        """Gibt das heutige Datum im deutschen Format zurück"""
-        today = datetime.now().strftime("%d.%m.%Y")
-        return gr.update(value=today)
-    
-    def set_tomorrow_date():
-        """Gibt das morgige Datum im deutschen Format zurück"""
-        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%d.%m.%Y")
-        return gr.update(value=tomorrow)
-    
-    def set_week_date():
-        """Gibt das Datum in einer Woche im deutschen Format zurück"""
-        week_later = (datetime.now() + timedelta(days=7)).strftime("%d.%m.%Y")
-        return gr.update(value=week_later)
-    
-    def set_month_date():
-        """Gibt das Datum in einem Monat im deutschen Format zurück"""
-        month_later = (datetime.now() + timedelta(days=30)).strftime("%d.%m.%Y")
-        return gr.update(value=month_later)
-    
-    # Verbinde jeden Datums-Button mit seinem Datums-Feld
-    for i, container in enumerate(task_containers):
-        task_block, task_title, task_description, assignee_dropdown, due_date_picker, today_button, tomorrow_button, week_button, month_button = container
-        today_button.click(
-            fn=set_today_date,
-            outputs=due_date_picker
-        )
-        tomorrow_button.click(
-            fn=set_tomorrow_date,
-            outputs=due_date_picker
-        )
-        week_button.click(
-            fn=set_week_date,
-            outputs=due_date_picker
-        )
-        month_button.click(
-            fn=set_month_date,
-            outputs=due_date_picker
-        )
-
-    # State für Aufgaben und Assignees
-    tasks_state = gr.State([])
-    assignees_state = gr.State([])
-    user_names_state = gr.State([])
-
     analyze_button.click(
-        fn=analyze_protocol_with_loading,
+        fn=analyze_protocol_with_loading_async if ASYNC_HANDLERS else analyze_protocol_with_loading,
+        api_name="analyze_protocol_with_loading",
         inputs=[protocol_input, workspace_dropdown, project_dropdown, excel_upload],
-        outputs=[loading_info, analyze_button] + [item for container in task_containers for item in container[:5]] + [tasks_state, assignees_state, user_names_state, parent_task_dropdown, suggested_parent_task_dropdown],  # Nur die ersten 5 Felder (ohne Buttons)
-        queue=True
+        outputs=[loading_info, analyze_button, tasks_state, assignees_state, user_choices_state, parent_task_dropdown, suggested_parent_task_dropdown],
+        queue=True,
+        **event_concurrency('analyze')
     )
 
-    def create_subtasks_wrapper(tasks, titles, descriptions, assignees, workspace_name, project_name, parent_task_name, user_names, due_dates=None):
+    def _prepare_subtasks(tasks, titles, descriptions, assignees, workspace_gid, project_gid, parent_task_gid, user_choices, due_dates=None):
+        # Prüft die Eingaben und baut die Aufgaben aus den UI-Werten: (Fehlermeldung, Aufgaben, JSON-Vorschau)
         # Erweiterte Debug-Ausgaben für alle Felder
-        debug_log(f"[create_subtasks_wrapper] Typen: tasks={type(tasks)}, assignees={type(assignees)}, due_dates={type(due_dates)}")
-        debug_log(f"[create_subtasks_wrapper] tasks: {json.dumps(tasks, ensure_ascii=False)}")
-        debug_log(f"[create_subtasks_wrapper] assignees: {assignees}")
-        debug_log(f"[create_subtasks_wrapper] due_dates: {due_dates}")
-        debug_log(f"[create_subtasks_wrapper] workspace_name: {workspace_name} ({type(workspace_name)})")
-        debug_log(f"[create_subtasks_wrapper] project_name: {project_name} ({type(project_name)})")
-        debug_log(f"[create_subtasks_wrapper] parent_task_name: {parent_task_name} ({type(parent_task_name)})")
-        debug_log(f"[create_subtasks_wrapper] user_names: {user_names} ({type(user_names)})")
+        debug_log("[create_subtasks_wrapper] Typen: tasks=%s, assignees=%s, due_dates=%s", type(tasks), type(assignees), type(due_dates))
+        debug_log("[create_subtasks_wrapper] tasks: %s", LazyJson(tasks))
+        debug_log("[create_subtasks_wrapper] assignees: %s", assignees)
+        debug_log("[create_subtasks_wrapper] due_dates: %s", due_dates)
+        debug_log("[create_subtasks_wrapper] workspace_gid: %s (%s)", workspace_gid, type(workspace_gid))
+        debug_log("[create_subtasks_wrapper] project_gid: %s (%s)", project_gid, type(project_gid))
+        debug_log("[create_subtasks_wrapper] parent_task_gid: %s (%s)", parent_task_gid, type(parent_task_gid))
+        debug_log("[create_subtasks_wrapper] user_choices: %s (%s)", user_choices, type(user_choices))
         fehlermeldung = None
         if not tasks:
             fehlermeldung = "❌ Keine Aufgaben gefunden."
-        elif not workspace_name:
+        elif not workspace_gid:
             fehlermeldung = "❌ Workspace fehlt."
-        elif not project_name:
+        elif not project_gid:
             fehlermeldung = "❌ Projekt fehlt."
-        elif not parent_task_name:
+        elif not parent_task_gid or str(parent_task_gid).startswith("("):
+            # "(...)"-Einträge sind Platzhalter ohne GID
             fehlermeldung = "❌ Übergeordnete Aufgabe fehlt."
         if fehlermeldung:
-            debug_log(f"Fehlermeldung: {fehlermeldung}")
+            debug_log("Fehlermeldung: %s", fehlermeldung)
             # Gebe alle empfangenen Werte im UI aus
-            debug_md = f"### Debug-Info\n- workspace_name: {workspace_name}\n- project_name: {project_name}\n- parent_task_name: {parent_task_name}\n- user_names: {user_names}\n- assignees: {assignees}\n- due_dates: {due_dates}\n- tasks: {json.dumps(tasks, ensure_ascii=False)}"
-            return fehlermeldung + "\n" + debug_md, ""
-        # Baue Aufgaben-JSON NUR aus den UI-Werten
+            debug_md = f"### Debug-Info\n- workspace_gid: {workspace_gid}\n- project_gid: {project_gid}\n- parent_task_gid: {parent_task_gid}\n- user_choices: {user_choices}\n- assignees: {assignees}\n- due_dates: {due_dates}\n- tasks: {json.dumps(tasks, ensure_ascii=False)}"
+            return fehlermeldung + "\n" + debug_md, [], ""
+        # Baue Aufgaben-JSON NUR aus den UI-Werten (Assignee-Werte sind bereits User-GIDs)
+        user_names_by_gid = {gid: name for name, gid in (user_choices or [])}
         aufgaben = []
         num_tasks = max(len(titles), len(descriptions), len(assignees), len(due_dates)) if any([titles, descriptions, assignees, due_dates]) else 0
         for idx in range(num_tasks):
@@ -945,19 +3807,36 @@ with gr.Blocks(title="Meeting-Protokoll zu Asana Aufgaben") as app:
                     "name": name,
                     "description": description,
                     "assignee": assignee,
+                    "assignee_name": user_names_by_gid.get(assignee, ""),
                     "due_date": due_date
                 })
         # JSON-Vorschau erzeugen
         json_preview = json.dumps(aufgaben, ensure_ascii=False, indent=2)
         json_md = f"### Aufgaben-JSON-Vorschau\n```json\n{json_preview}\n```"
-        # Erstelle Aufgaben in Asana mit den UI-Werten
-        status = create_subtasks_in_asana(aufgaben, workspace_name, project_name, parent_task_name)
-        return status, json_md
+        return None, aufgaben, json_md
+
+    def create_subtasks_wrapper(tasks, titles, descriptions, assignees, workspace_gid, project_gid, parent_task_gid, user_choices, due_dates=None):
+        # Generator: liefert (Status, JSON-Vorschau), sobald weitere Aufgaben fertig sind
+        fehlermeldung, aufgaben, json_md = _prepare_subtasks(tasks, titles, descriptions, assignees, workspace_gid, project_gid, parent_task_gid, user_choices, due_dates)
+        if fehlermeldung:
+            yield fehlermeldung, ""
+            return
+        # Erstelle Aufgaben in Asana mit den UI-Werten, Zwischenstände werden direkt weitergereicht
+        for status in iter_create_subtasks_in_asana(aufgaben, workspace_gid, project_gid, parent_task_gid):
+            yield status, json_md
+
+    async def create_subtasks_wrapper_async(tasks, titles, descriptions, assignees, workspace_gid, project_gid, parent_task_gid, user_choices, due_dates=None):
+        fehlermeldung, aufgaben, json_md = _prepare_subtasks(tasks, titles, descriptions, assignees, workspace_gid, project_gid, parent_task_gid, user_choices, due_dates)
+        if fehlermeldung:
+            yield fehlermeldung, ""
+            return
+        async for status in aiter_create_subtasks_in_asana(aufgaben, workspace_gid, project_gid, parent_task_gid):
+            yield status, json_md
 
-    def create_subtasks_with_loading(tasks, workspace_name, project_name, parent_task_name, user_names, *args):
+    def _group_task_fields(args):
         # args: [title1, description1, assignee1, due_date1, title2, description2, assignee2, due_date2, ...] (für jede Aufgabe 4 Felder)
-        debug_log(f"[create_subtasks_with_loading] args length: {len(args)}")
-        debug_log(f"[create_subtasks_with_loading] args: {args}")
+        debug_log("[create_subtasks_with_loading] args length: %s", len(args))
+        debug_log("[create_subtasks_with_loading] args: %s", args)
         
         # Gruppiere die args in 4er-Gruppen (title, description, assignee, due_date)
         titles = []
@@ -976,84 +3855,564 @@ with gr.Blocks(title="Meeting-Protokoll zu Asana Aufgaben") as app:
                 due_dates.append(args[i+3] if args[i+3] else "")
         
         # Debug-Ausgaben
-        debug_log(f"[create_subtasks_with_loading] titles={titles}")
-        debug_log(f"[create_subtasks_with_loading] descriptions={descriptions}")
-        debug_log(f"[create_subtasks_with_loading] assignees={assignees}")
-        debug_log(f"[create_subtasks_with_loading] due_dates={due_dates}")
-        debug_log(f"workspace_name={workspace_name}")
-        debug_log(f"project_name={project_name}")
-        debug_log(f"parent_task_name={parent_task_name}")
-        debug_log(f"user_names={user_names}")
+        debug_log("[create_subtasks_with_loading] titles=%s", titles)
+        debug_log("[create_subtasks_with_loading] descriptions=%s", descriptions)
+        debug_log("[create_subtasks_with_loading] assignees=%s", assignees)
+        debug_log("[create_subtasks_with_loading] due_dates=%s", due_dates)
+        return titles, descriptions, assignees, due_dates
+
+    @profiled('create_subtasks_with_loading')
+    def create_subtasks_with_loading(tasks, workspace_gid, project_gid, parent_task_gid, user_choices, *args):
+        titles, descriptions, assignees, due_dates = _group_task_fields(args)
+        debug_log("workspace_gid=%s", workspace_gid)
+        debug_log("project_gid=%s", project_gid)
+        debug_log("parent_task_gid=%s", parent_task_gid)
+        debug_log("user_choices=%s", user_choices)
         # Ladeanzeige einblenden, Button deaktivieren
         yield gr.update(value="🔄 Aufgaben werden erstellt..."), gr.update(interactive=False), gr.update()
         # Aufgaben erstellen (Titel, Beschreibungen, Assignees und Due Dates werden übernommen)
-        result = create_subtasks_wrapper(tasks, titles, descriptions, assignees, workspace_name, project_name, parent_task_name, user_names, due_dates)
+        result = ("", "")
+        for result in create_subtasks_wrapper(tasks, titles, descriptions, assignees, workspace_gid, project_gid, parent_task_gid, user_choices, due_dates):
+            yield gr.update(value=result[0]), gr.update(interactive=False), gr.update(value=result[1])
         # Ladeanzeige ausblenden, Button wieder aktivieren
         yield gr.update(value=result[0]), gr.update(interactive=True), gr.update(value=result[1])
 
-    create_button.click(
-        fn=create_subtasks_with_loading,
-        inputs=[tasks_state, workspace_dropdown, project_dropdown, parent_task_dropdown, user_names_state] + [item for container in task_containers for item in container[1:5]],  # Nur title, description, assignee, due_date (ohne Block und Buttons)
-        outputs=[status_output, create_button, gr.Markdown(label="JSON-Vorschau")],
-        queue=True
-    )
+    @profiled('create_subtasks_with_loading')
+    async def create_subtasks_with_loading_async(tasks, workspace_gid, project_gid, parent_task_gid, user_choices, *args):
+        titles, descriptions, assignees, due_dates = _group_task_fields(args)
+        yield gr.update(value="🔄 Aufgaben werden erstellt..."), gr.update(interactive=False), gr.update()
+        result = ("", "")
+        async for result in create_subtasks_wrapper_async(tasks, titles, descriptions, assignees, workspace_gid, project_gid, parent_task_gid, user_choices, due_dates):
+            yield gr.update(value=result[0]), gr.update(interactive=False), gr.update(value=result[1])
+        yield gr.update(value=result[0]), gr.update(interactive=True), gr.update(value=result[1])
+
+# Warteschlange begrenzen; Wartende sehen ihre Position, bei vollem Puffer lehnt Gradio neue Events ab
+app.queue(
+    max_size=CONCURRENCY_CONFIG['queue_max_size'],
+    default_concurrency_limit=CONCURRENCY_CONFIG['pools']['asana_read']
+)
+
+def _format_subtask_status(tasks, outcomes):
+    """Statuszeilen in Eingabereihenfolge; noch laufende Aufgaben werden mit ⏳ angezeigt"""
+    lines = []
+    for task, outcome in zip(tasks, outcomes):
+        if outcome is None:
+            lines.append(f"⏳ {task['name']}")
+        elif outcome is True:
+            lines.append(f"✅ {task['name']}")
+        else:
+            lines.append(f"❌ {task['name']} - Fehler: {outcome}")
+    return "\n".join(lines)
+
+def _missing_subtask_target(workspace_gid, project_gid, parent_task_gid):
+    if not workspace_gid:
+        return "❌ Fehler: Workspace nicht gefunden"
+    if not project_gid:
+        return "❌ Fehler: Projekt nicht gefunden"
+    if not parent_task_gid:
+        return "❌ Fehler: Übergeordnete Aufgabe nicht gefunden"
+    return None
+
+def _subtask_payload(task, parent_task_gid):
+    """task_data für POST /tasks aus einer Aufgabe des Editors"""
+    task_data = {
+        "name": task['name'],
+        "notes": task.get('description', ''),
+        "parent": parent_task_gid,
+        "assignee": task.get('assignee') or None,
+        "due_on": task.get('due_date') if task.get('due_date') else None
+    }
+    # Fälligkeitsdatum ggf. umwandeln
+    due_date = task.get('due_date')
+    if due_date:
+        try:
+            # Versuche deutsches Format zu erkennen
+            date_obj = datetime.strptime(due_date, '%d.%m.%Y')
+            due_on = date_obj.strftime('%Y-%m-%d')
+        except ValueError:
+            # Fallback: nehme das Feld wie es ist
+            due_on = due_date
+        task_data["due_on"] = due_on
+    # Entferne None-Werte
+    return {k: v for k, v in task_data.items() if v}
+
+def iter_create_subtasks_in_asana(tasks, workspace_gid, project_gid, parent_task_gid):
+    """Erstellt die Aufgaben als Subtasks einer bestehenden Aufgabe und liefert nach jeder
+    fertigen Aufgabe den aktuellen Status-Text (der letzte Wert ist das Endergebnis).
+
+    Alle IDs (Workspace, Projekt, Parent-Task und Assignee) kommen bereits als GIDs
+    aus den Dropdowns, daher sind vor dem Anlegen keine Lookup-Aufrufe nötig.
+    """
+    try:
+        missing = _missing_subtask_target(workspace_gid, project_gid, parent_task_gid)
+        if missing:
+            yield missing
+            return
+        # Baue die Subtask-Daten
+        task_payloads = [_subtask_payload(task, parent_task_gid) for task in tasks]
+        # Erstelle die Subtasks parallel und melde jedes Ergebnis sofort
+        outcomes = [None] * len(tasks)
+        for idx, result, error in iter_create_tasks(task_payloads):
+            outcomes[idx] = True if error is None else str(error)
+            yield _format_subtask_status(tasks, outcomes)
+        # Aufgabenliste des Projekts ist jetzt veraltet
+        asana_cache.invalidate('tasks', project_gid)
+        yield _format_subtask_status(tasks, outcomes)
+    except Exception as e:
+        yield f"❌ Fehler beim Erstellen der Subtasks: {str(e)}"
+
+async def aiter_create_subtasks_in_asana(tasks, workspace_gid, project_gid, parent_task_gid):
+    """Wie iter_create_subtasks_in_asana, aber über aiter_create_tasks"""
+    try:
+        missing = _missing_subtask_target(workspace_gid, project_gid, parent_task_gid)
+        if missing:
+            yield missing
+            return
+        task_payloads = [_subtask_payload(task, parent_task_gid) for task in tasks]
+        outcomes = [None] * len(tasks)
+        async for idx, result, error in aiter_create_tasks(task_payloads):
+            outcomes[idx] = True if error is None else str(error)
+            yield _format_subtask_status(tasks, outcomes)
+        asana_cache.invalidate('tasks', project_gid)
+        yield _format_subtask_status(tasks, outcomes)
+    except Exception as e:
+        yield f"❌ Fehler beim Erstellen der Subtasks: {str(e)}"
 
-def create_subtasks_in_asana(tasks, workspace_name, project_name, parent_task_name):
+def create_subtasks_in_asana(tasks, workspace_gid, project_gid, parent_task_gid):
     """Erstellt die Aufgaben als Subtasks einer bestehenden Aufgabe in Asana"""
+    status = ""
+    for status in iter_create_subtasks_in_asana(tasks, workspace_gid, project_gid, parent_task_gid):
+        pass
+    return status
+
+# Stapelverarbeitung ohne UI (python test.py bulk ... oder POST /bulk): viele Protokolle auf einmal.
+# Pipeline: Einlesen im Thread-Pool -> KI-Extraktion (höchstens BULK_LLM_CONCURRENCY KI-Aufrufe gleichzeitig,
+# die Abschnitte einer Datei nacheinander) ->
+# Anlegen in Asana (höchstens BULK_ASANA_RATE Requests pro Sekunde). Der JSON-Bericht ist zugleich
+# der Fortschritt: fertige Dateien (gleicher Inhalt) werden nie erneut verarbeitet, extrahierte
+# Aufgaben und bereits angelegte GIDs werden beim Fortsetzen übernommen.
+BULK_FILE_TYPES = ('.docx', '.xlsx', '.xls', '.txt', '.md')
+BULK_PARSE_WORKERS = int(os.getenv('BULK_PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+BULK_LLM_CONCURRENCY = int(os.getenv('BULK_LLM_CONCURRENCY', LLM_MAX_CONCURRENCY))
+BULK_CREATE_WORKERS = int(os.getenv('BULK_CREATE_WORKERS', 2))
+BULK_ASANA_RATE = float(os.getenv('BULK_ASANA_RATE', 2.0))  # Asana erlaubt ca. 150 Requests pro Minute
+BULK_API_TOKEN = os.getenv('BULK_API_TOKEN', '')
+BULK_ROOT = os.getenv('BULK_ROOT', '.')  # POST /bulk darf nur Dateien und Berichte darunter verwenden
+
+class RateLimiter:
+    """Token-Bucket: im Mittel höchstens rate Aufrufe pro Sekunde, kurzzeitig bis zu burst (thread-sicher).
+    rate <= 0 schaltet die Begrenzung ab."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+class BulkReport:
+    """JSON-Bericht einer Stapelverarbeitung, je Datei unter dem SHA-256 des Inhalts.
+
+    Wird nach jeder Änderung atomar neu geschrieben (thread-sicher). Ein vorhandener Bericht wird
+    fortgesetzt, aber nur für dasselbe Ziel (Workspace, Projekt, übergeordnete Aufgabe).
+    """
+
+    def __init__(self, path, target):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.data = json.load(f)
+            if self.data.get('target') != target:
+                raise ValueError(f"Bericht {path} gehört zu einem anderen Ziel: {self.data.get('target')}")
+        if self.data is None:
+            self.data = {'target': target, 'created_at': datetime.now().isoformat(timespec='seconds'), 'files': {}}
+
+    def entry(self, digest):
+        return self.data['files'].get(digest)
+
+    def update(self, digest, **fields):
+        with self._lock:
+            self.data['files'].setdefault(digest, {}).update(fields)
+            self._save()
+
+    def update_task(self, digest, index, **fields):
+        with self._lock:
+            self.data['files'][digest]['tasks'][index].update(fields)
+            self._save()
+
+    def save(self, **fields):
+        with self._lock:
+            self.data.update(fields)
+            self._save()
+
+    def _save(self):
+        # Lock muss gehalten werden
+        entries = self.data['files'].values()
+        tasks = [task for entry in entries for task in entry.get('tasks') or []]
+        self.data['summary'] = {
+            'files': len(self.data['files']),
+            'done': sum(1 for entry in entries if entry.get('status') == 'done'),
+            'failed': sum(1 for entry in entries if entry.get('status') == 'failed'),
+            'tasks_created': sum(1 for task in tasks if task.get('gid')),
+            'tasks_failed': sum(1 for task in tasks if task.get('error') and not task.get('gid')),
+        }
+        self.data['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+def collect_protocol_files(paths):
+    """Alle unterstützten Dateien aus paths (Dateien oder Verzeichnisse, rekursiv), sortiert und ohne Doppelte"""
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.update(os.path.join(root, name) for name in names
+                             if name.lower().endswith(BULK_FILE_TYPES) and not name.startswith(('.', '~$')))
+        elif os.path.isfile(path):
+            # Explizit genannte Dateien durchlaufen denselben Filter wie die Verzeichnissuche
+            if os.path.basename(path).lower().endswith(BULK_FILE_TYPES):
+                files.add(path)
+            else:
+                debug_log("Übersprungen (nicht unterstütztes Format): %s", path, level=logging.WARNING)
+        else:
+            raise FileNotFoundError(path)
+    return sorted(os.path.abspath(path) for path in files)
+
+def read_protocol_file(path):
+    """Text eines Protokolls (läuft im Einlese-Pool der Stapelverarbeitung)"""
+    if path.lower().endswith(('.txt', '.md')):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.read()
+    return _protocol_file_text(path)
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _bulk_due_date(value):
+    """YYYY-MM-DD aus einem KI-Datum (YYYY-MM-DD oder TT.MM.JJJJ), sonst leer"""
+    for fmt in ('%Y-%m-%d', '%d.%m.%Y'):
+        try:
+            return datetime.strptime(str(value or '').strip(), fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return ''
+
+def _bulk_extract(text, assignee_index):
+    """Aufgaben eines Protokolls für den Bericht: Assignee als User-GID, Datum als YYYY-MM-DD.
+    Läuft im KI-Pool der Stapelverarbeitung; die Abschnitte eines langen Protokolls laufen daher
+    nacheinander, sonst wären BULK_LLM_CONCURRENCY * LLM_MAX_CONCURRENCY Aufrufe gleichzeitig offen."""
+    tasks = []
+    for task in iter_extract_tasks(text, max_concurrency=1):
+        assignee_name, assignee_gid = assignee_index.resolve(task.get('assignee'))
+        tasks.append({
+            'name': task.get('name', ''),
+            'description': task.get('description', ''),
+            'assignee': assignee_gid or '',
+            'assignee_name': assignee_name or '',
+            'due_date': _bulk_due_date(task.get('due_date')),
+            'gid': None,
+        })
+    return [task for task in tasks if task['name'].strip()]
+
+def _bulk_payload(task, workspace_gid, project_gid, parent_task_gid):
+    if parent_task_gid:
+        return _subtask_payload(task, parent_task_gid)
+    task_data = {
+        "name": task['name'],
+        "notes": task.get('description', ''),
+        "workspace": workspace_gid,
+        "projects": [project_gid],
+        "assignee": task.get('assignee') or None,
+        "due_on": task.get('due_date') or None
+    }
+    return {k: v for k, v in task_data.items() if v}
+
+def _bulk_create(report, digest, target, limiter):
+    """Legt die noch fehlenden Aufgaben einer Datei an; jede GID wird sofort im Bericht gesichert.
+
+    Vor dem Anlegen steht attempt_started im Bericht. Fehlt danach die GID (Absturz zwischen Anlegen
+    und Sichern, Fehler mit offenem Ausgang), sucht der nächste Lauf zuerst nach der Aufgabe."""
+    tasks = [dict(task) for task in report.entry(digest)['tasks']]
+    claimed = {task['gid'] for task in tasks if task.get('gid')}
+    failed = 0
+    for index, task in enumerate(tasks):
+        if task.get('gid'):
+            continue
+        started = task.get('attempt_started')
+        if started is None:
+            report.update_task(digest, index, attempt_started=time.time())
+        else:
+            limiter.acquire()  # Duplikatprüfung
+        limiter.acquire()
+        try:
+            payload = _bulk_payload(task, target['workspace'], target['project'], target['parent'])
+            gid = _result_gid(_create_single_task(payload, started=started, claimed=claimed))
+            claimed.add(gid)
+            report.update_task(digest, index, gid=gid, error=None)
+        except Exception as e:
+            failed += 1
+            report.update_task(digest, index, error=str(e))
+    return f"{failed} von {len(tasks)} Aufgaben nicht angelegt" if failed else None
+
+def run_bulk(paths, workspace_gid, project_gid, parent_task_gid=None, report_path='bulk_report.json', progress=None):
+    """Verarbeitet alle Protokolle aus paths in das Ziel und liefert den Bericht (dict).
+
+    Ohne parent_task_gid werden die Aufgaben direkt im Projekt angelegt, sonst als Subtasks.
+    progress(text) erhält eine Zeile je Fortschritt (Standard: debug_log).
+    """
+    progress = progress or (lambda text: debug_log("[bulk] %s", text, level=logging.INFO))
+    if not workspace_gid or not project_gid:
+        raise ValueError("Workspace und Projekt sind erforderlich")
+    target = {'workspace': workspace_gid, 'project': project_gid, 'parent': parent_task_gid or None}
+    report = BulkReport(report_path, target)
+    files = collect_protocol_files(paths)
+    assignee_index = get_assignee_index(workspace_gid)
+    limiter = RateLimiter(BULK_ASANA_RATE)
+    report.save(started_at=datetime.now().isoformat(timespec='seconds'), finished_at=None)
+
+    # Threads statt Prozesse: ein spawn-Worker würde test.py samt Gradio-Blocks, Asana-Client,
+    # Logging-Listener (gleiche debug.log) und atexit-Hooks neu importieren. zipfile/iterparse und
+    # openpyxl verbringen den Großteil der Zeit in C bzw. beim Lesen, die KI-Extraktion dominiert ohnehin.
+    parse_pool = ThreadPoolExecutor(max_workers=max(1, BULK_PARSE_WORKERS), thread_name_prefix='bulk-parse')
+    llm_pool = ThreadPoolExecutor(max_workers=max(1, BULK_LLM_CONCURRENCY), thread_name_prefix='bulk-llm')
+    create_pool = ThreadPoolExecutor(max_workers=max(1, BULK_CREATE_WORKERS), thread_name_prefix='bulk-create')
+    pending = {}
+    skipped = 0
+
+    def fail(digest, name, stage, error):
+        report.update(digest, status='failed', error=f"{stage}: {error}", finished_at=datetime.now().isoformat(timespec='seconds'))
+        progress(f"❌ {name}: {stage} fehlgeschlagen ({error})")
+
+    def submit_create(digest):
+        report.update(digest, status='creating')
+        pending[create_pool.submit(_bulk_create, report, digest, target, limiter)] = ('create', digest)
+
     try:
-        # Hole Workspace und Projekt IDs
-        workspaces = get_workspaces()
-        workspace_gid = workspaces.get(workspace_name)
-        if not workspace_gid:
-            return "❌ Fehler: Workspace nicht gefunden"
-        projects = get_projects(workspace_gid)
-        project_gid = projects.get(project_name)
-        if not project_gid:
-            return "❌ Fehler: Projekt nicht gefunden"
-        # Hole Aufgaben im Projekt
-        tasks_dict = get_tasks(project_gid)
-        parent_task_gid = tasks_dict.get(parent_task_name)
-        if not parent_task_gid:
-            return "❌ Fehler: Übergeordnete Aufgabe nicht gefunden"
-        # Hole Benutzer
-        users = get_workspace_users(workspace_gid)
-        user_names = set(users.keys())
-        # Erstelle die Subtasks
-        created_tasks = []
-        for task in tasks:
+        seen = set()
+        for path in files:
+            digest = _file_digest(path)
+            entry = report.entry(digest)
+            if digest in seen or (entry and entry.get('status') == 'done'):
+                skipped += 1  # fertig oder inhaltsgleich mit einer Datei dieses Laufs
+                continue
+            seen.add(digest)
+            report.update(digest, path=path, status='parsing', error=None)
+            if entry and entry.get('tasks'):
+                submit_create(digest)  # bereits extrahiert: nur noch fehlende Aufgaben anlegen
+            else:
+                pending[parse_pool.submit(read_protocol_file, path)] = ('parse', digest)
+        progress(f"{len(files)} Dateien, {skipped} bereits fertig, {len(pending)} in Arbeit")
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, digest = pending.pop(future)
+                name = os.path.basename(report.entry(digest)['path'])
+                try:
+                    result = future.result()
+                except Exception as e:
+                    fail(digest, name, stage, e)
+                    continue
+                if stage == 'parse':
+                    if not result or not result.strip():
+                        fail(digest, name, stage, "kein Text")
+                        continue
+                    report.update(digest, status='extracting', characters=len(result))
+                    pending[llm_pool.submit(_bulk_extract, result, assignee_index)] = ('extract', digest)
+                elif stage == 'extract':
+                    if not result:
+                        # Leere Antworten entstehen auch bei KI-Fehlern; daher beim nächsten Lauf erneut versuchen
+                        fail(digest, name, stage, "keine Aufgaben erkannt")
+                        continue
+                    report.update(digest, tasks=result)
+                    progress(f"{name}: {len(result)} Aufgaben erkannt")
+                    submit_create(digest)
+                elif result:
+                    fail(digest, name, stage, result)
+                else:
+                    report.update(digest, status='done', error=None, finished_at=datetime.now().isoformat(timespec='seconds'))
+                    progress(f"✅ {name}: {len(report.entry(digest)['tasks'])} Aufgaben angelegt")
+    finally:
+        # Bei Abbruch (z. B. Strg+C) laufende Anlege-Aufrufe noch sauber im Bericht sichern
+        parse_pool.shutdown(wait=True, cancel_futures=True)
+        llm_pool.shutdown(wait=True, cancel_futures=True)
+        create_pool.shutdown(wait=True, cancel_futures=True)
+        asana_cache.invalidate('tasks', project_gid)
+        report.save(finished_at=datetime.now().isoformat(timespec='seconds'), last_run={'files': len(files), 'skipped': skipped})
+    return report.data
+
+def bulk_main(argv):
+    """CLI: python test.py bulk PFAD... --workspace GID --project GID [--parent GID] [--report DATEI]"""
+    parser = argparse.ArgumentParser(prog='test.py bulk', description="Viele Protokolle ohne UI in Asana-Aufgaben umwandeln")
+    parser.add_argument('paths', nargs='+', help="Dateien oder Verzeichnisse (.docx, .xlsx, .xls, .txt, .md)")
+    parser.add_argument('--workspace', required=True, help="Workspace-GID")
+    parser.add_argument('--project', required=True, help="Projekt-GID")
+    parser.add_argument('--parent', help="GID der übergeordneten Aufgabe (ohne: Aufgaben direkt im Projekt)")
+    parser.add_argument('--report', default='bulk_report.json', help="JSON-Bericht; ein vorhandener Bericht wird fortgesetzt")
+    args = parser.parse_args(argv)
+    try:
+        report = run_bulk(args.paths, args.workspace, args.project, args.parent, args.report,
+                          progress=lambda text: print(text, file=sys.stderr, flush=True))
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(report['summary'], ensure_ascii=False))
+    return 1 if report['summary']['failed'] else 0
+
+_bulk_jobs = {}  # Berichtspfad -> {'thread', 'status', 'error'}
+_bulk_jobs_lock = threading.Lock()
+
+def mount_bulk_routes(server_app):
+    """POST /bulk startet eine Stapelverarbeitung im Hintergrund, GET /bulk?report=... liefert Stand und Bericht.
+    Nur mit BULK_API_TOKEN (Bearer) und nur für Pfade unter BULK_ROOT."""
+    from fastapi import Request
+    from fastapi.responses import JSONResponse
+
+    root = os.path.realpath(BULK_ROOT)
+
+    def authorized(request):
+        token = request.headers.get('authorization', '').removeprefix('Bearer ')
+        return bool(token) and hmac.compare_digest(token, BULK_API_TOKEN)
+
+    def inside_root(path):
+        real = os.path.realpath(os.path.join(root, path))
+        return real if real == root or real.startswith(root + os.sep) else None
+
+    async def start_bulk(request: Request):
+        if not authorized(request):
+            return JSONResponse({'error': 'Unauthorized'}, status_code=401)
+        try:
+            body = await request.json()
+        except ValueError:  # auch UnicodeDecodeError
+            return JSONResponse({'error': "Body muss JSON sein"}, status_code=400)
+        if not isinstance(body, dict):
+            return JSONResponse({'error': "Body muss ein JSON-Objekt sein"}, status_code=400)
+        raw_paths = body.get('paths') or []
+        fields = [body.get(key) for key in ('report', 'workspace', 'project', 'parent')]
+        if not isinstance(raw_paths, list) or not all(isinstance(value, str) for value in raw_paths) \
+                or not all(value is None or isinstance(value, str) for value in fields):
+            return JSONResponse({'error': "paths muss eine Liste von Pfaden sein, report/workspace/project/parent Zeichenketten"}, status_code=400)
+        try:
+            paths = [inside_root(path) for path in raw_paths]
+            report_path = inside_root(body.get('report') or 'bulk_report.json')
+        except ValueError as e:  # z. B. NUL-Bytes im Pfad
+            return JSONResponse({'error': f"ungültiger Pfad: {e}"}, status_code=400)
+        if not paths or None in paths or report_path is None:
+            return JSONResponse({'error': f"paths und report müssen unter {root} liegen"}, status_code=400)
+        if not body.get('workspace') or not body.get('project'):
+            return JSONResponse({'error': "workspace und project sind erforderlich"}, status_code=400)
+        missing = [os.path.relpath(path, root) for path in paths if not os.path.exists(path)]
+        if missing:
+            return JSONResponse({'error': f"nicht gefunden: {', '.join(missing)}"}, status_code=400)
+        with _bulk_jobs_lock:
+            job = _bulk_jobs.get(report_path)
+            if job and job['status'] == 'running':
+                return JSONResponse({'error': "für diesen Bericht läuft bereits ein Job", 'report': os.path.relpath(report_path, root)}, status_code=409)
+            job = _bulk_jobs[report_path] = {'status': 'running', 'error': None}
+
+        def run():
             try:
-                task_data = {
-                    "name": task['name'],
-                    "notes": task.get('description', ''),
-                    "parent": parent_task_gid,
-                    "assignee": users[task['assignee']] if task.get('assignee') and task['assignee'] in user_names else None,
-                    "due_on": task.get('due_date') if task.get('due_date') else None
-                }
-                # Fälligkeitsdatum ggf. umwandeln
-                due_date = task.get('due_date')
-                if due_date:
-                    try:
-                        # Versuche deutsches Format zu erkennen
-                        date_obj = datetime.strptime(due_date, '%d.%m.%Y')
-                        due_on = date_obj.strftime('%Y-%m-%d')
-                    except ValueError:
-                        # Fallback: nehme das Feld wie es ist
-                        due_on = due_date
-                    task_data["due_on"] = due_on
-                # Entferne None-Werte
-                task_data = {k: v for k, v in task_data.items() if v}
-                opts = {"opt_fields": "name,gid,completed"}
-                result = tasks_api.create_task({"data": task_data}, opts)
-                created_tasks.append(f"✅ {task['name']}")
+                run_bulk(paths, body['workspace'], body['project'], body.get('parent'), report_path)
+                job['status'] = 'finished'
             except Exception as e:
-                created_tasks.append(f"❌ {task['name']} - Fehler: {str(e)}")
-        return "\n".join(created_tasks)
-    except Exception as e:
-        return f"❌ Fehler beim Erstellen der Subtasks: {str(e)}"
+                debug_log("Stapelverarbeitung %s fehlgeschlagen: %s", report_path, e, level=logging.ERROR)
+                job.update(status='error', error=str(e))
+
+        threading.Thread(target=run, name='bulk', daemon=True).start()
+        return JSONResponse({'status': 'running', 'report': os.path.relpath(report_path, root)}, status_code=202)
+
+    def bulk_status(request: Request, report: str = 'bulk_report.json'):
+        if not authorized(request):
+            return JSONResponse({'error': 'Unauthorized'}, status_code=401)
+        report_path = inside_root(report)
+        if report_path is None:
+            return JSONResponse({'error': f"report muss unter {root} liegen"}, status_code=400)
+        job = _bulk_jobs.get(report_path, {})
+        data = None
+        if os.path.exists(report_path):
+            with open(report_path, encoding='utf-8') as f:
+                data = json.load(f)
+        if data is None and not job:
+            return JSONResponse({'error': 'Not found'}, status_code=404)
+        return JSONResponse({'status': job.get('status', 'idle'), 'error': job.get('error'), 'report': data})
+
+    server_app.add_api_route('/bulk', start_bulk, methods=['POST'], include_in_schema=False)
+    server_app.add_api_route('/bulk', bulk_status, methods=['GET'], include_in_schema=False)
+
+def mount_metrics_route(server_app):
+    """Hängt GET /metrics an die FastAPI-App von Gradio (ohne Gradio-Login, damit Prometheus abfragen kann);
+    nur mit METRICS_TOKEN, das als Bearer-Token mitgeschickt werden muss"""
+    from fastapi import Request
+    from fastapi.responses import PlainTextResponse
+
+    def metrics_endpoint(request: Request):
+        token = request.headers.get('authorization', '').removeprefix('Bearer ')
+        if not (token and hmac.compare_digest(token, METRICS_TOKEN)):
+            return PlainTextResponse("Unauthorized", status_code=401)
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    server_app.add_api_route('/metrics', metrics_endpoint, methods=['GET'], include_in_schema=False)
+
+def mount_profile_routes(server_app):
+    """GET /profiles (Liste) und /profiles/<id>.prof|.json zum Herunterladen; nur mit PROFILE_TOKEN
+    (als X-Profile-Token oder Bearer-Token)"""
+    from fastapi import Request
+    from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+
+    def authorized(request):
+        token = request.headers.get(PROFILE_HEADER) or request.headers.get('authorization', '').removeprefix('Bearer ')
+        return bool(token) and hmac.compare_digest(token, PROFILE_TOKEN)
+
+    def list_profiles(request: Request):
+        if not authorized(request):
+            return PlainTextResponse("Unauthorized", status_code=401)
+        return JSONResponse(profile_store.list())
+
+    def download_profile(name: str, request: Request):
+        if not authorized(request):
+            return PlainTextResponse("Unauthorized", status_code=401)
+        path = profile_store.path(name)
+        if path is None:
+            return PlainTextResponse("Not found", status_code=404)
+        return FileResponse(path, filename=name)
+
+    server_app.add_api_route('/profiles', list_profiles, methods=['GET'], include_in_schema=False)
+    server_app.add_api_route('/profiles/{name}', download_profile, methods=['GET'], include_in_schema=False)
 
 # Starte die Anwendung
 if __name__ == "__main__":
+    # Nur im eigenen Prozess (App oder Bulk-CLI), nicht bei jedem Import (Benchmarks, Tests, Worker)
+    atexit.register(_log_http_pool_stats)
+
+if __name__ == "__main__" and sys.argv[1:2] == ['bulk']:
+    sys.exit(bulk_main(sys.argv[2:]))
+elif __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
+    start_warm_up()
     app.launch(
         server_name="0.0.0.0",
         
@@ -1061,6 +4420,23 @@ if __name__ == "__main__":
         server_port=port,
         share=False,
         auth=("innpuls", "innpuls"),  # Benutzername und Passwort
-        auth_message="Bitte melden Sie sich an, um auf die App zuzugreifen."
-    ) 
+        auth_message="Bitte melden Sie sich an, um auf die App zuzugreifen.",
+        # Genug Worker-Threads für alle Pools plus die Events außerhalb der Warteschlange
+        max_threads=max(40, sum(CONCURRENCY_CONFIG['pools'].values()) + 8),
+        prevent_thread_lock=True
+    )
+    if METRICS_ENABLED and METRICS_TOKEN:
+        mount_metrics_route(app.app)
+    elif METRICS_ENABLED:
+        debug_log("METRICS_TOKEN nicht gesetzt, /metrics ist deaktiviert", level=logging.INFO)
+    if PROFILE_TOKEN:
+        mount_profile_routes(app.app)
+    if BULK_API_TOKEN:
+        mount_bulk_routes(app.app)
+    # Zeit vom Prozessstart bis der Port lauscht messen
+    startup_seconds = time.perf_counter() - _PROCESS_START
+    print(f"Server lauscht auf Port {port} nach {startup_seconds:.2f}s (Ziel: < {STARTUP_TARGET_SECONDS:.0f}s)")
+    if startup_seconds > STARTUP_TARGET_SECONDS:
+        debug_log("Start dauerte %.2fs, Ziel sind %.0fs", startup_seconds, STARTUP_TARGET_SECONDS, level=logging.WARNING)
+    app.block_thread()
 
@@ -0,0 +1,130 @@
+"""Gemeinsame Fixtures: test.py läuft gegen einen lokalen Asana-Stellvertreter, der aufgezeichnete
+Antworten aus tests/fixtures/asana/*.json abspielt.
+
+Eine Aufzeichnung ist eine Liste von Interaktionen:
+
+    {"request": {"method": "GET", "path": "/tasks", "query": {"project": "1201", "offset": null}},
+     "response": {"status": 200, "body": {"data": [...], "next_page": null}}}
+
+Eine Anfrage passt, wenn Methode und Pfad (ohne /api/1.0) gleich sind und jeder Schlüssel aus
+"query" passt: null heißt "fehlt", "*" heißt "vorhanden", sonst muss der Wert gleich sein; andere
+Parameter werden ignoriert. Jede Interaktion wird genau einmal abgespielt, in Dateireihenfolge.
+Anfragen ohne passende Interaktion beantwortet der Server mit 599 und merkt sie sich.
+"""
+import json
+import os
+import sys
+import threading
+
+import pytest
+from aiohttp import web
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(TESTS_DIR, '..')
+FIXTURES_DIR = os.path.join(TESTS_DIR, 'fixtures', 'asana')
+API_PREFIX = '/api/1.0'
+
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+from load_test import start_backend  # noqa: E402
+
+
+class AsanaReplay:
+    """aiohttp-Server, der aufgezeichnete Asana-Antworten abspielt und alle Anfragen protokolliert"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.interactions = []
+        self.requests = []
+        self.unmatched = []
+
+    def load(self, *names):
+        """Ersetzt die abzuspielenden Interaktionen durch die der genannten Aufzeichnungen"""
+        interactions = []
+        for name in names:
+            with open(os.path.join(FIXTURES_DIR, f"{name}.json"), encoding='utf-8') as f:
+                interactions.extend(json.load(f))
+        with self.lock:
+            self.interactions = [dict(interaction, used=False) for interaction in interactions]
+            self.requests = []
+            self.unmatched = []
+
+    @staticmethod
+    def matches(expected, method, path, query):
+        if expected['method'] != method or expected['path'] != path:
+            return False
+        for key, value in (expected.get('query') or {}).items():
+            if value is None:
+                if key in query:
+                    return False
+            elif value == '*':
+                if key not in query:
+                    return False
+            elif query.get(key) != value:
+                return False
+        return True
+
+    async def handle(self, request):
+        path = request.path[len(API_PREFIX):] if request.path.startswith(API_PREFIX) else request.path
+        query = dict(request.query)
+        with self.lock:
+            self.requests.append((request.method, path, query))
+            for interaction in self.interactions:
+                if not interaction['used'] and self.matches(interaction['request'], request.method, path, query):
+                    interaction['used'] = True
+                    response = interaction['response']
+                    break
+            else:
+                self.unmatched.append((request.method, path, query))
+                return web.json_response({'errors': [{'message': 'Keine aufgezeichnete Antwort'}]}, status=599)
+        return web.json_response(response.get('body'), status=response.get('status', 200))
+
+    def calls(self, method, path):
+        """Query-Parameter aller bisherigen Anfragen an method/path"""
+        with self.lock:
+            return [query for m, p, query in self.requests if m == method and p == path]
+
+    def assert_done(self):
+        """Alle Interaktionen abgespielt, keine unerwarteten Anfragen"""
+        with self.lock:
+            assert not self.unmatched, f"Unerwartete Anfragen: {self.unmatched}"
+            pending = [interaction['request'] for interaction in self.interactions if not interaction['used']]
+        assert not pending, f"Nicht abgespielt: {pending}"
+
+    def application(self):
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        return app
+
+
+@pytest.fixture(scope='session')
+def asana_replay():
+    return AsanaReplay()
+
+
+@pytest.fixture(scope='session')
+def app(asana_replay, tmp_path_factory):
+    """test.py, importiert gegen den Replay-Server (die Asana-Clients entstehen beim Import)"""
+    base_url = start_backend(asana_replay, 0)
+    workdir = tmp_path_factory.mktemp('app')
+    os.environ.update({
+        'ASANA_BASE_URL': f"{base_url}{API_PREFIX}",
+        'ASANA_API_TOKEN': 'test',
+        'OPENAI_API_KEY': 'test',
+        'ASANA_MIRROR_PATH': str(workdir / 'asana_mirror.sqlite3'),
+        'LLM_CACHE_PATH': str(workdir / 'llm_cache.sqlite3'),
+        'LOG_FILE': str(workdir / 'debug.log'),
+        'ASANA_MAX_RETRIES': '0',
+    })
+    sys.path.insert(0, ROOT_DIR)
+    import test as app
+    return app
+
+
+@pytest.fixture
+def mirror(app, tmp_path, monkeypatch):
+    """Frischer Spiegel und leerer Cache je Test"""
+    mirror = app.AsanaMirror(str(tmp_path / 'asana_mirror.sqlite3'))
+    monkeypatch.setattr(app, 'asana_mirror', mirror)
+    app.asana_cache.invalidate()
+    yield mirror
+    app.asana_cache.invalidate()
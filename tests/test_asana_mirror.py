@@ -0,0 +1,138 @@
+"""Asana-Spiegel (SQLite) gegen aufgezeichnete Asana-Antworten: kompletter Abgleich, Delta über
+Events-Sync-Token und modified_since, Rückfall bei abgelaufenem Token und Lesen aus dem Spiegel."""
+import asyncio
+from datetime import datetime, timezone
+
+PROJECT = '1201'
+WORKSPACE = '1100'
+INITIAL_TASKS = {
+    'ABC Jahresbericht': '3004',
+    'Messeauftritt Innsbruck': '3003',
+    'Newsletter Q3': '3002',
+    'SEO Audit Alpenbau': '3005',
+    'Website Relaunch 2025': '3001',
+}
+
+
+def initial_sync(app, asana_replay):
+    """Erster kompletter Abgleich des Projekts; danach ist nur der Spiegel befüllt, der Cache leer"""
+    asana_replay.load('initial_sync')
+    app._load_tasks(PROJECT)
+    asana_replay.assert_done()
+    app.asana_cache.invalidate()
+
+
+def test_initial_full_sync(app, asana_replay, mirror):
+    asana_replay.load('initial_sync')
+
+    assert app.get_tasks(PROJECT) == INITIAL_TASKS
+
+    asana_replay.assert_done()
+    # Beide Seiten geladen, Sync-Token vor der Aufgabenliste geholt
+    assert [query.get('offset') for query in asana_replay.calls('GET', '/tasks')] == [None, 'eyJ0eXAiOjE']
+    assert asana_replay.requests[0][1] == '/events'
+    assert sorted(gid for _, gid, _ in mirror.read('tasks', PROJECT)) == sorted(INITIAL_TASKS.values())
+    synced_at, full_synced_at, token = mirror.state('tasks', PROJECT)
+    assert token == 'tok-1'
+    assert synced_at == full_synced_at
+
+
+def test_events_delta_sync(app, asana_replay, mirror):
+    initial_sync(app, asana_replay)
+    full_synced_at = mirror.state('tasks', PROJECT)[1]
+    asana_replay.load('delta_sync')
+
+    tasks = app.get_tasks(PROJECT)
+
+    asana_replay.assert_done()
+    # 3001 umbenannt, 3002 erledigt, 3003 gelöscht, 3006 neu
+    assert tasks == {
+        'ABC Jahresbericht': '3004',
+        'Imagefilm Drehplan': '3006',
+        'SEO Audit Alpenbau': '3005',
+        'Website Relaunch 2025/26': '3001',
+    }
+    assert sorted(gid for _, gid, _ in mirror.read('tasks', PROJECT)) == ['3001', '3004', '3005', '3006']
+    synced_at, still_full_synced_at, token = mirror.state('tasks', PROJECT)
+    assert token == 'tok-2'
+    assert still_full_synced_at == full_synced_at < synced_at
+
+
+def test_expired_sync_token_falls_back_to_full_resync(app, asana_replay, mirror):
+    initial_sync(app, asana_replay)
+    previous_full_sync = mirror.state('tasks', PROJECT)[1]
+    asana_replay.load('expired_token')
+
+    tasks = app.get_tasks(PROJECT)
+
+    asana_replay.assert_done()
+    assert tasks == {'ABC Jahresbericht': '3004', 'Broschüre Stadtwerke': '3007', 'Newsletter Q3': '3002'}
+    # Der Spiegel wurde ersetzt, nicht ergänzt
+    assert sorted(gid for _, gid, _ in mirror.read('tasks', PROJECT)) == ['3002', '3004', '3007']
+    synced_at, full_synced_at, token = mirror.state('tasks', PROJECT)
+    assert token == 'tok-10'
+    assert full_synced_at == synced_at > previous_full_sync
+    # Die Aufgabenliste kam komplett, nicht per modified_since
+    assert all('modified_since' not in query for query in asana_replay.calls('GET', '/tasks'))
+
+
+def test_modified_since_refresh_moves_only_the_delta(app, asana_replay, mirror):
+    initial_sync(app, asana_replay)
+    synced_at = mirror.state('tasks', PROJECT)[0]
+    asana_replay.load('no_changes')
+
+    tasks = app.get_tasks(PROJECT)
+
+    asana_replay.assert_done()
+    # Ohne Änderungen kommt die komplette Liste aus dem Spiegel; übertragen wurde nur das leere Delta
+    assert tasks == INITIAL_TASKS
+    task_calls = asana_replay.calls('GET', '/tasks')
+    expected_since = datetime.fromtimestamp(synced_at - app.ASANA_MIRROR_SKEW_SECONDS, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    assert [query['modified_since'] for query in task_calls] == [expected_since]
+    assert mirror.state('tasks', PROJECT)[2] == 'tok-2'
+
+
+def test_async_loader_uses_the_same_delta_sync(app, asana_replay, mirror):
+    initial_sync(app, asana_replay)
+    asana_replay.load('delta_sync')
+
+    async def load():
+        try:
+            return dict(await app.aget_task_choices(PROJECT))
+        finally:
+            await app.get_async_asana().aclose()
+
+    tasks = asyncio.run(load())
+
+    asana_replay.assert_done()
+    assert set(tasks.values()) == {'3001', '3004', '3005', '3006'}
+    assert mirror.state('tasks', PROJECT)[2] == 'tok-2'
+
+
+def test_metadata_is_read_from_the_mirror(app, asana_replay, mirror):
+    asana_replay.load('metadata')
+    workspaces = app.get_workspaces()
+    projects = app.get_projects(WORKSPACE)
+    users = app.get_workspace_users(WORKSPACE)
+    asana_replay.assert_done()
+    assert workspaces == {'innpuls.at': '1100'}
+    assert projects == {'Buchhaltung': '1202', 'Marketing': '1201'}
+    # Nur @innpuls.at-Adressen
+    assert users == {'Anna Huber': '5001', 'Lukas Gruber': '5002'}
+
+    # Neuer Prozess (leerer Cache), Spiegel jünger als die TTL: keine einzige Anfrage an Asana
+    app.asana_cache.invalidate()
+    asana_replay.load()
+    assert app.get_workspaces() == workspaces
+    assert app.get_projects(WORKSPACE) == projects
+    assert app.get_workspace_users(WORKSPACE) == users
+    assert asana_replay.requests == []
+
+
+def test_mirror_serves_tasks_when_asana_is_unreachable(app, asana_replay, mirror):
+    initial_sync(app, asana_replay)
+    # Keine Aufzeichnung: jede Anfrage scheitert mit 599
+    asana_replay.load()
+
+    assert app.get_tasks(PROJECT) == INITIAL_TASKS
+    assert asana_replay.unmatched
@@ -0,0 +1,45 @@
+"""Zuordnung der von der KI erkannten Assignees im Analyse-Editor: es zählt die GID, nicht der Anzeigename."""
+
+USERS = [
+    ('Anna Huber', '5001', 'anna.huber.vertrieb@innpuls.at'),
+    ('Anna Huber', '5002', 'anna.huber.marketing@innpuls.at'),
+    ('Lukas Gruber', '5003', 'lukas.gruber@innpuls.at'),
+]
+
+
+def analysis(app, tasks):
+    context = ([(name, gid) for name, gid, _ in USERS], app.AssigneeIndex(USERS), [], None)
+    app._resolve_new_assignees(tasks, context, 0)
+    return app._analysis_result(tasks, context, 'run')
+
+
+def test_same_display_name_keeps_the_resolved_user(app):
+    tasks = [
+        {'name': 'Angebot Vertrieb', 'assignee': 'anna.huber.vertrieb'},
+        {'name': 'Kampagne', 'assignee': 'Anna Huber Marketing'},
+    ]
+
+    editor_tasks, assignees = analysis(app, tasks)[:2]
+
+    assert [task['assignee'] for task in editor_tasks] == ['5001', '5002']
+    assert assignees == ['5001', '5002']
+
+
+def test_ambiguous_or_unknown_assignee_stays_empty(app):
+    tasks = [
+        {'name': 'Bericht', 'assignee': 'Anna Huber'},
+        {'name': 'Messe', 'assignee': 'Unbekannt'},
+        {'name': 'Website', 'assignee': 'Lukas'},
+    ]
+
+    editor_tasks = analysis(app, tasks)[0]
+
+    assert [task['assignee'] for task in editor_tasks] == [None, None, '5003']
+
+
+def test_editor_waits_for_the_user_list(app):
+    tasks = [{'name': 'Bericht', 'assignee': 'Lukas Gruber'}]
+
+    editor_tasks = app._analysis_result(tasks, None, 'run')[0]
+
+    assert editor_tasks[0]['assignee'] is None
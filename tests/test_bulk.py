@@ -0,0 +1,73 @@
+"""Stapelverarbeitung: Fortsetzen eines Berichts ohne doppelt angelegte Aufgaben."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+TARGET = {'workspace': '1100', 'project': '1201', 'parent': None}
+DIGEST = 'abc123'
+# Eine Sekunde vor dem created_at der Aufgabe 3101 in bulk_resume.json
+ATTEMPT_STARTED = datetime.fromisoformat('2025-03-14T09:00:04+00:00').timestamp()
+
+
+def report_with(app, tmp_path, tasks):
+    report = app.BulkReport(str(tmp_path / 'bulk_report.json'), TARGET)
+    report.update(DIGEST, path='protokoll.txt', status='creating', tasks=tasks)
+    return report
+
+
+def test_resume_finds_task_created_before_a_crash(app, asana_replay, tmp_path):
+    # Voriger Lauf: Anlegen begonnen, dann Absturz, bevor die GID gesichert war
+    report = report_with(app, tmp_path, [
+        {'name': 'Angebot schreiben', 'description': '', 'gid': None, 'attempt_started': ATTEMPT_STARTED},
+        {'name': 'Messe buchen', 'description': '', 'gid': None, 'attempt_started': ATTEMPT_STARTED},
+        {'name': 'Fotos sichten', 'description': '', 'gid': None},
+    ])
+    asana_replay.load('bulk_resume')
+
+    error = app._bulk_create(report, DIGEST, TARGET, app.RateLimiter(1000))
+
+    asana_replay.assert_done()
+    assert error is None
+    tasks = app.BulkReport(report.path, TARGET).entry(DIGEST)['tasks']
+    assert [task['gid'] for task in tasks] == ['3101', '3102', '3103']
+    # Nur die beiden nicht gefundenen Aufgaben wurden angelegt; die neue ohne vorherige Suche
+    assert len(asana_replay.calls('POST', '/tasks')) == 2
+    assert len(asana_replay.calls('GET', '/tasks')) == 2
+
+
+def test_attempt_is_recorded_before_the_create(app, asana_replay, tmp_path):
+    report = report_with(app, tmp_path, [{'name': 'Fotos sichten', 'description': '', 'gid': None}])
+    asana_replay.load()  # jede Anfrage scheitert (599), wie ein abgebrochener Request
+
+    error = app._bulk_create(report, DIGEST, TARGET, app.RateLimiter(1000))
+
+    assert error == "1 von 1 Aufgaben nicht angelegt"
+    task = app.BulkReport(report.path, TARGET).entry(DIGEST)['tasks'][0]
+    assert task['gid'] is None and task['attempt_started'] > ATTEMPT_STARTED
+
+
+def test_bulk_extraction_respects_the_llm_limit(app, monkeypatch):
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+
+    def analyze(text, use_cache=True):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.05)
+        with lock:
+            state['active'] -= 1
+        return [{'name': text, 'description': ''}]
+
+    topics = ["Angebot schreiben", "Messe buchen", "Fotos sichten", "Budget prüfen"]
+    monkeypatch.setattr(app, 'split_text_into_chunks', lambda text: [f"{topic} ({text})" for topic in topics])
+    monkeypatch.setattr(app, 'analyze_text_with_ai', analyze)
+    index = app.AssigneeIndex([])
+
+    # Wie der KI-Pool von run_bulk mit BULK_LLM_CONCURRENCY = 2
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda name: app._bulk_extract(name, index), ['Protokoll A', 'Protokoll B', 'Protokoll C']))
+
+    assert state['peak'] == 2
+    assert [len(tasks) for tasks in results] == [4, 4, 4]
@@ -0,0 +1,108 @@
+"""Aufteilung langer Protokolle in Abschnitte und Zusammenführen der Aufgaben aller Abschnitte."""
+import asyncio
+import time
+
+import pytest
+
+HEADER = "Teamsitzung Marketing, 14.03.2025"
+
+
+class WordEncoding:
+    """Stellvertreter für ein tiktoken-Encoding: ein Token je Wort bzw. Leerraum"""
+
+    def encode(self, text):
+        import re
+        return re.findall(r'\s+|\S+', text)
+
+    def decode(self, tokens):
+        return ''.join(tokens)
+
+
+def protocol(lines):
+    return HEADER + "\n" + "\n".join(f"- Punkt {i}: " + "Text " * 20 for i in range(lines))
+
+
+@pytest.fixture(params=['estimate', 'tiktoken'])
+def encoding(app, request, monkeypatch):
+    monkeypatch.setattr(app, '_token_encoding', False if request.param == 'estimate' else WordEncoding())
+    return app
+
+
+def test_chunks_stay_within_the_token_budget(encoding):
+    text = protocol(60) + "\n" + "Überlange Zeile " * 400
+
+    chunks = encoding.split_text_into_chunks(text, max_tokens=300, overlap_tokens=60)
+
+    assert len(chunks) > 2
+    assert all(encoding.count_tokens(chunk) <= 300 for chunk in chunks)
+    # Jeder Abschnitt beginnt mit der Kopfzeile, nichts geht verloren
+    assert all(chunk.startswith(HEADER + "\n") for chunk in chunks)
+    assert all(f"- Punkt {i}:" in "".join(chunks) for i in range(60))
+    assert "".join(chunks).count("Überlange") >= 400
+
+
+def test_chunks_overlap_with_the_previous_one(encoding):
+    chunks = encoding.split_text_into_chunks(protocol(60), max_tokens=300, overlap_tokens=60)
+
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split("\n")[1] in previous.split("\n")[2:]
+
+
+def test_short_text_is_one_chunk(encoding):
+    assert encoding.split_text_into_chunks(protocol(2), max_tokens=3000) == [protocol(2)]
+
+
+TOPICS = ["Messestand planen", "Budget freigeben", "Website überarbeiten", "Fotos auswählen", "Kunden anrufen"]
+
+
+def chunk_results(text):
+    """KI-Ersatz: je Abschnitt eine eigene Aufgabe und eine, die in jedem Abschnitt vorkommt"""
+    index = int(text.split("Abschnitt ")[1].split()[0])
+    return index, [
+        {'name': TOPICS[index], 'description': ''},
+        {'name': "Newsletter versenden", 'description': '', 'due_date': '2025-04-01' if index == 3 else ''},
+    ]
+
+
+@pytest.fixture
+def chunked(app, monkeypatch):
+    chunks = [f"Abschnitt {i}" for i in range(5)]
+    monkeypatch.setattr(app, 'split_text_into_chunks', lambda text: chunks)
+    return app
+
+
+def test_tasks_come_in_document_order_with_merged_fields(chunked, monkeypatch):
+    def analyze(text, use_cache=True):
+        index, tasks = chunk_results(text)
+        time.sleep(0.05 * (5 - index))  # spätere Abschnitte werden zuerst fertig
+        return tasks
+    monkeypatch.setattr(chunked, 'analyze_text_with_ai', analyze)
+
+    # Kopien beim Empfang: so sieht die Oberfläche die Aufgaben, spätere Änderungen kämen nie an
+    received = [dict(task) for task in chunked.iter_extract_tasks("egal")]
+
+    assert [task['name'] for task in received] == [
+        TOPICS[0], "Newsletter versenden", *TOPICS[1:]]
+    # Das Fälligkeitsdatum aus Abschnitt 3 war schon beim Ausliefern in Abschnitt 0 enthalten
+    assert received[1]['due_date'] == '2025-04-01'
+
+
+def test_async_tasks_come_in_document_order(chunked, monkeypatch):
+    async def analyze(text, use_cache=True):
+        index, tasks = chunk_results(text)
+        await asyncio.sleep(0.02 * (5 - index))
+        for task in tasks:
+            yield task
+    monkeypatch.setattr(chunked, 'aiter_analyze_text_with_ai', analyze)
+
+    async def collect():
+        received = []
+        async for task in chunked.aiter_extract_tasks("egal"):
+            received.append((task['name'], task.get('due_date')))
+        return received
+
+    received = asyncio.run(collect())
+
+    assert [name for name, _ in received] == [
+        TOPICS[0], "Newsletter versenden", *TOPICS[1:]]
+    assert received[1] == ("Newsletter versenden", '2025-04-01')
@@ -0,0 +1,50 @@
+"""Parent-Task-Vorschlag: der zwischengespeicherte TF-IDF-Scorer folgt Umbenennungen und Zuwachs
+genauso wie ein frisch gebauter."""
+import pytest
+
+PROJECT = '1299'
+PROTOCOL = "Besprechung zum Imagefilm Drehplan: Termine mit der Agentur abstimmen"
+
+
+@pytest.fixture
+def tfidf(app, monkeypatch):
+    pytest.importorskip('scipy')
+    monkeypatch.setattr(app, 'PARENT_TASK_SCORING', 'tfidf')
+    app.asana_cache.invalidate()
+    yield app
+    app.asana_cache.invalidate()
+
+
+def test_renamed_task_is_suggested_under_its_new_name(tfidf):
+    before = [('Website Relaunch', '3001'), ('Newsletter Q3', '3002'), ('Imagefilm Rohschnitt', '3003')]
+    assert tfidf._parent_task_scorer_for(PROJECT, before).suggest(PROTOCOL) == ('Imagefilm Rohschnitt', '3003')
+
+    # Delta-Sync: gleiche GID, neuer Name
+    after = [('Website Relaunch', '3001'), ('Newsletter Q3', '3002'), ('Imagefilm Drehplan', '3003')]
+    scorer = tfidf._parent_task_scorer_for(PROJECT, after)
+
+    assert scorer.suggest(PROTOCOL) == ('Imagefilm Drehplan', '3003')
+    assert 'Imagefilm Rohschnitt' not in scorer.task_names
+
+
+def test_appended_tasks_match_a_fresh_build(tfidf):
+    before = [('Imagefilm Drehplan', '3001'), ('Newsletter Q3', '3002')]
+    tfidf._parent_task_scorer_for(PROJECT, before)
+    after = before + [('Imagefilm Drehplan', '3004')]
+
+    extended = tfidf._parent_task_scorer_for(PROJECT, after)
+    fresh = tfidf.TfidfParentTaskScorer([name for name, _ in after], task_gids=[gid for _, gid in after])
+
+    assert extended.task_gids == fresh.task_gids
+    assert extended.suggest(PROTOCOL) == fresh.suggest(PROTOCOL) == ('Imagefilm Drehplan', '3001')
+
+
+def test_reordered_tasks_are_rebuilt_in_the_new_order(tfidf):
+    tfidf._parent_task_scorer_for(PROJECT, [('Imagefilm Drehplan', '3001'), ('Newsletter Q3', '3002')])
+    after = [('Imagefilm Drehplan', '3005'), ('Imagefilm Drehplan', '3001'), ('Newsletter Q3', '3002')]
+
+    scorer = tfidf._parent_task_scorer_for(PROJECT, after)
+
+    # Gleichstand: wie bei einem frischen Bau gewinnt die erste Aufgabe der Liste
+    assert scorer.task_gids == ['3005', '3001', '3002']
+    assert scorer.suggest(PROTOCOL) == ('Imagefilm Drehplan', '3005')
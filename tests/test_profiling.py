@@ -0,0 +1,67 @@
+"""Profiling von Handlern: überlappende Async-Aufrufe auf demselben Event-Loop."""
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def profiling(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'PROFILE_HANDLERS', {'all'})
+    monkeypatch.setattr(app, 'PROFILE_SAMPLE_RATE', 1.0)
+    monkeypatch.setattr(app, 'profile_store', app.ProfileStore(str(tmp_path), 50))
+    return app
+
+
+def profiles(app):
+    return sorted((meta['handler'], meta['outcome']) for meta in app.profile_store.list())
+
+
+def test_overlapping_async_generators_profile_only_one_call(profiling):
+    @profiling.profiled('erster')
+    async def first():
+        for i in range(3):
+            await asyncio.sleep(0.02)
+            yield i
+
+    @profiling.profiled('zweiter')
+    async def second():
+        for i in range(3):
+            await asyncio.sleep(0.02)
+            yield i * 10
+
+    async def consume(gen):
+        return [item async for item in gen]
+
+    async def run():
+        overlapping = await asyncio.gather(consume(first()), consume(second()))
+        # Danach ist der Bereich wieder frei
+        after = await consume(second())
+        return overlapping, after
+
+    overlapping, after = asyncio.run(run())
+
+    assert overlapping == [[0, 1, 2], [0, 10, 20]]
+    assert after == [0, 10, 20]
+    assert profiles(profiling) == [('erster', 'ok'), ('zweiter', 'ok')]
+
+
+def test_overlapping_coroutines_do_not_break_each_other(profiling):
+    @profiling.profiled('handler')
+    async def handler(value):
+        await asyncio.sleep(0.02)
+        if value == 'fehler':
+            raise RuntimeError(value)
+        return value
+
+    async def run():
+        return await asyncio.gather(handler('a'), handler('b'), handler('fehler'), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert results[:2] == ['a', 'b'] and isinstance(results[2], RuntimeError)
+    metas = profiling.profile_store.list()
+    assert len(metas) == 1
+    with open(profiling.profile_store.path(f"{metas[0]['id']}.json"), encoding='utf-8') as f:
+        assert json.load(f)['outcome'] == 'ok'
+    assert not profiling._profile_scopes